@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Benchmark gán UE → UAV gần nhất: vét cạn theo khối vs lưới đều (UniformGrid).
+
+- Quét số UAV (mật độ UAV giữ cố định → cạnh vùng mô phỏng tăng theo sqrt(n_uav)).
+- Đo thời gian trung bình một lần gán cho toàn bộ UE (ms), kể cả dựng lưới.
+- Ghi CSV (cùng kiểu fw_bench.py) và in điểm giao cắt đầu tiên grid nhanh hơn brute.
+- Ngưỡng "auto" trong uwml/attach.py (AUTO_GRID_MIN_TARGETS/AUTO_GRID_MIN_POINTS) lấy từ đây;
+  nên chạy lại với vài giá trị --n_ue vì lưới có chi phí cố định theo số ô.
+
+Sử dụng:
+    python -m benchmarks.attach_bench --n_ue 100000 --n_uav 4,16,32,64,128,256,512 --csv results_attach_bench.csv
+"""
+import os, sys, csv, time, argparse
+
+import numpy as np
+
+if __package__ is None or __package__ == "":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from uwml.attach import nearest_brute
+from uwml.spatial import UniformGrid
+
+
+def _scene(n_ue, n_uav, area_per_uav_m2, seed=0):
+    """Tạo UE trên mặt đất và UAV ở 40–120 m trong hình vuông giữ mật độ UAV cố định."""
+    rng = np.random.default_rng(seed)
+    half = 0.5 * float(np.sqrt(area_per_uav_m2 * n_uav))
+    ue = np.zeros((n_ue, 3), np.float32)
+    ue[:, :2] = rng.uniform(-half, half, (n_ue, 2))
+    uav = np.zeros((n_uav, 3), np.float32)
+    uav[:, :2] = rng.uniform(-half, half, (n_uav, 2))
+    uav[:, 2] = rng.uniform(40.0, 120.0, n_uav)
+    return ue, uav
+
+
+def _time_ms(fn, repeat):
+    fn()  # làm nóng
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e3
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--n_ue', type=int, default=100000, help='số UE')
+    ap.add_argument('--n_uav', default='4,16,32,64,128,256,512', help='danh sách số UAV, phân cách bởi dấu phẩy')
+    ap.add_argument('--area_per_uav', type=float, default=250.0 ** 2, help='diện tích (m²) ứng với mỗi UAV')
+    ap.add_argument('--repeat', type=int, default=3, help='số lần lặp mỗi phép đo')
+    ap.add_argument('--csv', default='results_attach_bench.csv', help='đường dẫn file CSV kết quả')
+    args = ap.parse_args()
+
+    rows, crossover = [], None
+    for n_uav in [int(x) for x in args.n_uav.split(',') if x]:
+        ue, uav = _scene(args.n_ue, n_uav, args.area_per_uav)
+        t_brute = _time_ms(lambda: nearest_brute(ue, uav), args.repeat)
+        t_grid = _time_ms(lambda: UniformGrid(uav).nearest(ue), args.repeat)
+        for name, t in (('brute', t_brute), ('grid', t_grid)):
+            res = {'backend': name, 'available': True, 'n_ue': args.n_ue,
+                   'n_uav': n_uav, 'ms_per_attach': round(t, 3)}
+            rows.append(res)
+            print(res)
+        if crossover is None and t_grid < t_brute:
+            crossover = n_uav
+
+    keys = sorted({k for r in rows for k in r.keys()})
+    with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+        w = csv.DictWriter(f, fieldnames=keys)
+        w.writeheader()
+        w.writerows(rows)
+    print('Crossover (grid < brute) at n_uav =', crossover)
+    print('Wrote', args.csv)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Benchmark tầng kênh: tốc độ liên kết theo công thức giải tích vs bảng tra (RateTable).
+
+- Kênh lấy từ file YAML (compile_config), bảng phủ đường chéo của world.bounds như trong World.
+- Với mỗi số liên kết N: UE/UAV ngẫu nhiên trong bounds, đo µs mỗi lần tính N tốc độ (lượt nhanh nhất trong 5)
+  (`estimate_link_rate_batch` vs `RateTable.rate_between`), cả phần "chỉ từ khoảng cách"
+  (`rate_from_distance_batch` vs `RateTable.rate_from_d2`), và sai số tương đối lớn nhất quan sát được.
+- Giao thoa đồng kênh (`interference_sinr_db`): µs mỗi lần tính SINR cho N UE với `--n_uav` UAV chia
+  `--num_channels` kênh, và ns trên mỗi phần tử UE×UAV (phải gần như không đổi theo N: chi phí tuyến tính).
+- In kích thước bảng, số bin mỗi octave và sai số lớn nhất đã kiểm chứng lúc dựng; ghi CSV cùng kiểu fw_bench.py.
+
+Sử dụng:
+    python -m benchmarks.channel_bench --n 1000,20000,200000 --rel_tol 1e-4 --n_uav 16 --num_channels 4 \
+        --csv results_channel_bench.csv
+"""
+import os, sys, csv, time, argparse
+
+import numpy as np
+
+if __package__ is None or __package__ == "":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from uwml.config import load_config
+from uwml.attach import nearest_brute
+from uwml.channel import (RateTable, estimate_link_rate_batch, interference_sinr_db, link_distance_batch,
+                          rate_from_distance_batch, uav_channel_groups)
+from uwml.schema import compile_config
+
+
+def _time_us(fn, n, rounds=5):
+    fn()  # làm nóng
+    repeat = max(3, int(2e6 / max(1, n)))
+    best = float('inf')
+    for _ in range(rounds):   # lấy lượt nhanh nhất: bớt nhiễu từ máy dùng chung
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, time.perf_counter() - t0)
+    return best / repeat * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--config', default='configs/default.yaml', help='file YAML nền')
+    ap.add_argument('--n', default='1000,20000,200000', help='danh sách số liên kết, phân cách bởi dấu phẩy')
+    ap.add_argument('--rel_tol', type=float, default=1e-4, help='sai số tương đối cho phép của bảng')
+    ap.add_argument('--n_uav', type=int, default=16, help='số UAV cho phép đo giao thoa')
+    ap.add_argument('--num_channels', type=int, default=4, help='số kênh tần số chia cho các UAV')
+    ap.add_argument('--csv', default='results_channel_bench.csv', help='đường dẫn file CSV kết quả')
+    args = ap.parse_args()
+
+    cc = compile_config(load_config(args.config))
+    b = np.asarray(cc.bounds, dtype=np.float64).reshape(3, 2)
+    span = np.maximum(b[:, 1], 0.0) - np.minimum(b[:, 0], 0.0)
+    t0 = time.perf_counter()
+    table = RateTable(cc.channel, float(np.linalg.norm(span)), rel_tol=args.rel_tol)
+    build_ms = (time.perf_counter() - t0) * 1e3
+    print(f"RateTable: {len(table)} nodes, {table.bins_per_octave} bins/octave, build {build_ms:.1f} ms, "
+          f"validated max rel err {table.max_rel_err:.2e}, pathloss {table.max_abs_err_db:.2e} dB")
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for n in [int(x) for x in args.n.split(',') if x]:
+        src = rng.uniform(b[:, 0], b[:, 1], (n, 3)).astype(np.float32)
+        dst = rng.uniform(b[:, 0], b[:, 1], (n, 3)).astype(np.float32)
+        d = link_distance_batch(src, dst)
+        d2 = d * d
+        exact = estimate_link_rate_batch(src, dst, cc.channel)
+        err = float(np.max(np.abs(table.rate_between(src, dst) - exact) / exact))
+        t_exact = _time_us(lambda: estimate_link_rate_batch(src, dst, cc.channel), n)
+        t_table = _time_us(lambda: table.rate_between(src, dst), n)
+        t_exact_d = _time_us(lambda: rate_from_distance_batch(d, cc.channel), n)
+        t_table_d = _time_us(lambda: table.rate_from_d2(d2), n)
+        for name, t, td in (('analytic', t_exact, t_exact_d), ('table', t_table, t_table_d)):
+            res = {'backend': name, 'available': True, 'n_links': n,
+                   'us_per_batch': round(t, 1), 'us_per_batch_from_distance': round(td, 1),
+                   'ns_per_link': round(t / n * 1e3, 2)}
+            if name == 'table':
+                res.update(speedup=round(t_exact / t, 2), speedup_from_distance=round(t_exact_d / td, 2),
+                           max_rel_err=err, validated_max_rel_err=table.max_rel_err,
+                           table_nodes=len(table), build_ms=round(build_ms, 2))
+            rows.append(res)
+            print(res)
+
+        # Giao thoa: UE trên mặt đất, UAV ở độ cao cấu hình, phục vụ bởi UAV gần nhất
+        uav = rng.uniform(b[:, 0], b[:, 1], (args.n_uav, 3)).astype(np.float32)
+        uav[:, 2] = cc.uav_altitude_m
+        ue = src.copy()
+        ue[:, 2] = 0.0
+        serving, _ = nearest_brute(ue, uav)
+        groups = uav_channel_groups(args.n_uav, args.num_channels)
+        t = _time_us(lambda: interference_sinr_db(ue, uav, serving, groups, cc.channel), n)
+        res = {'backend': 'interference', 'available': True, 'n_links': n, 'n_uav': args.n_uav,
+               'num_channels': args.num_channels, 'us_per_batch': round(t, 1),
+               'ns_per_link': round(t / n * 1e3, 2), 'ns_per_ue_uav': round(t / (n * args.n_uav) * 1e3, 3)}
+        rows.append(res)
+        print(res)
+
+    keys = sorted({k for r in rows for k in r.keys()})
+    with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+        w = csv.DictWriter(f, fieldnames=keys)
+        w.writeheader()
+        w.writerows(rows)
+    print('Wrote', args.csv)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Backend benchmark tải vẽ thật: dựng World cỡ n_ue/n_uav rồi vẽ bằng chính `OpenGLRenderer._draw`.
+
+Khác pyglet_pyopengl (chỉ clear màn hình), mỗi khung ở đây đi đúng đường vẽ của renderer: lưới + trục,
+điểm UE/UAV/BS/vệ tinh, dây UE→node, cột UAV và HUD text — qua VBO (`path="vbo"`) hoặc immediate mode
+(`path="immediate"`). World dựng từ configs/default.yaml (engine soa, chỉ spawn; `step_world=True` thì chạy
+thêm một bước mỗi khung, tính cả thời gian mô phỏng). Cửa sổ ẩn, vsync=False.
+
+Đo thời gian từng khung (vẽ + glFinish + flip) để báo phân vị P50/P95/P99 và max, không chỉ FPS trung bình.
+"""
+import time
+import numpy as np
+from OpenGL import GL
+
+from uwml.config import load_config, apply_overrides
+from uwml.world import World
+from uwml.renderer_opengl import OpenGLRenderer
+
+PATHS = ("vbo", "immediate")
+
+
+def run(duration_s: float = 8.0, n_uav: int = 5, n_ue: int = 300, path: str = "vbo",
+        step_world: bool = False, config: str = "configs/default.yaml"):
+    """Vẽ World n_uav × n_ue trong duration_s giây qua `OpenGLRenderer._draw`.
+
+    Returns:
+        dict: backend, available, path, n_ue, n_uav, frames, fps, frame_ms_p50/p95/p99/max, init_time_s
+    """
+    if path not in PATHS:
+        raise ValueError(f"path không hợp lệ: {path!r} (chọn một trong {PATHS})")
+    cfg = load_config(config)
+    apply_overrides(cfg, {"ue.count": int(n_ue), "uav.count": int(n_uav), "system.engine": "soa"})
+    world = World(cfg)
+    world.spawn()
+
+    # ---- 1) Khởi tạo renderer + khung đầu ----
+    t0 = time.perf_counter()
+    ren = OpenGLRenderer(800, 600, vbo=(path == "vbo"), visible=False, vsync=False)
+    ren._auto_frame(world)
+    ren.win.switch_to()
+    ren.win.dispatch_events()
+    ren._draw(world)
+    ren.win.flip()
+    init_time_s = time.perf_counter() - t0
+
+    # ---- 2) Đo từng khung ----
+    times = []
+    t_end = time.perf_counter() + float(duration_s)
+    while time.perf_counter() < t_end:
+        t = time.perf_counter()
+        ren.win.dispatch_events()
+        if step_world:
+            world.step(cfg.system.dt)
+        ren._draw(world)
+        GL.glFinish()
+        ren.win.flip()
+        times.append(time.perf_counter() - t)
+
+    try:
+        ren.win.close()
+    except Exception:
+        pass
+
+    ms = np.asarray(times) * 1e3
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (float("nan"),) * 3
+    return {
+        "backend": f"renderer_{path}",
+        "available": True,
+        "path": path,
+        "n_ue": int(n_ue),
+        "n_uav": int(n_uav),
+        "frames": len(ms),
+        "fps": round(len(ms) / max(1e-6, float(ms.sum()) / 1e3), 1),
+        "frame_ms_p50": round(float(p50), 3),
+        "frame_ms_p95": round(float(p95), 3),
+        "frame_ms_p99": round(float(p99), 3),
+        "frame_ms_max": round(float(ms.max()) if len(ms) else float("nan"), 3),
+        "init_time_s": round(init_time_s, 4),
+    }
@@ -5,8 +5,15 @@
 - Chạy từng backend, gom kết quả và ghi ra CSV.
 - In ra console tóm tắt cho nhanh.
 
+Hai chế độ:
+- `clear` (mặc định): chấm các backend trong BACKENDS (chỉ xoá màn hình).
+- `draw`: tải vẽ thật — dựng World cỡ n_uav × n_ue và vẽ bằng `OpenGLRenderer._draw` (điểm, dây, cột, HUD;
+  backend fw_backends/pyglet_renderer), quét mọi tổ hợp n_uav × n_ue × đường vẽ (VBO / immediate mode);
+  mỗi tổ hợp một dòng CSV với FPS và phân vị thời gian khung P50/P95/P99/max (ms).
+
 Sử dụng:
     python -m benchmarks.fw_bench --duration 8 --csv results_fw_bench.csv
+    python -m benchmarks.fw_bench --mode draw --n_uav 5,50 --n_ue 300,3000,30000 --duration 4 --csv results_fw_draw.csv
 """
 import os, sys, importlib, csv, argparse, traceback
 
@@ -18,6 +25,8 @@ if __package__ is None or __package__ == "":
 
 # Danh sách backend cần chấm. Phase-1 chỉ có pyglet_pyopengl.
 BACKENDS = ["pyglet_pyopengl"]
+# Backend của chế độ draw (vẽ World thật qua OpenGLRenderer._draw)
+DRAW_BACKEND = "pyglet_renderer"
 
 
 def _load_backend(name: str):
@@ -32,28 +41,48 @@ def _load_backend(name: str):
         return importlib.import_module(f"benchmarks.fw_backends.{name}")
 
 
+def _ints(text):
+    return [int(v) for v in str(text).split(",") if v.strip()]
+
+
+def _jobs(args):
+    """Danh sách (tên backend, kwargs cho run) theo chế độ đo."""
+    n_uavs, n_ues = _ints(args.n_uav), _ints(args.n_ue)
+    if args.mode == "clear":
+        return [(name, dict(n_uav=n_uavs[0], n_ue=n_ues[0])) for name in BACKENDS]
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    return [(DRAW_BACKEND, dict(n_uav=m, n_ue=n, path=path, step_world=args.step))
+            for m in n_uavs for n in n_ues for path in paths]
+
+
 def main():
     # --- CLI ---
     ap = argparse.ArgumentParser()
     ap.add_argument('--duration', type=float, default=8.0, help='thời gian đo FPS (s)')
-    ap.add_argument('--n_uav', type=int, default=5, help='tham số tải giả')
-    ap.add_argument('--n_ue', type=int, default=300, help='tham số tải giả')
+    ap.add_argument('--n_uav', default='5', help='số UAV (chế độ draw: danh sách cách nhau dấu phẩy)')
+    ap.add_argument('--n_ue', default='300', help='số UE (chế độ draw: danh sách cách nhau dấu phẩy)')
+    ap.add_argument('--mode', choices=['clear', 'draw'], default='clear',
+                    help='clear: chấm backend (chỉ clear); draw: vẽ World thật qua renderer')
+    ap.add_argument('--paths', default='vbo,immediate', help='(draw) đường vẽ cần đo: vbo, immediate')
+    ap.add_argument('--step', action='store_true', help='(draw) chạy thêm World.step mỗi khung')
     ap.add_argument('--csv', default='results_fw_bench.csv', help='đường dẫn file CSV kết quả')
     args = ap.parse_args()
 
     rows = []
-    for name in BACKENDS:
+    for name, kw in _jobs(args):
         try:
             # Mỗi backend định nghĩa hàm run(...)
             m = _load_backend(name)
-            res = m.run(duration_s=args.duration, n_uav=args.n_uav, n_ue=args.n_ue)
+            res = m.run(duration_s=args.duration, **kw)
             # Bảo đảm có các khóa tối thiểu
             res.setdefault('backend', name)
             res.setdefault('available', True)
         except Exception as e:
             # Nếu backend lỗi (không khả dụng), ghi thông tin để phân tích
             res = {
-                'backend': name,
+                'backend': f"renderer_{kw['path']}" if 'path' in kw else name,
+                'n_ue': kw['n_ue'],
+                'n_uav': kw['n_uav'],
                 'available': False,
                 'error': repr(e),
                 # Lọc 6 dòng cuối trace cho ngắn gọn
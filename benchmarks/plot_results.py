@@ -1,15 +1,75 @@
 # -*- coding: utf-8 -*-
 """Vẽ biểu đồ từ CSV kết quả benchmark backend khung hiển thị.
 
-Đầu vào: CSV do fw_bench.py sinh ra.
+Đầu vào: CSV do fw_bench.py (hoặc sim_bench.py) sinh ra.
 - Chỉ giữ các hàng có cột 'available' là True/1/yes.
-- Vẽ 2 biểu đồ cột: FPS và thời gian khởi tạo (init_time_s).
-- Lưu ra 'plot_fps.png' và 'plot_init.png'.
+- CSV của fw_bench: vẽ 2 biểu đồ cột FPS và thời gian khởi tạo (init_time_s)
+  → 'plot_fps.png' và 'plot_init.png'.
+- CSV của sim_bench (có cột 'steps_per_s'): vẽ đường co giãn theo n_ue, mỗi đường
+  một tổ hợp (engine, n_uav, gen_prob) → 'plot_sim_steps.png', 'plot_sim_us_per_ue.png',
+  'plot_sim_rss.png'.
+- CSV của fw_bench --mode draw (có cột 'frame_ms_p95'): thời gian khung P50/P95/P99 theo n_ue, mỗi đường
+  một tổ hợp (đường vẽ, n_uav) → 'plot_render_frame_ms.png'.
 """
 import sys, csv
+from collections import defaultdict
 import matplotlib.pyplot as plt
 
 
+def plot_sim_scaling(rows):
+    """Biểu đồ co giãn World.step theo n_ue (log-log) từ CSV của sim_bench.py."""
+    series = defaultdict(list)
+    for r in rows:
+        key = f"{r.get('engine', '?')} uav={r.get('n_uav')} p={r.get('gen_prob')}"
+        series[key].append(r)
+
+    outs = []
+    for col, title, ylabel, fname in (
+            ('steps_per_s', 'World.step throughput', 'steps/s', 'plot_sim_steps.png'),
+            ('us_per_ue_step', 'Cost per UE-step', 'µs / UE-step', 'plot_sim_us_per_ue.png'),
+            ('peak_rss_mb', 'Peak RSS', 'MB', 'plot_sim_rss.png')):
+        plt.figure()
+        for key, rs in sorted(series.items()):
+            pts = sorted((int(r['n_ue']), float(r[col])) for r in rs if r.get(col) not in (None, ''))
+            if pts:
+                plt.plot([p[0] for p in pts], [p[1] for p in pts], marker='o', label=key)
+        plt.xscale('log')
+        if col != 'peak_rss_mb':
+            plt.yscale('log')
+        plt.title(title)
+        plt.xlabel('n_ue')
+        plt.ylabel(ylabel)
+        plt.legend(fontsize=7)
+        plt.savefig(fname, dpi=140)
+        outs.append(fname)
+    print('Wrote', ', '.join(outs))
+
+
+def plot_render_load(rows):
+    """Phân vị thời gian khung theo n_ue (log-log) từ CSV của fw_bench --mode draw."""
+    series = defaultdict(list)
+    for r in rows:
+        series[f"{r.get('path', '?')} uav={r.get('n_uav')}"].append(r)
+
+    plt.figure()
+    for key, rs in sorted(series.items()):
+        rs = sorted(rs, key=lambda r: int(r['n_ue']))
+        x = [int(r['n_ue']) for r in rs]
+        line, = plt.plot(x, [float(r['frame_ms_p50']) for r in rs], marker='o', label=f"{key} P50")
+        plt.plot(x, [float(r['frame_ms_p99']) for r in rs], marker='x', linestyle='--',
+                 color=line.get_color(), label=f"{key} P99")
+        plt.fill_between(x, [float(r['frame_ms_p50']) for r in rs], [float(r['frame_ms_p95']) for r in rs],
+                         color=line.get_color(), alpha=0.15)
+    plt.xscale('log')
+    plt.yscale('log')
+    plt.title('Frame time (P50–P95 band, P99 dashed)')
+    plt.xlabel('n_ue')
+    plt.ylabel('ms / frame')
+    plt.legend(fontsize=7)
+    plt.savefig('plot_render_frame_ms.png', dpi=140)
+    print('Wrote plot_render_frame_ms.png')
+
+
 def main():
     # --- CLI rất tối giản ---
     if len(sys.argv) < 2:
@@ -24,6 +84,16 @@ def main():
         print('No available backends in CSV (Phase-1 only requires pyglet_pyopengl).')
         return
 
+    # CSV của sim_bench → biểu đồ co giãn
+    if 'steps_per_s' in rows[0]:
+        plot_sim_scaling(rows)
+        return
+
+    # CSV của fw_bench --mode draw → biểu đồ thời gian khung
+    if 'frame_ms_p95' in rows[0]:
+        plot_render_load(rows)
+        return
+
     # Tách dữ liệu theo cột
     names = [r['backend'] for r in rows]
     fps   = [float(r.get('fps', 0) or 0) for r in rows]
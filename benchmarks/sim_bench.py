@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Benchmark thông lượng mô phỏng headless (World.step), không vẽ.
+
+- Quét lưới n_ue × n_uav × gen_prob_per_step × engine trên nền một file YAML.
+- Mỗi trường hợp chạy trong một tiến trình con riêng để đo peak RSS sạch.
+- Báo cáo: steps/s, µs cho mỗi UE-step, peak RSS (MB); ghi CSV cùng kiểu fw_bench.py.
+- Vẽ biểu đồ co giãn: python benchmarks/plot_results.py results_sim_bench.csv
+
+Sử dụng:
+    python -m benchmarks.sim_bench --n_ue 100,1000,10000 --n_uav 3,30 --gen_prob 0.05,0.2 --csv results_sim_bench.csv
+"""
+import os, sys, csv, time, argparse, itertools, traceback
+import multiprocessing as mp
+
+if __package__ is None or __package__ == "":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+
+def _peak_rss_mb():
+    """Peak RSS của tiến trình hiện tại (MB), None nếu không đo được."""
+    try:
+        import resource
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux trả KB, macOS trả byte
+        return round(kb / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil  # Windows: peak working set
+        return round(psutil.Process().memory_info().peak_wset / 2**20, 1)
+    except Exception:
+        return None
+
+
+def run_case(config, n_ue, n_uav, gen_prob, engine, steps, warmup, max_time_s):
+    """Chạy một trường hợp (trong tiến trình con) và trả về dict kết quả."""
+    from uwml.config import load_config
+    from uwml.world import World
+
+    cfg = load_config(config)
+    for sec, key, val in (("ue", "count", n_ue), ("world", "n_ue", n_ue),
+                          ("uav", "count", n_uav), ("world", "n_uav", n_uav)):
+        if hasattr(cfg, sec):
+            setattr(getattr(cfg, sec), key, val)
+    cfg.packet.gen_prob_per_step = gen_prob
+    cfg.system.engine = engine
+    dt = cfg.system.dt
+
+    t0 = time.perf_counter()
+    w = World(cfg)
+    w.spawn()
+    init_time_s = time.perf_counter() - t0
+
+    for _ in range(warmup):
+        w.step(dt)
+
+    # Đo: tối đa `steps` bước, dừng sớm nếu vượt max_time_s
+    done, t0 = 0, time.perf_counter()
+    while done < steps:
+        # Engine "event" nhảy qua nhiều bước mỗi lần gọi run(); các engine khác đi từng bước
+        n = min(100, steps - done) if engine == "event" else 1
+        w.run(n, dt)
+        done += n
+        if time.perf_counter() - t0 > max_time_s:
+            break
+    elapsed = max(1e-9, time.perf_counter() - t0)
+
+    return {
+        "backend": f"world_step_{engine}",
+        "available": True,
+        "engine": engine,
+        "n_ue": n_ue,
+        "n_uav": n_uav,
+        "gen_prob": gen_prob,
+        "steps": done,
+        "steps_per_s": round(done / elapsed, 2),
+        "us_per_ue_step": round(elapsed / done / max(1, n_ue) * 1e6, 4),
+        "init_time_s": round(init_time_s, 4),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _case_entry(args):
+    """Bọc run_case để lỗi của một trường hợp không làm dừng cả lượt quét."""
+    try:
+        return run_case(*args)
+    except Exception as e:
+        config, n_ue, n_uav, gen_prob, engine = args[:5]
+        return {"backend": f"world_step_{engine}", "available": False, "engine": engine,
+                "n_ue": n_ue, "n_uav": n_uav, "gen_prob": gen_prob, "error": repr(e),
+                "trace": ''.join(traceback.format_exc().splitlines()[-6:])}
+
+
+def _ints(s):
+    return [int(x) for x in s.split(',') if x]
+
+
+def _floats(s):
+    return [float(x) for x in s.split(',') if x]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--config', default='configs/default.yaml', help='file YAML nền')
+    ap.add_argument('--n_ue', default='100,1000,10000', help='danh sách số UE')
+    ap.add_argument('--n_uav', default='3,30', help='danh sách số UAV')
+    ap.add_argument('--gen_prob', default='0.2', help='danh sách packet.gen_prob_per_step')
+    ap.add_argument('--engine', default='object,soa', help='danh sách engine (object, soa, event)')
+    ap.add_argument('--steps', type=int, default=200, help='số bước đo tối đa mỗi trường hợp')
+    ap.add_argument('--warmup', type=int, default=5, help='số bước làm nóng (không tính giờ)')
+    ap.add_argument('--max_time', type=float, default=20.0, help='giới hạn thời gian đo mỗi trường hợp (s)')
+    ap.add_argument('--csv', default='results_sim_bench.csv', help='đường dẫn file CSV kết quả')
+    args = ap.parse_args()
+
+    cases = [(args.config, n_ue, n_uav, p, eng, args.steps, args.warmup, args.max_time)
+             for eng, n_uav, p, n_ue in itertools.product(
+                 [e for e in args.engine.split(',') if e], _ints(args.n_uav),
+                 _floats(args.gen_prob), _ints(args.n_ue))]
+
+    # Mỗi trường hợp một tiến trình mới (maxtasksperchild=1) → peak RSS không cộng dồn
+    rows = []
+    with mp.get_context("spawn").Pool(processes=1, maxtasksperchild=1) as pool:
+        for res in pool.imap(_case_entry, cases):
+            rows.append(res)
+            print(res)
+
+    keys = sorted({k for r in rows for k in r.keys()})
+    with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+        w = csv.DictWriter(f, fieldnames=keys)
+        w.writeheader()
+        w.writerows(rows)
+    print('Wrote', args.csv)
+
+
+if __name__ == '__main__':
+    main()
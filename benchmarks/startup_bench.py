@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Benchmark khởi động: từ lúc bật tiến trình Python tới khi xong `World.step` đầu tiên.
+
+- Mỗi lần đo là một tiến trình mới `python -X importtime` (khởi động lạnh về phía interpreter), chạy đúng
+  các import đầu file của điểm vào (`import cli`), nạp cấu hình, (gui) dựng `OpenGLRenderer` ẩn, spawn rồi step.
+- Điểm vào: `headless` (nhánh `cli.py --headless`, không được nạp pyglet/OpenGL) và `gui` (nhánh có vẽ:
+  thêm `uwml.renderer_opengl` + tạo cửa sổ ẩn; cần pyglet/PyOpenGL và màn hình).
+- Báo cáo mỗi lần: thời gian tường tới bước đầu (`wall_first_step_s`), tách ra interpreter / import điểm vào /
+  khởi tạo GUI / spawn + step, cờ `gui_loaded` (pyglet có trong sys.modules không), và phân rã import theo gói
+  (`imp_ms_<gói>`: tổng thời gian "self" của -X importtime gộp theo gói gốc).
+- Ghi CSV cùng kiểu fw_bench.py / sim_bench.py.
+
+Sử dụng:
+    python -m benchmarks.startup_bench --entry headless,gui --repeat 5 --csv results_startup.csv
+"""
+import os, sys, csv, json, time, argparse, subprocess, statistics
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRIES = ("headless", "gui")
+
+# Gói được tách cột riêng trong CSV (phần còn lại gộp vào imp_ms_other)
+TRACKED = ("numpy", "yaml", "uwml", "cli", "pyglet", "OpenGL")
+
+# Mã chạy trong tiến trình con: argv = [entry, config, root]
+PROBE = r'''
+import sys, time, json
+t0 = time.perf_counter()
+entry, config, root = sys.argv[1:4]
+sys.path.insert(0, root)
+import cli
+t1 = time.perf_counter()
+from uwml.config import load_config
+from uwml.world import World
+cfg = load_config(config)
+if entry == "gui":
+    from uwml.renderer_opengl import OpenGLRenderer
+    ren = OpenGLRenderer(visible=False, vsync=False)
+t2 = time.perf_counter()
+w = World(cfg)
+w.spawn()
+w.step(cfg.system.dt)
+t3 = time.perf_counter()
+print(json.dumps({"import_entry_s": t1 - t0, "gui_init_s": t2 - t1, "spawn_step_s": t3 - t2,
+                  "in_process_s": t3 - t0, "gui_loaded": "pyglet" in sys.modules or "OpenGL" in sys.modules}),
+      flush=True)
+'''
+
+
+def parse_importtime(stderr: str):
+    """Tổng thời gian import "self" (ms) gộp theo gói gốc từ output của `python -X importtime`."""
+    by_pkg = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue   # dòng tiêu đề
+        by_pkg[parts[2].strip().split(".")[0]] += int(parts[0]) / 1e3
+    return dict(by_pkg)
+
+
+def run_once(entry: str, config: str):
+    """Một lần đo trong tiến trình mới; trả về dict kết quả."""
+    cmd = [sys.executable, "-X", "importtime", "-c", PROBE, entry, config, ROOT]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()          # in ra ngay sau bước đầu tiên
+    wall = time.perf_counter() - t0
+    _, err = proc.communicate()
+    row = {"backend": f"startup_{entry}", "entry": entry}
+    if proc.returncode != 0 or not line:
+        tail = [l for l in err.splitlines() if not l.startswith("import time:")][-3:]
+        return {**row, "available": False, "error": " | ".join(tail)}
+
+    res = json.loads(line)
+    imports = parse_importtime(err)
+    row.update({
+        "available": True,
+        "wall_first_step_s": round(wall, 4),
+        "interp_startup_s": round(max(0.0, wall - res["in_process_s"]), 4),
+        "import_entry_s": round(res["import_entry_s"], 4),
+        "gui_init_s": round(res["gui_init_s"], 4),
+        "spawn_step_s": round(res["spawn_step_s"], 4),
+        "gui_loaded": res["gui_loaded"],
+    })
+    for pkg in TRACKED:
+        row[f"imp_ms_{pkg}"] = round(imports.pop(pkg, 0.0), 2)
+    row["imp_ms_other"] = round(sum(imports.values()), 2)
+    row["top_other"] = ";".join(f"{k}:{v:.1f}" for k, v in
+                                sorted(imports.items(), key=lambda kv: -kv[1])[:5])
+    return row
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--config', default='configs/default.yaml', help='file YAML nền')
+    ap.add_argument('--entry', default='headless,gui', help='danh sách điểm vào (headless, gui)')
+    ap.add_argument('--repeat', type=int, default=5, help='số lần đo mỗi điểm vào')
+    ap.add_argument('--csv', default='results_startup.csv', help='đường dẫn file CSV kết quả')
+    args = ap.parse_args()
+
+    rows = []
+    for entry in [e for e in args.entry.split(',') if e]:
+        if entry not in ENTRIES:
+            raise SystemExit(f"điểm vào không hợp lệ: {entry!r} (chọn trong {ENTRIES})")
+        runs = []
+        for i in range(max(1, args.repeat)):
+            res = run_once(entry, args.config)
+            res["repeat"] = i
+            rows.append(res)
+            runs.append(res)
+            if not res["available"]:
+                print(res)
+                break
+        ok = [r["wall_first_step_s"] for r in runs if r["available"]]
+        if ok:
+            print(f"{entry}: first step median {statistics.median(ok) * 1e3:.1f} ms "
+                  f"(min {min(ok) * 1e3:.1f}, n={len(ok)}), gui_loaded={runs[-1]['gui_loaded']}")
+
+    keys = sorted({k for r in rows for k in r.keys()})
+    with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+        w = csv.DictWriter(f, fieldnames=keys)
+        w.writeheader()
+        w.writerows(rows)
+    print('Wrote', args.csv)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,11 @@
 from __future__ import annotations
 import argparse, json
 
-from uwml.config import load_config
+from uwml.config import load_config, apply_overrides, parse_override
 from uwml.world import World
-from uwml.renderer_opengl import OpenGLRenderer
+from uwml.runner import run_headless
+from uwml.schema import ConfigError, compile_config
+# pyglet/PyOpenGL (uwml.renderer_opengl) chỉ nạp trên nhánh có vẽ: chạy headless không cần màn hình
 
 
 def main():
@@ -13,38 +15,75 @@ def main():
     ap.add_argument("--config",  default="configs/default.yaml", help="đường dẫn file YAML cấu hình")
     ap.add_argument("--steps",   type=int, default=None,         help="ghi đè số bước (nếu truyền)")
     ap.add_argument("--headless", action="store_true",           help="chạy không vẽ 3D")
+    ap.add_argument("--engine",  choices=("object", "soa", "event"), default=None,
+                    help="ghi đè cfg.system.engine (object | soa | event; event chỉ nhanh hơn với tải thưa)")
+    ap.add_argument("--profile", action="store_true",
+                    help="bật đo thời gian theo pha của World.step (in kèm JSON / hiện trên HUD)")
+    ap.add_argument("--set",     action="append", default=[],
+                    help="ghi đè cấu hình dạng khóa=giá_trị, vd. --set ue.count=1000 (lặp lại được)")
+    ap.add_argument("--packet-spill", default=None,
+                    help="ghi toàn bộ packet log ra file nhị phân (nối đuôi), đọc lại bằng uwml.packetlog.load_spill")
+    ap.add_argument("--telemetry", default=None,
+                    help="(headless) ghi chuỗi thời gian mỗi K bước ra FILE .jsonl hoặc .npz")
+    ap.add_argument("--telemetry-every", type=int, default=None, help="K: số bước giữa hai mẫu telemetry")
+    ap.add_argument("--record", default=None,
+                    help="(headless) ghi vị trí + gán UE→UAV mỗi K bước ra file quỹ đạo memmap để replay")
+    ap.add_argument("--record-every", type=int, default=None, help="K: số bước giữa hai khung quỹ đạo")
+    ap.add_argument("--sim", choices=("thread", "process"), default=None,
+                    help="(có vẽ) chạy mô phỏng trong luồng/tiến trình riêng, renderer vẽ ảnh chụp mới nhất")
+    ap.add_argument("--replay", default=None, help="mở renderer phát lại file quỹ đạo (không mô phỏng)")
+    ap.add_argument("--replay-speed", type=float, default=1.0, help="tốc độ phát lại (N× thời gian mô phỏng)")
     args = ap.parse_args()
 
+    # 0) Phát lại quỹ đạo đã ghi: chỉ đọc file, không cần cấu hình/mô phỏng
+    if args.replay:
+        from uwml.trajectory import TrajectoryReader
+        from uwml.renderer_opengl import OpenGLRenderer
+        OpenGLRenderer().replay(TrajectoryReader(args.replay), speed=args.replay_speed)
+        return
+
     # 1) Nạp cấu hình
     cfg = load_config(args.config)
+    apply_overrides(cfg, dict(parse_override(s) for s in args.set))
+    if args.packet_spill:
+        cfg.packet.spill_path = args.packet_spill
+    if args.telemetry:
+        apply_overrides(cfg, {"telemetry.path": args.telemetry})
+    if args.record:
+        apply_overrides(cfg, {"trajectory.path": args.record})
+    if args.record_every is not None:
+        apply_overrides(cfg, {"trajectory.every": args.record_every})
+    if args.telemetry_every is not None:
+        apply_overrides(cfg, {"telemetry.every": args.telemetry_every})
     if args.steps is not None:
         cfg.system.steps = args.steps
+    if args.engine is not None:
+        cfg.system.engine = args.engine
+    # Kiểm tra cấu hình (sau mọi ghi đè) trước khi chạy: khóa gõ sai báo lỗi kèm gợi ý
+    try:
+        compile_config(cfg)
+    except ConfigError as e:
+        ap.error(str(e))
 
-    # 2) Tạo & nạp thế giới
-    w = World(cfg)
-    w.spawn()
-
-    # 3) Chạy
+    # 2) Chạy headless: không vẽ, chỉ chạy step và in thống kê JSON
     if args.headless:
-        # Không vẽ: chỉ chạy step và in thống kê JSON
-        for _ in range(cfg.system.steps):
-            w.step(cfg.system.dt)
-
-        stats = {
-            "time_s": w.stats.time_s,
-            "step": w.stats.step,
-            "enqueued": w.stats.enqueued,
-            "dequeued": w.stats.dequeued,
-            "dropped": w.stats.dropped,
-            "avg_latency_s": (w.stats.sum_latency_s / max(1, w.stats.count_latency or 1)),
-            "max_latency_s": w.stats.max_latency_s,
-            "packets_logged": len(w.packets),
-        }
+        _, stats = run_headless(cfg, profile=args.profile)
+        stats.pop("wall_time_s", None)
+        stats.pop("latency_sketch", None)
         print(json.dumps(stats, indent=2))
         return
 
+    # 3) Tạo & nạp thế giới
+    w = World(cfg)
+    w.spawn()
+    if args.profile:
+        w.profile.enabled = True
+
     # Có vẽ: mở cửa sổ 3D
-    OpenGLRenderer().loop(w, cfg.system.dt, cfg.system.steps)
+    from uwml.renderer_opengl import OpenGLRenderer
+    ren = OpenGLRenderer()
+    ren.show_profile = w.profile.enabled
+    ren.loop(w, cfg.system.dt, cfg.system.steps, sim=args.sim)
 
 
 if __name__ == "__main__":
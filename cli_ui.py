@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 # Điểm vào có giao diện chọn config.
-# Cách dùng: python cli_ui.py  (hoặc python -m cli_ui)
+# Cách dùng: python cli_ui.py [--sim thread|process]  (hoặc python -m cli_ui)
 from __future__ import annotations
-import os, sys
+import argparse, os, sys
 from uwml.config import load_config
 from uwml.world import World
 from uwml.renderer_opengl import OpenGLRenderer
@@ -13,6 +13,11 @@ from ui_launcher import pick_config_via_ui
 from ui_sidebar import Sidebar
 
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sim", choices=("thread", "process"), default=None,
+                    help="chạy mô phỏng trong luồng/tiến trình riêng thay vì trên luồng UI")
+    args = ap.parse_args()
+
     # 1) Chọn config qua UI
     cfg_path = pick_config_via_ui(configs_dir="configs")
     if not cfg_path:
@@ -28,33 +33,49 @@ def main():
     ren._world = w
     ren._auto_frame(w)
 
-    # Trạng thái pause
-    ren._paused = False
+    # Điều nhịp theo RTF (giữ cả trạng thái pause), chạy tối đa cfg.system.steps bước
+    ren.pacer = ren.make_pacer(w, cfg.system.dt, cfg.system.steps)
+
+    # Mô phỏng trong worker (nếu chọn): sidebar/HUD đọc ảnh chụp của khung đang vẽ
+    if args.sim:
+        from uwml.simworker import SimWorker
+        ren._sim = SimWorker(w, args.sim, dt=cfg.system.dt, max_steps=ren.pacer.max_steps,
+                             rtf=ren.pacer.rtf).start()
+    ren._view = w
+
+    def toggle_pause():
+        ren.pacer.paused = not ren.pacer.paused
+        ren.sync_pacing()
 
     # Tạo sidebar
     sidebar = Sidebar(
         win=ren.win,
-        world_ref=lambda: getattr(ren, "_world", None),
+        world_ref=lambda: getattr(ren, "_view", None),
         toggle_wires_fn=lambda: setattr(ren, "show_wires", not ren.show_wires),
-        pause_resume_fn=lambda: setattr(ren, "_paused", not getattr(ren, "_paused", False)),
-        back_fn=lambda: ren.win.close()
+        pause_resume_fn=toggle_pause,
+        back_fn=lambda: ren.win.close(),
+        pacer=ren.pacer,
+        pacing_changed_fn=ren.sync_pacing,
     )
     ren._sidebar = sidebar
 
-    # Wrap lại update để tôn trọng pause
-    def update(_dt):
-        if not getattr(ren, "_paused", False):
-            w.step(cfg.system.dt)
+    # Mỗi khung: pacer chạy số bước theo RTF (tôn trọng pause); chế độ worker chỉ giữ nhịp vẽ
+    def update(wall_dt):
+        if ren._sim is None:
+            ren.pacer.tick(w, wall_dt)
     import pyglet
-    pyglet.clock.schedule_interval(update, cfg.system.dt)
+    pyglet.clock.schedule_interval(update, 1.0 / 60.0)
 
     @ren.win.event
     def on_draw():
-        ren._draw(w)
+        if ren._sim is not None:
+            ren._view = ren._sim.view()
+            ren.pacer.observe(ren._view.stats.time_s)
+        ren._draw(ren._view)
         # vẽ overlay 2D
         ren._begin_2d()
-        ren._update_hud(w)  # vẫn dùng HUD cũ nếu muốn
-        sidebar.set_paused(getattr(ren, "_paused", False))
+        ren._update_hud(ren._view)  # vẫn dùng HUD cũ nếu muốn
+        sidebar.set_paused(ren.pacer.paused)
         sidebar.draw()
         ren._end_2d()
 
@@ -67,7 +88,11 @@ def main():
         # không cần gọi gì thêm vì renderer đã có handler trong file gốc
 
     import pyglet
-    pyglet.app.run()
+    try:
+        pyglet.app.run()
+    finally:
+        if ren._sim is not None:
+            ren._sim.stop()
 
 if __name__ == "__main__":
     main()
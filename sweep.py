@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Điểm vào quét tham số: nhiều seed / số UE / tham số kênh trên một YAML nền,
+chạy headless song song, gom thống kê mọi lượt vào một file JSONL.
+
+Ví dụ:
+    python sweep.py --config configs/default.yaml --grid time.seed=1,2,3 --grid ue.count=100,1000 \\
+                    --set packet.gen_prob_per_step=0.1 --workers 4 --out artifacts/sweep.jsonl
+    python sweep.py --spec configs/sweeps/seeds.yaml
+"""
+from __future__ import annotations
+import argparse, sys
+
+import yaml
+
+from uwml.config import parse_override
+from uwml.sweep import expand_grid, load_sweep_spec, run_sweep, pooled_latency
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--spec",    default=None, help="file YAML đặc tả quét (base/grid/runs/set/steps/workers)")
+    ap.add_argument("--config",  default=None, help="YAML nền (ghi đè 'base' của spec)")
+    ap.add_argument("--grid",    action="append", default=[],
+                    help="trục quét dạng khóa=v1,v2,... (lặp lại được)")
+    ap.add_argument("--set",     action="append", default=[],
+                    help="override chung dạng khóa=giá_trị (lặp lại được)")
+    ap.add_argument("--steps",   type=int, default=None, help="ghi đè số bước mỗi lượt")
+    ap.add_argument("--workers", type=int, default=None, help="số tiến trình song song (mặc định: số CPU)")
+    ap.add_argument("--out",     default="sweep_results.jsonl", help="file JSONL gom kết quả")
+    args = ap.parse_args()
+
+    spec = load_sweep_spec(args.spec) if args.spec else {}
+    base = args.config or spec.get("base", "configs/default.yaml")
+
+    grid = dict(spec.get("grid") or {})
+    for g in args.grid:
+        key, vals = parse_override(g)
+        grid[key] = vals if isinstance(vals, list) else [yaml.safe_load(v) for v in str(vals).split(",")]
+    common = dict(spec.get("set") or {})
+    common.update(parse_override(s) for s in args.set)
+
+    runs = expand_grid(grid, spec.get("runs"), common)
+    steps = args.steps if args.steps is not None else spec.get("steps")
+    workers = args.workers if args.workers is not None else spec.get("workers")
+
+    print(f"Sweep: {len(runs)} runs on {base} -> {args.out}")
+    n_ok, n_fail = run_sweep(base, runs, args.out, workers=workers, steps=steps)
+    print(f"Done: {n_ok} ok, {n_fail} failed. Wrote {args.out}")
+    sk = pooled_latency(args.out) if n_ok else None
+    if sk is not None and sk.count:
+        pct = " ".join(f"{k}={v * 1e3:.3f}ms" for k, v in sk.percentiles().items())
+        print(f"Pooled latency over {sk.count} packets: {pct}")
+    sys.exit(1 if n_ok == 0 and n_fail else 0)
+
+
+if __name__ == "__main__":
+    main()
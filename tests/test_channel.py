@@ -19,3 +19,126 @@ def test_noise_bw_depends():
     n1 = noise_power_dbm(1e6,  cfg.channel.noise_figure_db)
     n2 = noise_power_dbm(8e6,  cfg.channel.noise_figure_db)
     assert n2 > n1
+
+def test_batch_matches_channel_sanity_values():
+    """Bản theo mảng khớp bản scalar và bảng in của tools/channel_sanity.py."""
+    import numpy as np
+    from uwml.channel import (pathloss_db, estimate_link_rate, compile_channel,
+                              pathloss_db_batch, estimate_link_rate_batch)
+
+    cfg = load_config('configs/default.yaml')
+    p = compile_channel(cfg.channel)
+    assert p.noise_dbm == noise_power_dbm(cfg.channel.bandwidth_hz, cfg.channel.noise_figure_db)
+
+    # Bảng pathloss của channel_sanity.py (in với 2 chữ số thập phân)
+    ds = [1, 5, 10, 50, 100]
+    pl = pathloss_db_batch(ds, p)
+    assert [f"{v:.2f}" for v in pl] == ["30.00", "44.68", "51.00", "65.68", "72.00"]
+    assert list(pl) == [pathloss_db(d, cfg.channel) for d in ds]
+
+    # Bảng link rate của channel_sanity.py (Mbps, 3 chữ số thập phân)
+    ds = [5, 10, 50, 100]
+    src = np.zeros((len(ds), 3))
+    dst = np.array([[d, 0, 0] for d in ds], dtype=float)
+    r = estimate_link_rate_batch(src, dst, p)
+    assert [f"{v:.3f}" for v in r] == ["64.223", "58.973", "46.783", "41.533"]
+    assert list(r) == [estimate_link_rate([0, 0, 0], [d, 0, 0], cfg.channel) for d in ds]
+
+def test_batch_matches_scalar_random_links():
+    import numpy as np
+    from uwml.channel import estimate_link_rate, compile_channel, estimate_link_rate_batch
+
+    cfg = load_config('configs/default.yaml')
+    rng = np.random.default_rng(0)
+    src = rng.uniform(-200, 200, (500, 3))
+    dst = rng.uniform(-200, 200, (500, 3))
+    for model in ('log_distance', 'fspl'):
+        cfg.channel.model = model
+        cfg.channel.carrier_hz = float(cfg.channel.carrier_hz)
+        r = estimate_link_rate_batch(src, dst, compile_channel(cfg.channel))
+        ref = [estimate_link_rate(a, b, cfg.channel) for a, b in zip(src, dst)]
+        # Khác biệt chỉ ở mức làm tròn float64 (math.log10 vs np.log10)
+        assert np.allclose(r, ref, rtol=1e-12, atol=0)
+
+def test_tx_power_from_config_scalar_and_batch_agree():
+    """channel.tx_power_dbm được dùng (my_config.yaml: 18 dBm thay cho 20 dBm cố định trước đây)."""
+    import numpy as np
+    from uwml.channel import estimate_link_rate, estimate_link_rate_batch
+    from uwml.schema import compile_config
+
+    cfg = load_config('configs/my_config.yaml')
+    assert cfg.channel.tx_power_dbm == 18.0
+    ds = [5, 10, 50, 100]
+    src = np.zeros((len(ds), 3))
+    dst = np.array([[d, 0, 0] for d in ds], dtype=float)
+    r = estimate_link_rate_batch(src, dst, compile_config(cfg).channel)
+    ref = [estimate_link_rate([0, 0, 0], [d, 0, 0], cfg.channel) for d in ds]
+    assert np.allclose(r, ref, rtol=1e-12, atol=0)
+    # Giá trị tham chiếu mới (với 20 dBm: 64.223, 58.973, 46.783, 41.533)
+    assert [f"{v:.3f}" for v in r] == ["62.562", "57.312", "45.122", "39.872"]
+
+def test_rate_table_within_validated_error():
+    """Bảng tra khoảng cách → tốc độ: sai số ≤ rel_tol, ngoài dải rơi về công thức chính xác."""
+    import numpy as np
+    from uwml.channel import RateTable, compile_channel, estimate_link_rate_batch
+
+    cfg = load_config('configs/default.yaml')
+    p = compile_channel(cfg.channel)
+    t = RateTable(p, d_max=300.0, rel_tol=1e-4)
+    assert t.max_rel_err <= 1e-4 and t.bins_per_octave & (t.bins_per_octave - 1) == 0
+    rng = np.random.default_rng(1)
+    src = rng.uniform(-400, 400, (2000, 3)).astype(np.float32)
+    dst = rng.uniform(-120, 120, (2000, 3)).astype(np.float32)
+    src[0] = dst[0]                                # d = 0 → kẹp như pathloss_db
+    exact = estimate_link_rate_batch(src, dst, p)
+    approx = t.rate_between(src, dst)
+    far = np.linalg.norm(dst - src, axis=1) > 300.0
+    assert far.any() and np.allclose(approx[far], exact[far], rtol=1e-6)
+    assert np.max(np.abs(approx - exact) / exact) <= 1e-4
+
+def test_interference_sinr_matches_pairwise_sum():
+    """SINR có giao thoa = S / (Σ UAV khác cùng kênh + N); mỗi UAV một kênh → về SNR không giao thoa."""
+    import numpy as np
+    from uwml.channel import (compile_channel, interference_sinr_db, pathloss_db_batch,
+                              uav_channel_groups)
+
+    p = compile_channel(load_config('configs/default.yaml').channel)
+    rng = np.random.default_rng(2)
+    ue = rng.uniform(-120, 120, (300, 3))
+    ue[:, 2] = 0.0
+    uav = rng.uniform(-100, 100, (5, 3))
+    uav[:, 2] = 60.0
+    d = np.linalg.norm(ue[:, None] - uav[None], axis=2)
+    k = d.argmin(axis=1)
+    g = uav_channel_groups(5, num_channels=2)
+    rx = 10 ** ((p.tx_dbm - pathloss_db_batch(d, p)) / 10)
+    same = (g[None, :] == g[k][:, None]) & (np.arange(5)[None, :] != k[:, None])
+    ref = 10 * np.log10(rx[np.arange(300), k] / ((rx * same).sum(1) + 10 ** (p.noise_dbm / 10)))
+    assert np.allclose(interference_sinr_db(ue, uav, k, g, p, chunk_elems=64), ref, rtol=0, atol=1e-9)
+
+    snr = p.tx_dbm - pathloss_db_batch(d[np.arange(300), k], p) - p.noise_dbm
+    assert np.allclose(interference_sinr_db(ue, uav, k, np.arange(5), p), snr, rtol=0, atol=1e-9)
+
+def test_shadowing_field_and_fading_statistics():
+    """Trường shadowing: đúng độ lệch chuẩn, tương quan theo khoảng cách, dùng chung qua cache;
+    fading Rayleigh/Rician có công suất trung bình 1."""
+    import numpy as np
+    from uwml.channel import ShadowingField, fading_gain_db
+
+    bounds = [-200, 200, -200, 200, 0, 100]
+    f = ShadowingField(bounds, std_db=8.0, corr_m=20.0, res_m=4.0, seed=3)
+    assert abs(f.grid.std() - 8.0) < 1e-9 and not f.grid.flags.writeable
+    assert ShadowingField(bounds, 8.0, 20.0, 4.0, seed=3).grid is f.grid
+    g = f.grid
+    near = np.corrcoef(g[:, :-1].ravel(), g[:, 1:].ravel())[0, 1]
+    far = np.corrcoef(g[:, :-25].ravel(), g[:, 25:].ravel())[0, 1]
+    assert near > 0.7 and abs(far) < 0.3
+    # Tại nút lưới nội suy song tuyến trả đúng giá trị nút; ngoài vùng kẹp về biên
+    pts = np.array([[-200.0, -200.0, 0.0], [-196.0, -192.0, 5.0], [900.0, 900.0, 0.0]])
+    assert np.allclose(f.sample(pts), [g[0, 0], g[2, 1], g[-1, -1]])
+
+    rng = np.random.default_rng(0)
+    for model in ('rayleigh', 'rician'):
+        lin = 10 ** (fading_gain_db(rng, 200000, model, k_factor_db=6.0) / 10)
+        assert abs(lin.mean() - 1.0) < 0.01
+    assert not fading_gain_db(rng, 5, 'none').any()
@@ -12,3 +12,30 @@ def test_config_sections():
     # Các phần tùy chọn nhưng được kỳ vọng có trong mẫu mặc định
     for sec in ('time', 'hardware', 'uav', 'ue', 'viz'):
         assert hasattr(cfg, sec)
+
+def test_overrides_and_grid_expansion():
+    from uwml.config import apply_overrides, parse_override
+    from uwml.sweep import expand_grid
+
+    cfg = load_config('configs/default.yaml')
+    apply_overrides(cfg, dict([parse_override('ue.count=7'), parse_override('queue.depth=3')]))
+    assert cfg.ue.count == 7 and cfg.queue.depth == 3
+
+    runs = expand_grid({'time.seed': [1, 2], 'ue.count': [10, 20]},
+                       runs=[{'a': 1}, {'a': 2}], common={'b': 0})
+    assert len(runs) == 8
+    assert runs[0] == {'b': 0, 'a': 1, 'time.seed': 1, 'ue.count': 10}
+
+
+def test_sweep_records_failures(tmp_path):
+    import json
+    from uwml.sweep import run_sweep
+
+    out = tmp_path / 'sweep.jsonl'
+    runs = [{'ue.count': 20}, {'system.engine': 'khong_co'}]
+    n_ok, n_fail = run_sweep('configs/default.yaml', runs, str(out), workers=2, steps=3, echo=None)
+    assert (n_ok, n_fail) == (1, 1)
+    recs = sorted((json.loads(l) for l in out.read_text(encoding='utf-8').splitlines()),
+                  key=lambda r: r['run'])
+    assert recs[0]['ok'] and recs[0]['stats']['step'] == 3
+    assert not recs[1]['ok'] and 'engine' in recs[1]['error']
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử engine hướng sự kiện ("event"):
+- Kẹp biên dạng đóng (clamped_walk_1d) khớp vòng lặp kẹp từng bước
+- Thống kê tương đương engine theo bước (cùng phân phối), bảo toàn gói khi có hàng đợi
+"""
+import numpy as np
+from uwml.config import load_config
+from uwml.physics import clamped_walk_1d
+from uwml.runner import run_headless
+
+
+def test_clamped_walk_matches_stepwise_clip():
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        d = rng.normal(rng.normal(0, 0.2), 1.0, rng.integers(1, 3000))
+        x = ref = rng.uniform(-5, 5)
+        for v in d:
+            ref = min(max(ref + v, -10.0), 10.0)
+        assert np.isclose(clamped_walk_1d(x, d, -10.0, 10.0), ref, atol=1e-9)
+
+
+def test_event_engine_matches_step_engine_statistics():
+    out = {}
+    for eng in ("soa", "event"):
+        cfg = load_config('configs/default.yaml')
+        cfg.system.engine = eng
+        cfg.queue.enabled = True
+        w, out[eng] = run_headless(cfg, steps=300)
+    a, b = out["soa"], out["event"]
+    assert b["time_s"] == a["time_s"] and b["step"] == a["step"]
+    # 120 UE × 300 bước × p=0.2 → ~7200 gói; sai khác chỉ do nhiễu thống kê
+    assert abs(b["enqueued"] - a["enqueued"]) < 0.05 * a["enqueued"]
+    assert np.isclose(b["avg_latency_s"], a["avg_latency_s"], rtol=0.1)
+    # Gói còn thiếu chỉ có thể là gói đang truyền dở (tối đa một gói mỗi node)
+    in_service = b["enqueued"] - b["dequeued"] - b["dropped"] - b["queued"]
+    assert 0 <= in_service <= cfg.uav.count + 1
+    assert b["packets_total"] == b["dequeued"]
+
+    bnd = np.asarray(cfg.world.bounds, dtype=np.float32)
+    P = w.ue_positions()
+    assert np.all((P[:, 0] >= bnd[0]) & (P[:, 0] <= bnd[1]) & (P[:, 1] >= bnd[2]) & (P[:, 1] <= bnd[3]))
+    assert len(w.attachment().uav_id) == len(w.ue)
+
+
+def test_event_engine_packet_buffer_stays_bounded(monkeypatch):
+    from uwml.des import EventEngine
+    from uwml.world import World
+    peak = []
+    deliver = EventEngine._deliver
+
+    def tracked(self, n, pkt, t_done):
+        deliver(self, n, pkt, t_done)
+        peak.append(len(self._log))
+
+    monkeypatch.setattr(EventEngine, "_deliver", tracked)
+    cfg = load_config('configs/default.yaml')
+    cfg.system.engine = "event"
+    cfg.queue.enabled = True
+    cfg.packet.max_log = 256
+    w = World(cfg)
+    w.spawn()
+    w.run(400)   # một lần advance phủ cả lượt: ~9600 gói
+    st = w.stats
+    assert st.dequeued > 10 * cfg.packet.max_log
+    # Bộ đệm chờ được đẩy vào PacketLog mỗi khi đủ một vòng đệm, không đợi hết advance
+    assert max(peak) < cfg.packet.max_log
+    assert w.packets.total == st.dequeued
+    assert int(st.latency_sketch.counts.sum()) == st.count_latency
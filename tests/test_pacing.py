@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử điều nhịp RTF trong renderer (PacingController, không cần cửa sổ)."""
+from uwml.config import load_config
+from uwml.world import World
+from uwml.pacing import PacingController
+
+
+def test_rtf_steps_per_frame_and_budget():
+    pc = PacingController(dt=0.1, rtf=2.0, budget_s=0.010)
+    # 2× thời gian thực, 60 khung/s trong 3 s → 60 bước (nợ lẻ mang sang khung sau)
+    n = sum(pc.plan(1 / 60, 0) for _ in range(180))
+    assert 59 <= n <= 60
+
+    # Bước nặng 5 ms, ngân sách 10 ms → tối đa 2 bước/khung dù RTF đặt rất cao
+    pc.rtf = 1000.0
+    pc.record(4, 0.020)
+    assert pc.plan(1 / 60, 0) == 2
+    pc.rtf = 0.0   # nhanh nhất có thể: lấp đầy ngân sách
+    assert pc.plan(1 / 60, 0) == 2
+
+
+def test_tick_honours_max_steps():
+    cfg = load_config('configs/default.yaml')
+    w = World(cfg); w.spawn()
+    pc = PacingController(dt=cfg.system.dt, rtf=0.0, budget_s=1.0, max_steps=25)
+    for _ in range(10):
+        pc.tick(w, 1 / 60)
+    assert w.stats.step == 25 and pc.done
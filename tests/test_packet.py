@@ -24,3 +24,55 @@ def test_packet_logging():
     assert isinstance(p, Packet)
     for attr in ('size_bytes', 'priority', 'src_id', 'dst_id', 'timestamp'):
         assert hasattr(p, attr)
+
+
+def test_packet_log_ring_and_spill(tmp_path):
+    import numpy as np
+    from uwml.packetlog import PacketLog, load_spill
+
+    path = tmp_path / 'packets.bin'
+    log = PacketLog(capacity=7, spill_path=str(path))
+    rng = np.random.default_rng(0)
+    n = 0
+    for k in rng.integers(0, 12, 40):   # lô có lúc lớn hơn cả vòng đệm
+        ids = np.arange(n, n + k)
+        log.extend(1200, 1, ids, ids % 3, ids * 0.1, 50.0, 1e-4)
+        n += k
+    log.append(Packet(1200, 2, n, 1, n * 0.1, 40.0, 2e-4))
+    n += 1
+
+    # Vòng đệm chỉ giữ 7 gói mới nhất; phần tử cuối là Packet đầy đủ trường
+    assert len(log) == 7 and log.total == n
+    assert log[-1].src_id == n - 1 and log[-1].priority == 2
+    assert [p.src_id for p in log] == list(range(n - 7, n))
+
+    # Spill + vòng đệm = toàn bộ lịch sử theo đúng thứ tự
+    assert np.array_equal(log.history()['src_id'], np.arange(n))
+    log.close()
+    assert np.array_equal(load_spill(str(path))['src_id'], np.arange(n))
+
+
+
+def test_run_headless_flushes_spill_when_a_step_raises(tmp_path, monkeypatch):
+    import pytest
+    from uwml import runner
+    from uwml.packetlog import load_spill
+
+    worlds = []
+
+    class FailingWorld(World):
+        def run(self, steps, dt=None):
+            super().run(steps, dt)
+            worlds.append(self)
+            raise RuntimeError("bước lỗi")
+
+    monkeypatch.setattr(runner, "World", FailingWorld)
+    cfg = load_config('configs/default.yaml')
+    cfg.packet.spill_path = str(tmp_path / 'packets.bin')
+    cfg.packet.max_log = 4
+    with pytest.raises(RuntimeError):
+        runner.run_headless(cfg, steps=200)
+    # Mọi gói sinh trước khi lỗi (cả phần còn trong vòng đệm) đã nằm trong file spill
+    total = worlds[0].packets.total
+    assert total > 4
+    assert len(load_spill(cfg.packet.spill_path)) == total
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử đo thời gian theo pha của World.step (World.profile)."""
+from uwml.config import load_config
+from uwml.world import World
+
+
+def test_profile_phases_counted_only_when_enabled():
+    cfg = load_config('configs/default.yaml')
+    w = World(cfg)
+    w.spawn()
+
+    # Mặc định tắt: không ghi nhận gì
+    for _ in range(3):
+        w.step(cfg.system.dt)
+    assert w.profile.as_dict() == {}
+
+    w.profile.enabled = True
+    for _ in range(5):
+        w.step(cfg.system.dt)
+    prof = w.profile.as_dict()
+    for phase in ('mobility', 'attach', 'traffic'):
+        assert prof[phase]['calls'] == 5
+        assert prof[phase]['total_s'] >= 0.0
+    assert abs(sum(p['share'] for p in prof.values()) - 1.0) < 1e-9
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử hàng đợi theo mảng: tail-drop, phục vụ theo ưu tiên, không ngắt qua ranh giới bước."""
+import numpy as np
+from uwml.queueing import NodeQueues
+from uwml.config import load_config
+from uwml.runner import run_headless
+
+
+def test_priority_service_drop_and_carry_over():
+    q = NodeQueues(n_nodes=2, num_priorities=2, capacity=3)
+    # node 1: 4 gói ưu tiên 1 (gói cuối bị rơi) + 1 gói ưu tiên 0; mỗi gói truyền 0.04 s
+    ok = q.enqueue([1, 1, 1, 1, 1], [1, 1, 1, 1, 0], 0.0, 0.04, [10, 11, 12, 13, 14], 100, 1.0)
+    assert ok.tolist() == [True, True, True, False, True]
+    assert q.backlog() == 4
+
+    d = q.serve(0.0, 0.1)
+    # Ưu tiên 0 trước, rồi FIFO; gói thứ 3 bắt đầu ở 0.08 < 0.1 nên vẫn truyền xong (tới 0.12)
+    assert d.src_id.tolist() == [14, 10, 11]
+    assert np.allclose(d.latency_s, [0.04, 0.08, 0.12])
+    assert q.backlog() == 1 and np.isclose(q.free_at[1], 0.12)
+
+    d = q.serve(0.1, 0.2)
+    assert d.src_id.tolist() == [12] and np.isclose(d.depart_s[0], 0.16)
+    assert q.serve(0.2, 0.3) is None
+
+
+def test_world_queue_overload_drops_and_conserves_packets():
+    cfg = load_config('configs/default.yaml')
+    cfg.queue.enabled = True
+    cfg.queue.capacity = 4
+    _, st = run_headless(cfg, steps=30)
+    assert st["dropped"] > 0
+    assert st["enqueued"] == st["dequeued"] + st["dropped"] + st["queued"]
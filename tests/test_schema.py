@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử biên dịch cấu hình: khóa gõ sai bị bắt, fallback và hằng số dẫn xuất tính một lần."""
+import math
+import pytest
+from uwml.config import load_config, apply_overrides
+from uwml.channel import noise_power_dbm, pathloss_db, pathloss_db_batch
+from uwml.schema import ConfigError, compile_config
+from uwml.world import World
+
+
+def test_typo_and_range_errors_are_reported_together():
+    cfg = load_config('configs/default.yaml')
+    apply_overrides(cfg, {'channel.pathlos_exp': 3.0, 'packet.gen_prob_per_step': 1.5})
+    with pytest.raises(ConfigError) as ei:
+        World(cfg)
+    msg = str(ei.value)
+    assert "'pathloss_exp'" in msg and 'gen_prob_per_step' in msg
+    assert len(ei.value.problems) == 2
+
+
+def test_fallbacks_and_derived_constants():
+    cfg = load_config('configs/default.yaml')
+    del cfg.ue.count, cfg.ue.speed_mps
+    cfg.mobility = type(cfg)(ue_speed_mps=1.25)
+    cfg.channel.bandwidth_hz = '1.0e6'   # PyYAML đọc số mũ không dấu là chuỗi
+    cc = compile_config(cfg)
+    assert cc.n_ue == cfg.world.n_ue and cc.ue_speed_mps == 1.25 and cc.ue_turn_std_deg == 25.0
+    assert cc.size_bits == cfg.packet.size_bytes * 8.0
+    assert cc.channel.noise_dbm == noise_power_dbm(1e6, cfg.channel.noise_figure_db)
+    # Offset pathloss gộp sẵn vẫn khớp công thức gốc PL_ref + 10·n·log10(d/d_ref)
+    cfg.channel.ref_distance_m = 10.0
+    ch = compile_config(cfg).channel
+    want = cfg.channel.ref_pathloss_db + 10 * cfg.channel.pathloss_exp * math.log10(250.0 / 10.0)
+    assert pathloss_db_batch([250.0], ch)[0] == pytest.approx(want, abs=1e-9)
+    assert pathloss_db(250.0, cfg.channel) == pytest.approx(want, abs=1e-9)
+
+
+def test_mem_gb_stays_integer():
+    cc = compile_config(load_config('configs/default.yaml'))
+    assert cc.hardware[2] == 16 and isinstance(cc.hardware[2], int)
+    assert f"{cc.hardware[2]}GB" == "16GB"
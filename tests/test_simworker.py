@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử chạy mô phỏng trong worker (thread/process) với bộ đệm đôi ảnh chụp."""
+import time
+import numpy as np
+import pytest
+from uwml.config import load_config
+from uwml.world import World
+from uwml.simworker import SimWorker
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_worker_matches_inline_run(mode):
+    cfg = load_config('configs/default.yaml')
+    w = World(cfg); w.spawn()
+    sw = SimWorker(w, mode, rtf=0, max_steps=50).start()
+    try:
+        t0 = time.perf_counter()
+        while not sw.done and time.perf_counter() - t0 < 30:
+            time.sleep(0.01)
+        sw.interpolate = False
+        v = sw.view()
+    finally:
+        sw.stop()
+
+    ref = World(load_config('configs/default.yaml')); ref.spawn(); ref.run(50)
+    assert v.stats.step == 50
+    assert v.stats.enqueued == ref.stats.enqueued
+    assert np.allclose(v.ue_positions(), ref.ue_positions(), atol=1e-4)
+    assert np.array_equal(v.attachment().uav_idx, ref.attachment().uav_idx)
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử sketch phân vị độ trễ: sai số tương đối, gộp từng phần = cả khối, tuần tự hóa JSON."""
+import json
+import numpy as np
+from uwml.sketch import LatencySketch
+
+
+def test_quantiles_within_relative_accuracy_and_mergeable():
+    rng = np.random.default_rng(0)
+    x = rng.lognormal(-6.0, 1.0, 200_000)
+    whole = LatencySketch()
+    whole.add(x)
+    for q in (0.5, 0.95, 0.99):
+        exact = np.quantile(x, q, method="lower")
+        assert abs(whole.quantile(q) - exact) <= 0.011 * exact
+
+    parts = [LatencySketch() for _ in range(4)]
+    for sk, chunk in zip(parts, np.array_split(x, 4)):
+        sk.add(chunk)
+    merged = LatencySketch.from_dict(json.loads(json.dumps(parts[0].to_dict())))
+    for sk in parts[1:]:
+        merged.merge(sk)
+    assert merged == whole and merged.count == len(x)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử engine "soa" (structure-of-arrays):
+- Vị trí UE/UAV vẫn nằm trong bounds sau nhiều bước
+- world.ue[i].pos là view vào mảng liền khối (đọc/ghi xuyên suốt)
+"""
+import numpy as np
+from uwml.config import load_config
+from uwml.world import World
+
+
+def _soa_world():
+    cfg = load_config('configs/default.yaml')
+    w = World(cfg, engine="soa")
+    w.spawn()
+    return cfg, w
+
+
+def test_soa_within_bounds_and_attached():
+    cfg, w = _soa_world()
+    for _ in range(50):
+        w.step(cfg.system.dt)
+
+    b = np.asarray(cfg.world.bounds, dtype=np.float32)
+    for P in (w.ue_soa.pos, w.uav_soa.pos):
+        assert np.all(P[:, 0] >= b[0]) and np.all(P[:, 0] <= b[1])
+        assert np.all(P[:, 1] >= b[2]) and np.all(P[:, 1] <= b[3])
+        assert np.all(P[:, 2] >= b[4]) and np.all(P[:, 2] <= b[5])
+    assert len(w.ue) == cfg.ue.count
+    assert all(u.attached_uav_id is not None for u in w.ue)
+
+
+def test_soa_views_share_memory():
+    _, w = _soa_world()
+    u = w.ue[-1]
+    assert np.shares_memory(u.pos, w.ue_soa.pos)
+
+    u.pos = [1.0, 2.0, 0.0]
+    assert np.allclose(w.ue_soa.pos[-1], [1.0, 2.0, 0.0])
+    assert w.uav[0].id == 1 and w.uav[0]._way_idx == 0
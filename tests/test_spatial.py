@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử chỉ mục lưới đều (UniformGrid): khớp chính xác với vét cạn."""
+import numpy as np
+from uwml.attach import nearest_brute, knearest_brute
+from uwml.spatial import UniformGrid
+
+
+def _scene(seed, n_ue=3000, n_uav=200, half=2000.0):
+    rng = np.random.default_rng(seed)
+    ue = np.zeros((n_ue, 3), np.float32)
+    ue[:, :2] = rng.uniform(-half, half, (n_ue, 2))
+    uav = np.zeros((n_uav, 3), np.float32)
+    uav[:, :2] = rng.uniform(-0.7 * half, 0.7 * half, (n_uav, 2))  # UE nằm cả ngoài lưới UAV
+    uav[:, 2] = rng.uniform(40, 120, n_uav)
+    return ue, uav
+
+
+def test_grid_nearest_matches_brute():
+    for seed in range(3):
+        ue, uav = _scene(seed)
+        gi, gd = UniformGrid(uav).nearest(ue)
+        bi, bd = nearest_brute(ue, uav)
+        assert np.array_equal(gi, bi)
+        assert np.array_equal(gd, bd)
+
+
+def test_grid_knearest_matches_brute():
+    ue, uav = _scene(7, n_ue=500, n_uav=60)
+    gi, gd = UniformGrid(uav).knearest(ue, 4)
+    bi, bd = knearest_brute(ue, uav, 4)
+    assert np.array_equal(gi, bi)
+    assert np.allclose(gd, bd)
+
+
+def test_grid_degenerate_layouts_match_brute():
+    """UAV thẳng hàng (x = 0) hoặc trùng một điểm: lưới không bùng nổ số ô, kết quả vẫn khớp vét cạn."""
+    ue, _ = _scene(11, n_ue=2000, n_uav=1, half=600.0)
+    line = np.zeros((64, 3), np.float32)
+    line[:, 1] = np.linspace(-500, 500, 64)
+    line[:, 2] = 60.0
+    point = np.tile(np.array([[10.0, -20.0, 60.0]], np.float32), (64, 1))
+    for uav in (line, point):
+        g = UniformGrid(uav)
+        assert g.nx * g.ny <= len(uav)
+        gi, gd = g.nearest(ue)
+        bi, bd = nearest_brute(ue, uav)
+        assert np.array_equal(gi, bi)
+        assert np.array_equal(gd, bd)
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử nhánh headless không nạp pyglet/OpenGL (import lười trong cli.py)."""
+import os, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_headless_entry_does_not_load_gui():
+    code = ("import sys, cli\n"
+            "from uwml.runner import run_headless\n"
+            "from uwml.config import load_config\n"
+            "run_headless(load_config('configs/default.yaml'), steps=3)\n"
+            "print(sorted(m for m in ('pyglet', 'OpenGL') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử telemetry: số mẫu theo K, tổng các chênh lệch khớp thống kê cuối, cả hai định dạng."""
+import json
+import numpy as np
+from uwml.config import load_config, apply_overrides
+from uwml.runner import run_headless
+
+
+def test_telemetry_jsonl_and_npz(tmp_path):
+    for name in ("tel.jsonl", "tel.npz"):
+        cfg = load_config('configs/default.yaml')
+        path = str(tmp_path / name)
+        apply_overrides(cfg, {"telemetry.path": path, "telemetry.every": 25})
+        w, st = run_headless(cfg, steps=110)
+        if name.endswith(".jsonl"):
+            rows = [json.loads(l) for l in open(path, encoding="utf-8")]
+            steps = [r["step"] for r in rows]
+            d_enq = sum(r["d_enqueued"] for r in rows)
+            load = np.asarray(rows[-1]["load"])
+        else:
+            z = np.load(path)
+            steps, d_enq, load = z["step"].tolist(), int(z["d_enqueued"].sum()), z["load"][-1]
+        assert steps == [25, 50, 75, 100, 110]
+        assert d_enq == st["enqueued"]
+        assert len(load) == len(w.uav) + 1 and load.sum() == len(w.ue)
+
+
+def _reject_constant(name):
+    raise ValueError(f"giá trị JSON không chuẩn: {name}")
+
+
+def test_telemetry_jsonl_is_strict_json_when_intervals_are_empty(tmp_path):
+    cfg = load_config('configs/default.yaml')
+    path = str(tmp_path / "tel.jsonl")
+    # Tải thưa, lấy mẫu mỗi bước: nhiều khoảng không có gói nào
+    apply_overrides(cfg, {"telemetry.path": path, "telemetry.every": 1, "packet.gen_prob_per_step": 0.002,
+                          "queue.enabled": False})
+    run_headless(cfg, steps=60)
+    rows = [json.loads(l, parse_constant=_reject_constant) for l in open(path, encoding="utf-8")]
+    lat = [r["mean_latency_s"] for r in rows]
+    assert None in lat and any(isinstance(v, float) for v in lat)
+
+
+def test_telemetry_npz_forced_on_path_without_suffix(tmp_path):
+    cfg = load_config('configs/default.yaml')
+    path = tmp_path / "tel.bin"
+    apply_overrides(cfg, {"telemetry.path": str(path), "telemetry.every": 25, "telemetry.format": "npz"})
+    run_headless(cfg, steps=60)
+    assert path.exists() and not (tmp_path / "tel.bin.npz").exists()
+    assert np.load(str(path))["step"].tolist() == [25, 50, 60]
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử tầng traffic theo lô: thống kê khớp vòng lặp tham chiếu từng gói
+(Bernoulli mỗi UE + estimate_link_rate scalar) với cùng seed.
+"""
+import copy
+import numpy as np
+from uwml.config import load_config
+from uwml.world import World
+from uwml.channel import estimate_link_rate
+
+
+def test_batched_traffic_matches_scalar_reference():
+    cfg = load_config('configs/default.yaml')
+    w = World(cfg)
+    w.spawn()
+    p = cfg.packet.gen_prob_per_step
+    size_bits = cfg.packet.size_bytes * 8.0
+
+    enq, sum_lat, max_lat = 0, 0.0, 0.0
+    for _ in range(40):
+        rng = copy.deepcopy(w.rng_traffic)   # cùng trạng thái luồng traffic trước bước
+        w.step(cfg.system.dt)
+        draws = rng.random(len(w.ue))
+        for j, u in enumerate(w.ue):
+            if draws[j] < p:
+                rate = estimate_link_rate(u.pos, w.attach.dst_pos[j], cfg.channel)
+                tx = size_bits / max(1e-6, rate * 1e6)
+                enq += 1
+                sum_lat += tx
+                max_lat = max(max_lat, tx)
+
+    assert w.stats.enqueued == w.stats.dequeued == w.stats.count_latency == enq
+    assert np.isclose(w.stats.sum_latency_s, sum_lat, rtol=1e-9, atol=0)
+    assert np.isclose(w.stats.max_latency_s, max_lat, rtol=1e-12, atol=0)
+
+    # Gói cuối trong log mang rate/latency của lô cuối
+    last = w.packets[-1]
+    assert np.isclose(last.latency_s, size_bits / (last.rate_mbps * 1e6), rtol=1e-5)
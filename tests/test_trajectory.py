@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Kiểm thử ghi quỹ đạo memmap và FrameView cho replay."""
+import numpy as np
+from uwml.config import load_config, apply_overrides
+from uwml.runner import run_headless
+from uwml.trajectory import TrajectoryReader
+
+
+def test_record_and_read_frames(tmp_path):
+    cfg = load_config('configs/default.yaml')
+    path = str(tmp_path / "run.traj")
+    apply_overrides(cfg, {"trajectory.path": path, "trajectory.every": 10})
+    w, st = run_headless(cfg, steps=45)
+
+    tr = TrajectoryReader(path)
+    assert len(tr) == 6   # khung 0 + bước 10, 20, 30, 40, 45
+    assert [int(s) for s in tr.frames["step"]] == [0, 10, 20, 30, 40, 45]
+    last = tr.frame(-1 + len(tr))
+    assert np.array_equal(last.ue_positions(), w.ue_positions())
+    assert np.array_equal(last.attachment().dst_pos, w.attachment().dst_pos)
+    assert last.stats.enqueued == st["enqueued"]
+    assert np.isclose(last.stats.latency_sketch.percentiles()["p99"], st["latency_p99_s"])
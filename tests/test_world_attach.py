@@ -14,3 +14,24 @@ def test_attach_nearest_after_steps():
 
     assert len(w.ue) > 0
     assert all(u.attached_uav_id is not None for u in w.ue)
+
+
+def test_batched_attach_matches_per_ue_loop():
+    import numpy as np
+    from uwml.attach import attach_nearest
+
+    cfg = load_config('configs/default.yaml')
+    w = World(cfg)
+    w.spawn()
+    for _ in range(5):
+        w.step(cfg.system.dt)
+
+    # Chunk rất nhỏ để buộc chia nhiều khối
+    att = attach_nearest(w.ue_positions(), w.uav_positions(), w.uav_ids(),
+                         w.bs.pos, chunk_elems=7)
+    for j, u in enumerate(w.ue):
+        d = [float(np.linalg.norm(a.pos - u.pos)) for a in w.uav]
+        k = int(np.argmin(d))
+        assert att.uav_id[j] == w.uav[k].id == u.attached_uav_id
+        assert np.allclose(att.dst_pos[j], w.uav[k].pos)
+        assert abs(att.dist[j] - d[k]) < 1e-3
@@ -3,9 +3,12 @@
 - In bảng pathloss (dB) theo một vài khoảng cách
 - In noise(dBm) với BW/NF hiện tại
 - In ước lượng thông lượng (Mbps) ở một số d
+- So bản theo mảng (estimate_link_rate_batch) với bản scalar
 """
+import numpy as np
 from uwml.config import load_config
-from uwml.channel import pathloss_db, noise_power_dbm, estimate_link_rate
+from uwml.channel import (pathloss_db, noise_power_dbm, estimate_link_rate,
+                          compile_channel, estimate_link_rate_batch)
 
 # Nạp config mặc định
 cfg = load_config("configs/default.yaml")
@@ -27,3 +30,12 @@ print("\n== LinkRate (Mbps) ==")
 for d in [5, 10, 50, 100]:
     rate = estimate_link_rate([0, 0, 0], [d, 0, 0], cfg.channel)
     print(f"d={d:>3} m -> {rate:.3f} Mbps")
+
+# 4) Bản theo mảng: một lượt NumPy cho mọi khoảng cách, so với scalar
+params = compile_channel(cfg.channel)
+ds = [5, 10, 50, 100]
+rates = estimate_link_rate_batch(np.zeros((len(ds), 3)), [[d, 0, 0] for d in ds], params)
+print("\n== LinkRate batch (Mbps) ==")
+for d, r in zip(ds, rates):
+    diff = abs(r - estimate_link_rate([0, 0, 0], [d, 0, 0], cfg.channel))
+    print(f"d={d:>3} m -> {r:.3f} Mbps  (|batch - scalar| = {diff:.1e})")
@@ -11,6 +11,10 @@ python -m benchmarks.fw_bench --duration 5 --csv artifacts\results_fw_bench.csv
 REM Plot results
 python benchmarks\plot_results.py artifacts\results_fw_bench.csv
 
+REM Headless World.step benchmark + scaling plots
+python -m benchmarks.sim_bench --steps 50 --csv artifacts\results_sim_bench.csv
+python benchmarks\plot_results.py artifacts\results_sim_bench.csv
+
 REM Write PDF report
 python tools\write_report_pdf.py
 
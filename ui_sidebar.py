@@ -26,12 +26,15 @@ class Sidebar:
     PAD = 12
     WIDTH = 280  # bề rộng panel bên phải (px)
 
-    def __init__(self, win, world_ref, toggle_wires_fn, pause_resume_fn, back_fn):
+    def __init__(self, win, world_ref, toggle_wires_fn, pause_resume_fn, back_fn,
+                 pacer=None, pacing_changed_fn=None):
         self.win = win
         self.world_ref = world_ref  # hàm/lambda trả về world hiện tại
         self.toggle_wires = toggle_wires_fn
         self.pause_resume = pause_resume_fn
         self.back = back_fn
+        self.pacer = pacer  # uwml.pacing.PacingController (nếu có: hiện hàng nút RTF)
+        self.pacing_changed = pacing_changed_fn or (lambda: None)
 
         self.font_title = pyglet.text.Label(
             "Tiện ích", font_size=14, x=0, y=0, color=(255,255,255,255)
@@ -61,6 +64,22 @@ class Sidebar:
             Button(("⏸ Pause" if not self._paused else "▶ Resume"),
                    (x, y + 2*(h+gap), w, h), self.pause_resume),
         ]
+        if self.pacer is not None:
+            # Hàng nút tốc độ: chậm hơn / nhanh hơn / nhanh nhất ↔ 1×
+            bw = (w - 2*gap) // 3
+            yy = y + 3*(h+gap)
+            self.buttons += [
+                Button("◀◀ RTF", (x, yy, bw, h), self._pace(self.pacer.slower)),
+                Button("RTF ▶▶", (x + bw + gap, yy, bw, h), self._pace(self.pacer.faster)),
+                Button("Max" if self.pacer.rtf else "1x", (x + 2*(bw + gap), yy, bw, h),
+                       self._pace(self.pacer.toggle_max)),
+            ]
+
+    def _pace(self, fn):
+        def click():
+            fn()
+            self.pacing_changed()
+        return click
 
     def draw_panel_bg(self):
         # Vẽ nền mờ của sidebar
@@ -98,8 +117,11 @@ class Sidebar:
             f"Enq: {w.stats.enqueued}  Deq: {w.stats.dequeued}  Drop: {w.stats.dropped}",
             f"Avg latency: {(w.stats.sum_latency_s / max(1, w.stats.count_latency or 1)):.3f}s",
             f"Max latency: {w.stats.max_latency_s:.3f}s",
+            "P50/P95/P99: " + "/".join(f"{v * 1e3:.2f}" for v in w.stats.latency_sketch.percentiles().values()) + " ms",
             f"#UAV: {len(w.uav)}  #UE: {len(w.ue)}  #SAT: {len(w.sat)}",
         ]
+        if self.pacer is not None:
+            lines.append(f"RTF: {self.pacer.label()} → {self.pacer.achieved_rtf:.2f}x (sim-s / wall-s)")
         x = self.win.width - self.WIDTH + self.PAD
         y = self.win.height - self.PAD - 18
         # title
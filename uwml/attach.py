@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""Gán UE → UAV gần nhất theo lô (batched attachment).
+
+Tính ma trận khoảng cách UE×UAV một lần mỗi bước, chia khối (chunk) để
+giới hạn bộ nhớ tạm, trả về id UAV được gán, khoảng cách và vị trí đích
+dưới dạng mảng để tầng traffic và renderer cùng dùng lại.
+"""
+from __future__ import annotations
+import numpy as np
+from dataclasses import dataclass
+
+from .spatial import UniformGrid
+
+# Số phần tử (hàng × UAV) tối đa của một khối ma trận khoảng cách tạm
+DEFAULT_CHUNK_ELEMS = 1 << 20
+
+# Chỉ mục dùng cho truy vấn gần nhất: "brute" (ma trận khối), "grid" (UniformGrid),
+# "auto" chọn grid khi số UAV >= AUTO_GRID_MIN_TARGETS và số UE >= AUTO_GRID_MIN_POINTS
+# (điểm giao cắt đo bằng benchmarks/attach_bench.py: lưới tốn chi phí cố định theo số ô,
+# nên với ít UE thì vét cạn vẫn nhanh hơn)
+INDEXES = ("auto", "brute", "grid")
+AUTO_GRID_MIN_TARGETS = 48
+AUTO_GRID_MIN_POINTS = 2000
+
+
+@dataclass
+class Attachment:
+    """Kết quả gán của một bước.
+
+    - uav_idx: (N,) chỉ số UAV trong world.uav (-1 nếu không có UAV → BS)
+    - uav_id: (N,) id UAV được gán (0 nếu không có UAV)
+    - dist: (N,) khoảng cách Euclid tới đích (m)
+    - dst_pos: (N,3) vị trí đích (UAV gần nhất hoặc BS)
+    """
+    uav_idx: np.ndarray
+    uav_id: np.ndarray
+    dist: np.ndarray
+    dst_pos: np.ndarray
+
+
+def nearest_brute(points, targets, chunk_elems: int = DEFAULT_CHUNK_ELEMS):
+    """Tìm target gần nhất cho từng điểm bằng vét cạn theo khối.
+
+    Args:
+        points: (N,3) tọa độ truy vấn.
+        targets: (M,3) tọa độ ứng viên, M >= 1.
+        chunk_elems: giới hạn N_khối·M cho ma trận tạm.
+
+    Returns:
+        (idx, dist): idx (N,) chỉ số target gần nhất (hòa → chỉ số nhỏ nhất),
+        dist (N,) khoảng cách tương ứng.
+    """
+    P = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+    T = np.asarray(targets, dtype=np.float32).reshape(-1, 3)
+    n, m = len(P), len(T)
+    idx = np.empty(n, dtype=np.int64)
+    dist = np.empty(n, dtype=np.float32)
+    rows = max(1, int(chunk_elems) // max(1, m))
+    for s in range(0, n, rows):
+        diff = P[s:s + rows, None, :] - T[None, :, :]
+        d2 = np.einsum("ijk,ijk->ij", diff, diff)
+        k = np.argmin(d2, axis=1)
+        idx[s:s + rows] = k
+        dist[s:s + rows] = np.sqrt(d2[np.arange(len(k)), k])
+    return idx, dist
+
+
+def knearest_brute(points, targets, k: int = 1, chunk_elems: int = DEFAULT_CHUNK_ELEMS):
+    """k target gần nhất cho từng điểm bằng vét cạn theo khối: (idx (N,k), dist (N,k))."""
+    P = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+    T = np.asarray(targets, dtype=np.float32).reshape(-1, 3)
+    n, m = len(P), len(T)
+    k = min(int(k), m)
+    idx = np.empty((n, k), dtype=np.int64)
+    dist = np.empty((n, k), dtype=np.float32)
+    rows = max(1, int(chunk_elems) // max(1, m))
+    for s in range(0, n, rows):
+        diff = P[s:s + rows, None, :] - T[None, :, :]
+        d2 = np.einsum("ijk,ijk->ij", diff, diff)
+        sel = np.argsort(d2, axis=1, kind="stable")[:, :k]
+        idx[s:s + rows] = sel
+        dist[s:s + rows] = np.sqrt(np.take_along_axis(d2, sel, axis=1))
+    return idx, dist
+
+
+def resolve_index(index: str, n_targets: int, n_points: int = 0) -> str:
+    """Đổi "auto" thành "brute"/"grid" theo số target và số điểm truy vấn."""
+    if index not in INDEXES:
+        raise ValueError(f"attach.index không hợp lệ: {index!r} (chọn một trong {INDEXES})")
+    if index == "auto":
+        big = n_targets >= AUTO_GRID_MIN_TARGETS and n_points >= AUTO_GRID_MIN_POINTS
+        return "grid" if big else "brute"
+    return index
+
+
+def nearest(points, targets, index: str = "auto", chunk_elems: int = DEFAULT_CHUNK_ELEMS):
+    """Target gần nhất cho từng điểm, qua chỉ mục được chọn: (idx (N,), dist (N,))."""
+    if resolve_index(index, len(targets), len(points)) == "grid":
+        return UniformGrid(targets).nearest(points)
+    return nearest_brute(points, targets, chunk_elems)
+
+
+def knearest(points, targets, k: int = 1, index: str = "auto",
+             chunk_elems: int = DEFAULT_CHUNK_ELEMS):
+    """k target gần nhất cho từng điểm, qua chỉ mục được chọn: (idx (N,k), dist (N,k))."""
+    if resolve_index(index, len(targets), len(points)) == "grid":
+        return UniformGrid(targets).knearest(points, k)
+    return knearest_brute(points, targets, k, chunk_elems)
+
+
+def attach_nearest(ue_pos, uav_pos, uav_ids, bs_pos, chunk_elems: int = DEFAULT_CHUNK_ELEMS,
+                   index: str = "auto"):
+    """Gán mỗi UE về UAV gần nhất (không có UAV → BS, id 0).
+
+    Args:
+        ue_pos: (N,3) vị trí UE.
+        uav_pos: (M,3) vị trí UAV (M có thể bằng 0).
+        uav_ids: (M,) id của UAV.
+        bs_pos: (3,) vị trí trạm gốc.
+        chunk_elems: giới hạn khối cho vét cạn.
+        index: "auto" | "brute" | "grid".
+
+    Returns:
+        Attachment.
+    """
+    P = np.asarray(ue_pos, dtype=np.float32).reshape(-1, 3)
+    n = len(P)
+    if len(uav_pos) == 0:
+        bs = np.asarray(bs_pos, dtype=np.float32)
+        return Attachment(
+            uav_idx=np.full(n, -1, dtype=np.int64),
+            uav_id=np.zeros(n, dtype=np.int64),
+            dist=np.linalg.norm(P - bs, axis=1).astype(np.float32),
+            dst_pos=np.broadcast_to(bs, (n, 3)),
+        )
+    T = np.asarray(uav_pos, dtype=np.float32).reshape(-1, 3)
+    idx, dist = nearest(P, T, index, chunk_elems)
+    return Attachment(
+        uav_idx=idx,
+        uav_id=np.asarray(uav_ids, dtype=np.int64)[idx],
+        dist=dist,
+        dst_pos=T[idx],
+    )
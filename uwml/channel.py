@@ -4,12 +4,23 @@
 Các công thức sử dụng:
 - FSPL: PL(dB) = 20·log10(d[m]) + 20·log10(f[Hz]) − 147.55
 - Log-distance: PL(dB) = PL_ref + 10·n·log10(d/d_ref)
+  (cả hai được tính dưới dạng offset + hệ số·log10(d), phần hằng số gộp sẵn một lần)
 - Nhiệt Johnson–Nyquist: N(dBm) = −174 + 10·log10(BW[Hz]) + NF
 - Shannon (ước lượng thô, tính thêm hệ số 0.5 cho overhead/half-duplex):
   R(bps) = 0.5 · BW · log2(1 + SNR_linear)
+- Giao thoa đồng kênh (interference_sinr_db): SINR = S / (Σ công suất thu từ các UAV khác cùng kênh + N)
+- Shadowing log-normal tương quan không gian (ShadowingField) và fading Rayleigh/Rician (fading_gain_db):
+  công suất thu = tx − PL − shadowing(vị trí UE) + fading
+
+Các hàm `*_batch` là bản theo mảng của cùng công thức, nhận ChannelParams
+(compile_channel) để nhiễu và các số hạng log cố định chỉ tính một lần.
 """
 from __future__ import annotations
 import numpy as np, math
+from dataclasses import dataclass
+from functools import lru_cache
+
+from .attach import DEFAULT_CHUNK_ELEMS
 
 
 def pathloss_db(d_m: float, cfg) -> float:
@@ -26,15 +37,21 @@ def pathloss_db(d_m: float, cfg) -> float:
         PL(dB) theo mô hình đã chọn.
     """
     d = max(1e-3, float(d_m))  # tránh log(0)
-    if getattr(cfg, "model", "log_distance") == "fspl":
-        # Free Space Path Loss (đơn vị: m, Hz)
-        return 20.0 * math.log10(d) + 20.0 * math.log10(cfg.carrier_hz) - 147.55
+    offset, slope = pathloss_terms(cfg)
+    return offset + slope * math.log10(d)
+
+
+def pathloss_terms(cfg):
+    """(offset dB, hệ số dB/decade) sao cho PL(d) = offset + hệ số·log10(d[m]).
 
-    # Log-distance path loss
-    ref_d = getattr(cfg, "ref_distance_m", 1.0)
-    pl_ref = getattr(cfg, "ref_pathloss_db", 30.0)
-    n = getattr(cfg, "pathloss_exp", 2.0)
-    return pl_ref + 10.0 * n * math.log10(d / ref_d)
+    - fspl: 20·log10(f) − 147.55 và 20
+    - log-distance: PL_ref − 10·n·log10(d_ref) và 10·n
+    """
+    if getattr(cfg, "model", "log_distance") == "fspl":
+        return 20.0 * math.log10(float(cfg.carrier_hz)) - 147.55, 20.0
+    slope = 10.0 * float(getattr(cfg, "pathloss_exp", 2.0))
+    ref_d = float(getattr(cfg, "ref_distance_m", 1.0))
+    return float(getattr(cfg, "ref_pathloss_db", 30.0)) - slope * math.log10(ref_d), slope
 
 def noise_power_dbm(bw_hz: float, nf_db: float) -> float:
     """Công suất nhiễu (dBm) trong băng BW, cộng thêm Noise Figure."""
@@ -64,8 +81,8 @@ def estimate_link_rate(src_pos, dst_pos, cfg) -> float:
     pl = pathloss_db(d, cfg)
     n_dbm = noise_power_dbm(cfg.bandwidth_hz, cfg.noise_figure_db)
 
-    # 3) công suất phát (giả định hằng số, 20 dBm)
-    tx_dbm = 20.0
+    # 3) công suất phát (channel.tx_power_dbm, mặc định 20 dBm)
+    tx_dbm = float(getattr(cfg, "tx_power_dbm", 20.0))
 
     # 4) SINR(dB) → SNR tuyến tính
     s_db = sinr_db(tx_dbm, pl, n_dbm)
@@ -77,3 +94,344 @@ def estimate_link_rate(src_pos, dst_pos, cfg) -> float:
 
     # 6) đổi sang Mbps
     return rate_bps / 1e6
+
+
+# -------------------- API theo mảng (batched) --------------------
+@dataclass(frozen=True)
+class ChannelParams:
+    """Tham số kênh đã "biên dịch" một lần cho cả lượt chạy.
+
+    - model: "fspl" hoặc "log_distance"
+    - bandwidth_hz: băng thông (Hz)
+    - noise_dbm: công suất nhiễu (dBm), tính sẵn từ BW & NF
+    - tx_dbm: công suất phát (dBm), channel.tx_power_dbm như estimate_link_rate
+    - pl_offset_db, pl_slope_db: PL(d) = pl_offset_db + pl_slope_db·log10(d) (xem pathloss_terms),
+      gộp sẵn PL_ref, d_ref (log-distance) hoặc 20·log10(f) − 147.55 (fspl)
+    """
+    model: str
+    bandwidth_hz: float
+    noise_dbm: float
+    tx_dbm: float = 20.0
+    pl_offset_db: float = 30.0
+    pl_slope_db: float = 20.0
+
+
+def compile_channel(cfg) -> ChannelParams:
+    """Đọc cấu hình kênh một lần, tính sẵn nhiễu và các số hạng log cố định."""
+    offset, slope = pathloss_terms(cfg)
+    return ChannelParams(
+        model=getattr(cfg, "model", "log_distance"),
+        bandwidth_hz=float(cfg.bandwidth_hz),
+        noise_dbm=noise_power_dbm(cfg.bandwidth_hz, cfg.noise_figure_db),
+        tx_dbm=float(getattr(cfg, "tx_power_dbm", 20.0)),
+        pl_offset_db=offset,
+        pl_slope_db=slope,
+    )
+
+
+def link_distance_batch(src, dst):
+    """Khoảng cách Euclid (m) giữa từng cặp hàng của src/dst (N,3), trả về float64.
+
+    Hiệu số được tính theo kiểu dữ liệu đầu vào (float32 giữ float32) giống bản scalar.
+    """
+    diff = np.asarray(dst) - np.asarray(src)
+    return np.linalg.norm(diff.reshape(-1, 3), axis=1).astype(np.float64)
+
+
+def pathloss_db_batch(d_m, p: ChannelParams):
+    """pathloss_db cho cả mảng khoảng cách d_m (m), dùng ChannelParams đã biên dịch."""
+    d = np.maximum(1e-3, np.asarray(d_m, dtype=np.float64))  # tránh log(0)
+    return p.pl_offset_db + p.pl_slope_db * np.log10(d)
+
+
+def sinr_db_batch(tx_dbm, pl_db, n_dbm):
+    """sinr_db theo mảng (bỏ qua giao thoa)."""
+    return (tx_dbm - np.asarray(pl_db, dtype=np.float64)) - n_dbm
+
+
+def rate_from_sinr_batch(s_db, p: ChannelParams):
+    """Shannon (x0.5 overhead) từ SINR(dB) theo mảng → Mbps."""
+    s_lin = np.power(10.0, np.asarray(s_db, dtype=np.float64) / 10.0)
+    rate_bps = 0.5 * p.bandwidth_hz * np.log2(1.0 + np.maximum(1e-9, s_lin))
+    return rate_bps / 1e6
+
+
+def rate_from_distance_batch(d_m, p: ChannelParams):
+    """Thông lượng (Mbps) theo mảng khoảng cách, cùng công thức estimate_link_rate."""
+    return rate_from_sinr_batch(sinr_db_batch(p.tx_dbm, pathloss_db_batch(d_m, p), p.noise_dbm), p)
+
+
+def estimate_link_rate_batch(src, dst, p: ChannelParams):
+    """estimate_link_rate cho N cặp (src[i], dst[i]) trong một lượt NumPy.
+
+    Args:
+        src: (N,3) vị trí nguồn.
+        dst: (N,3) vị trí đích.
+        p: ChannelParams từ compile_channel(cfg.channel).
+
+    Returns:
+        (N,) thông lượng ước lượng (Mbps).
+    """
+    return rate_from_distance_batch(link_distance_batch(src, dst), p)
+
+
+# -------------------- Bảng tra khoảng cách → tốc độ --------------------
+class RateTable:
+    """Bảng tra tốc độ (Mbps) và pathloss (dB) theo khoảng cách, nội suy tuyến tính, sai số có kiểm chứng.
+
+    Với một cấu hình kênh cố định, tốc độ chỉ phụ thuộc khoảng cách, nên có thể tính sẵn một lần thay vì
+    log10 + lũy thừa 10 + log2 cho mỗi gói.
+
+    - Khóa tra là bình phương khoảng cách d² (bỏ được cả sqrt). Bin chia theo log: mỗi octave
+      [2^E, 2^(E+1)) của d² có `bins_per_octave` (lũy thừa của 2) bin đều nhau, nên chỉ số bin chính là
+      các bit cao (mũ + đầu phần định trị) của d² dạng float64; mỗi bin lưu sẵn hệ số c + s·d² nên tra
+      bảng chỉ còn dịch bit, hai phép gather và một phép nhân-cộng, không có hàm siêu việt nào.
+    - Phủ [d_min, d_max] (World: từ 1e-3 m như phần kẹp của pathloss_db tới đường chéo của world.bounds);
+      d < d_min được kẹp như bản giải tích, d > d_max rơi về công thức chính xác.
+    - Khi dựng, bảng được so với công thức chính xác tại 7 điểm trong mỗi bin; số bin mỗi octave được
+      nhân đôi tới khi sai số tương đối của tốc độ ≤ rel_tol. `max_rel_err` (tốc độ) và
+      `max_abs_err_db` (pathloss) là sai số lớn nhất đo được.
+    """
+
+    def __init__(self, p: ChannelParams, d_max: float, d_min: float = 1e-3, rel_tol: float = 1e-4,
+                 bins_per_octave: int = 16, max_bins_per_octave: int = 4096):
+        self.p = p
+        self.d_min = max(float(d_min), 1e-3)   # dưới 1e-3 m pathloss đã bị kẹp (hằng số)
+        self.d_max = max(float(d_max), 2.0 * self.d_min)
+        self.rel_tol = float(rel_tol)
+        self._d2_min, self._d2_max = self.d_min ** 2, self.d_max ** 2
+        k = 1 << max(0, int(bins_per_octave) - 1).bit_length()   # làm tròn lên lũy thừa của 2
+        while True:
+            self._build(k)
+            self.max_rel_err, self.max_abs_err_db = self._validate()
+            if self.max_rel_err <= self.rel_tol or k >= max_bins_per_octave:
+                break
+            k *= 2
+        self.bins_per_octave = k
+
+    def _build(self, k: int):
+        """Tính giá trị tại các nút d² = 2^E·(1 + j/k) của mọi octave phủ [d_min², d_max²]."""
+        e0 = int(np.frexp(self._d2_min)[1]) - 1     # d² = m·2^e, m ∈ [0.5, 1) → octave 2^(e-1)
+        e1 = int(np.frexp(self._d2_max)[1])         # d_max² < 2^e1 → chỉ số bin luôn < số nút − 1
+        e = np.repeat(np.arange(e0, e1), k)
+        j = np.tile(np.arange(k), e1 - e0)
+        self._nodes = np.append(np.ldexp(1.0 + j / k, e), np.ldexp(1.0, e1))
+        # Bit float64: 52 bit phần định trị; log2(k) bit cao của nó chọn bin trong octave
+        self._shift = 52 - (k.bit_length() - 1)
+        self._base = int(self._nodes[:1].view(np.int64)[0] >> self._shift)
+        # Không kẹp d ở nút: nút đầu có thể nằm dưới d_min, ngoại suy trơn giữ nội suy của bin đầu chính xác
+        self._pl = self.p.pl_offset_db + self.p.pl_slope_db * np.log10(np.sqrt(self._nodes))
+        self._rate = rate_from_sinr_batch(sinr_db_batch(self.p.tx_dbm, self._pl, self.p.noise_dbm), self.p)
+        # Nội suy tuyến tính viết thẳng theo d² của từng bin: giá trị = c + s·d², tính sẵn c và s
+        # (tra bảng chỉ cần bit cao để chọn bin, không phải tách phần lẻ)
+        dn = np.diff(self._nodes)
+        self._pl_s = np.diff(self._pl) / dn
+        self._pl_c = self._pl[:-1] - self._pl_s * self._nodes[:-1]
+        self._rate_s = np.diff(self._rate) / dn
+        self._rate_c = self._rate[:-1] - self._rate_s * self._nodes[:-1]
+
+    def _validate(self):
+        """(sai số tương đối lớn nhất của tốc độ, sai số tuyệt đối lớn nhất của pathloss dB) trên lưới kiểm."""
+        frac = np.arange(1, 8) / 8.0
+        d2 = (self._nodes[:-1, None] + np.diff(self._nodes)[:, None] * frac).reshape(-1)
+        d2 = d2[(d2 >= self._d2_min) & (d2 <= self._d2_max)]
+        d = np.sqrt(d2)
+        exact = rate_from_distance_batch(d, self.p)
+        rel = np.abs(self.rate_from_d2(d2) - exact) / np.maximum(np.abs(exact), 1e-300)
+        pl_err = np.abs(self.pathloss_from_d2(d2) - pathloss_db_batch(d, self.p))
+        return float(rel.max()), float(pl_err.max())
+
+    def _lookup(self, d2, c, s, exact_fn):
+        raw = np.asarray(d2).reshape(-1)
+        if len(raw) == 0:
+            return np.zeros(0)
+        far = raw.max() > self._d2_max
+        # Một bản sao float64 duy nhất: kẹp và ép kiểu (kể cả từ float32) trong cùng một ufunc
+        x = np.empty(len(raw))
+        if far:
+            np.clip(raw, self._d2_min, self._d2_max, out=x)
+        else:
+            np.maximum(raw, self._d2_min, out=x)
+        i = x.view(np.int64) >> self._shift
+        i -= self._base
+        out = s.take(i)
+        out *= x
+        out += c.take(i)
+        if far:   # ngoài bảng: công thức chính xác cho riêng các phần tử đó
+            sel = np.flatnonzero(raw > self._d2_max)
+            out[sel] = exact_fn(np.sqrt(raw[sel]), self.p)
+        return out
+
+    def rate_from_d2(self, d2):
+        """Tốc độ (Mbps) theo mảng bình phương khoảng cách (m²)."""
+        return self._lookup(d2, self._rate_c, self._rate_s, rate_from_distance_batch)
+
+    def pathloss_from_d2(self, d2):
+        """Pathloss (dB) theo mảng bình phương khoảng cách (m²)."""
+        return self._lookup(d2, self._pl_c, self._pl_s, pathloss_db_batch)
+
+    @staticmethod
+    def _d2_between(src, dst):
+        # Hiệu số theo kiểu đầu vào như link_distance_batch (float32 giữ float32); tổng bình phương bằng matmul
+        diff = (np.asarray(dst) - np.asarray(src)).reshape(-1, 3)
+        diff *= diff
+        return diff @ np.ones(3, dtype=diff.dtype)
+
+    def rate_between(self, src, dst):
+        """Như estimate_link_rate_batch(src, dst, p) nhưng tra bảng (sai số tương đối ≤ max_rel_err)."""
+        return self.rate_from_d2(self._d2_between(src, dst))
+
+    def pathloss_between(self, src, dst):
+        """Pathloss (dB) của N cặp (src[i], dst[i]) qua bảng tra."""
+        return self.pathloss_from_d2(self._d2_between(src, dst))
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+# -------------------- Giao thoa đồng kênh giữa các UAV --------------------
+def uav_channel_groups(n_uav: int, num_channels: int = 1, assign=None):
+    """Kênh tần số của từng UAV (M,) int64: `assign` nếu có, mặc định tái sử dụng vòng i % num_channels."""
+    if assign is not None:
+        return np.asarray(assign, dtype=np.int64).reshape(-1)
+    return np.arange(int(n_uav), dtype=np.int64) % max(1, int(num_channels))
+
+
+def interference_sinr_db(ue_pos, uav_pos, serving, groups, p: ChannelParams,
+                         chunk_elems: int = DEFAULT_CHUNK_ELEMS, shadow_db=None, fade_db=None):
+    """SINR (dB) của mỗi UE tính cả giao thoa từ mọi UAV khác cùng kênh.
+
+    Mọi UAV phát liên tục với công suất p.tx_dbm (giả định full-buffer); UE nhận tín hiệu từ UAV
+    phục vụ `serving[i]` và nhiễu từ các UAV khác có cùng `groups[...]`:
+        SINR = S / (Σ_{j ≠ phục vụ, cùng kênh} P_j + N)
+    Công suất thu UE×UAV được tính theo khối hàng (≤ chunk_elems phần tử) trực tiếp từ
+    d² = |u|² + |a|² − 2·u·a (một phép nhân ma trận, không có mảng hiệu (N,M,3)):
+    P = 10^((tx − offset)/10) · (d²)^(−hệ số/20), tức một phép lũy thừa cho cả ma trận; tổng theo kênh là
+    một phép nhân ma trận với ma trận one-hot (M × số kênh), nên chi phí tuyến tính theo số UE.
+
+    Args:
+        ue_pos: (N,3) vị trí UE.
+        uav_pos: (M,3) vị trí UAV, M >= 1.
+        serving: (N,) chỉ số UAV phục vụ của từng UE.
+        groups: (M,) kênh của từng UAV (uav_channel_groups).
+        p: ChannelParams.
+        chunk_elems: giới hạn N_khối·M cho ma trận tạm.
+        shadow_db: (N,) shadowing tại vị trí UE (dB, suy hao thêm cho mọi UAV thu được ở UE đó), tùy chọn.
+        fade_db: (N,) fading của liên kết phục vụ (dB), tùy chọn; nhiễu giao thoa dùng công suất trung bình.
+
+    Returns:
+        (N,) SINR (dB).
+    """
+    P = np.asarray(ue_pos, dtype=np.float64).reshape(-1, 3)
+    T = np.asarray(uav_pos, dtype=np.float64).reshape(-1, 3)
+    serving = np.asarray(serving, dtype=np.int64).reshape(-1)
+    groups = np.asarray(groups, dtype=np.int64).reshape(-1)
+    n, m = len(P), len(T)
+    onehot = np.zeros((m, int(groups.max()) + 1 if m else 1))
+    onehot[np.arange(m), groups] = 1.0
+    gain = 10.0 ** ((p.tx_dbm - p.pl_offset_db) / 10.0)   # mW ở d = 1 m
+    expo = -p.pl_slope_db / 20.0                          # số mũ áp cho d²
+    n_mw = 10.0 ** (p.noise_dbm / 10.0)
+    tt = np.einsum("ij,ij->i", T, T)
+    t2 = -2.0 * T.T
+    row = None if shadow_db is None else 10.0 ** (-np.asarray(shadow_db, dtype=np.float64) / 10.0)
+    fade = None if fade_db is None else 10.0 ** (np.asarray(fade_db, dtype=np.float64) / 10.0)
+    out = np.empty(n)
+    rows = max(1, int(chunk_elems) // max(1, m))
+    for s in range(0, n, rows):
+        blk = P[s:s + rows]
+        d2 = blk @ t2
+        d2 += np.einsum("ij,ij->i", blk, blk)[:, None]
+        d2 += tt
+        np.maximum(d2, 1e-6, out=d2)                      # d >= 1e-3 m như pathloss_db (và chặn d² âm do làm tròn)
+        rx = np.power(d2, expo, out=d2)
+        rx *= gain
+        r = np.arange(len(rx))
+        k = serving[s:s + rows]
+        sig = rx[r, k]
+        intf = np.maximum((rx @ onehot)[r, groups[k]] - sig, 0.0)   # cùng kênh, trừ chính UAV phục vụ
+        if row is not None:
+            sig = sig * row[s:s + rows]
+            intf *= row[s:s + rows]
+        if fade is not None:
+            sig = sig * fade[s:s + rows]
+        out[s:s + rows] = 10.0 * np.log10(sig / (intf + n_mw))
+    return out
+
+
+# -------------------- Shadowing tương quan không gian & fading nhanh --------------------
+FADING_MODELS = ("none", "rayleigh", "rician")
+
+
+@lru_cache(maxsize=8)
+def _shadow_grid(nx: int, ny: int, res_m: float, corr_m: float, std_db: float, seed: int):
+    """Lưới shadowing (ny, nx) dB, tương quan mũ exp(−r/corr_m), độ lệch chuẩn std_db (chỉ đọc, được cache).
+
+    Nhiễu trắng Gaussian được lọc trong miền tần số bằng sqrt(PSD) của hàm tương quan mong muốn
+    (phương pháp phổ, numpy.fft). Lưới được đệm ~3·corr_m mỗi phía để cắt bỏ tương quan vòng của FFT.
+    """
+    pad = int(math.ceil(3.0 * corr_m / res_m))
+    mx, my = nx + 2 * pad, ny + 2 * pad
+    # Khoảng cách tuần hoàn trên lưới đệm → hàm tương quan mong muốn → PSD
+    rx = np.minimum(np.arange(mx), mx - np.arange(mx)) * res_m
+    ry = np.minimum(np.arange(my), my - np.arange(my)) * res_m
+    cov = np.exp(-np.hypot(ry[:, None], rx[None, :]) / corr_m)
+    amp = np.sqrt(np.maximum(np.fft.rfft2(cov).real, 0.0))
+    white = np.random.default_rng(seed).standard_normal((my, mx))
+    field = np.fft.irfft2(np.fft.rfft2(white) * amp, s=(my, mx))[pad:pad + ny, pad:pad + nx]
+    field *= std_db / max(float(field.std()), 1e-12)
+    field.setflags(write=False)
+    return field
+
+
+class ShadowingField:
+    """Shadowing log-normal tương quan không gian trên mặt phẳng xy của world.bounds.
+
+    - Dựng một lần (lưới ô `res_m`, tương quan mũ theo khoảng cách `corr_m`, độ lệch chuẩn `std_db`),
+      lưới được cache theo (kích thước, tham số, seed) nên các World cùng cấu hình dùng chung.
+    - `sample(pos)`: nội suy song tuyến tại (x, y) của từng điểm (ngoài vùng → kẹp về biên), trả về dB
+      (dương = suy hao thêm), theo lô cho cả mảng.
+    """
+
+    def __init__(self, bounds, std_db: float, corr_m: float, res_m: float, seed: int):
+        b = np.asarray(bounds, dtype=np.float64).reshape(-1)[:4]
+        self.x0, self.y0 = float(b[0]), float(b[2])
+        self.res_m = float(res_m)
+        nx = int(math.ceil((b[1] - b[0]) / self.res_m)) + 1
+        ny = int(math.ceil((b[3] - b[2]) / self.res_m)) + 1
+        self.grid = _shadow_grid(nx, ny, self.res_m, float(corr_m), float(std_db), int(seed))
+
+    def sample(self, pos):
+        """Shadowing (dB) tại (x, y) của các điểm pos (N,2+) bằng nội suy song tuyến."""
+        pos = np.asarray(pos).reshape(len(pos), -1)
+        ny, nx = self.grid.shape
+        fx = np.clip((pos[:, 0] - self.x0) / self.res_m, 0.0, nx - 1.0)
+        fy = np.clip((pos[:, 1] - self.y0) / self.res_m, 0.0, ny - 1.0)
+        ix = np.minimum(fx.astype(np.int64), nx - 2)
+        iy = np.minimum(fy.astype(np.int64), ny - 2)
+        tx, ty = fx - ix, fy - iy
+        g = self.grid
+        top = g[iy, ix] + tx * (g[iy, ix + 1] - g[iy, ix])
+        bot = g[iy + 1, ix] + tx * (g[iy + 1, ix + 1] - g[iy + 1, ix])
+        return top + ty * (bot - top)
+
+
+def fading_gain_db(rng, n: int, model: str = "rayleigh", k_factor_db: float = 6.0):
+    """n hệ số fading công suất (dB, trung bình tuyến tính = 1) rút một lần từ Generator `rng`.
+
+    - rayleigh: |h|² ~ Exp(1)
+    - rician: h = sqrt(K/(K+1)) + sqrt(1/(K+1))·CN(0,1), K = 10^(k_factor_db/10)
+    - none: 0 dB
+    """
+    if model == "none" or n == 0:
+        return np.zeros(n)
+    if model == "rayleigh":
+        g = rng.exponential(1.0, n)
+    elif model == "rician":
+        k = 10.0 ** (k_factor_db / 10.0)
+        z = rng.standard_normal((2, n)) * math.sqrt(0.5 / (k + 1.0))
+        z[0] += math.sqrt(k / (k + 1.0))
+        g = z[0] ** 2 + z[1] ** 2
+    else:
+        raise ValueError(f"fading không hợp lệ: {model!r} (chọn một trong {FADING_MODELS})")
+    return 10.0 * np.log10(np.maximum(g, 1e-30))
@@ -21,3 +21,37 @@ def load_config(path: str):
     with open(path, 'r', encoding='utf-8') as f:
         data = yaml.safe_load(f)
     return DotDict.from_dict(data)
+
+
+def to_dict(cfg):
+    """Đệ quy chuyển DotDict → dict thuần (để ghi JSON/YAML hoặc gửi sang tiến trình khác)."""
+    if isinstance(cfg, types.SimpleNamespace):
+        return {k: to_dict(v) for k, v in vars(cfg).items()}
+    if isinstance(cfg, (list, tuple)):
+        return [to_dict(v) for v in cfg]
+    return cfg
+
+
+def apply_overrides(cfg, overrides):
+    """Ghi đè cấu hình theo khóa dạng chấm, vd. {"ue.count": 1000, "time.seed": 7}.
+
+    Mục trung gian chưa có sẽ được tạo (DotDict rỗng); giá trị dict được bọc thành DotDict.
+    Trả về chính `cfg` (sửa tại chỗ).
+    """
+    for key, val in (overrides or {}).items():
+        *path, leaf = key.split(".")
+        node = cfg
+        for name in path:
+            if not isinstance(getattr(node, name, None), types.SimpleNamespace):
+                setattr(node, name, DotDict())
+            node = getattr(node, name)
+        setattr(node, leaf, DotDict.from_dict(val) if isinstance(val, dict) else val)
+    return cfg
+
+
+def parse_override(text: str):
+    """Tách chuỗi "a.b=giá_trị" (giá trị đọc theo cú pháp YAML) → (khóa, giá trị)."""
+    key, sep, raw = text.partition("=")
+    if not sep or not key:
+        raise ValueError(f"override phải có dạng khóa=giá_trị: {text!r}")
+    return key.strip(), yaml.safe_load(raw)
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""Engine hướng sự kiện (discrete-event, engine "event") cho World.
+
+Thay vì quét mọi UE/UAV sau mỗi dt, thời gian nhảy thẳng tới sự kiện kế tiếp trong heap:
+- ARRIVAL: UE phát sinh gói. Bernoulli(p) mỗi bước ⇔ khoảng cách giữa hai lần phát sinh
+  (tính theo số bước) ~ Geometric(p), nên mỗi UE chỉ có đúng một sự kiện chờ trong heap.
+  Thời điểm đến nằm trên lưới k*dt như engine theo bước.
+- DEPART: node (BS/UAV) phục vụ xong một gói → lấy gói kế theo ưu tiên (khi queue.enabled).
+- WAYPOINT: UAV tới waypoint → bắt đầu đoạn thẳng kế tiếp.
+
+Di chuyển được tính lười (lazy) tại thời điểm sự kiện:
+- UAV: vị trí theo giải tích trên đoạn thẳng hiện tại (p0 + hướng * speed * (t - t0)).
+- UE: random-walk như engine theo bước (đổi hướng Gauss mỗi dt, kẹp bounds từng bước), nhưng
+  chỉ "tua" một UE khi cần vị trí của nó (cumsum cả đoạn, xem physics.clamped_walk_1d).
+  Số ngẫu nhiên lấy từ world.rng_mobility theo thứ tự được truy vấn, nên quỹ đạo tái lập
+  được với cùng seed và cùng trình tự truy vấn (vd. cùng chạy headless).
+
+Thống kê/nhật ký gói ghi vào world.stats / world.packets như engine theo bước.
+"""
+from __future__ import annotations
+import heapq, itertools, math
+from collections import deque
+import numpy as np
+
+from .attach import nearest
+from .physics import clamp_bounds_batch, clamped_walk_1d
+
+# Loại sự kiện; cùng thời điểm thì xử lý theo thứ tự này (node rảnh trước khi gói mới tới)
+DEPART, WAYPOINT, ARRIVAL = 0, 1, 2
+# Số bản ghi gói tối đa chờ trong bộ đệm trước khi đẩy vào PacketLog (không đợi hết advance)
+LOG_CHUNK = 4096
+
+
+class EventScheduler:
+    """Heap sự kiện (t, loại, seq, a, b); seq giữ thứ tự FIFO cho các sự kiện trùng thời điểm."""
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+
+    def push(self, t: float, kind: int, a: int = 0, b=0):
+        heapq.heappush(self._heap, (t, kind, next(self._seq), a, b))
+
+    def push_many(self, ts, kind: int, a):
+        """Đẩy nhiều sự kiện cùng loại; seq liên tiếp như gọi push lần lượt (thứ tự lấy ra giống hệt).
+
+        Lô lớn so với heap: nối vào rồi heapify một lần thay cho từng heappush.
+        """
+        ts, a = list(ts), list(a)
+        if not ts:
+            return
+        if len(ts) * 8 < len(self._heap):
+            for t, x in zip(ts, a):
+                self.push(t, kind, x)
+            return
+        base = next(self._seq)
+        self._heap.extend(zip(ts, itertools.repeat(kind), itertools.count(base), a, itertools.repeat(0)))
+        heapq.heapify(self._heap)
+        self._seq = itertools.count(base + len(ts))
+
+    def pop(self):
+        return heapq.heappop(self._heap)
+
+    def peek_time(self):
+        return self._heap[0][0] if self._heap else math.inf
+
+    def peek(self):
+        return self._heap[0]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class EventEngine:
+    """Trạng thái và vòng lặp sự kiện; dùng kho mảng EntityArrays của world (như engine "soa")."""
+
+    def __init__(self, world, dt: float):
+        self.w = world
+        self.dt = float(dt)
+        self.sched = EventScheduler()
+        self.now = float(world.stats.time_s)
+        ue_speed, ue_turn, uav_speed, uav_wps = world._mobility_params()
+        self.ue_speed, self.ue_turn = float(ue_speed), float(ue_turn)
+        self.uav_speed = float(uav_speed)
+        self.wps = np.asarray(uav_wps, dtype=np.float64).reshape(-1, 3) if uav_wps else None
+        b = world.bounds.astype(np.float64)
+        self._xlim, self._ylim = (b[0], b[1]), (b[2], b[3])
+
+        # --- UE: số bước random-walk đã áp dụng (vị trí UE j ứng với thời điểm moves[j]*dt) ---
+        self.ue_moves = np.full(len(world.ue_soa), int(round(self.now / self.dt)), dtype=np.int64)
+
+        # --- UAV: đoạn thẳng hiện tại (bắt đầu lúc seg_t0 tại seg_p0, hướng seg_dir, dài seg_len) ---
+        m = len(world.uav_soa)
+        self.seg_t0 = np.full(m, self.now)
+        self.seg_p0 = world.uav_soa.pos.astype(np.float64)
+        self.seg_dir = np.zeros((m, 3))
+        self.seg_len = np.zeros(m)
+        for i in range(m):
+            self._start_segment(i, self.now)
+
+        # --- Hàng đợi: mỗi node một danh sách deque theo ưu tiên + gói đang phục vụ ---
+        n_nodes = m + 1
+        self.queue_on = world._queue_on
+        self.cap = world._queue_cap
+        self.n_prio = max(1, world._queue_prios)
+        self.fifo = [[deque() for _ in range(self.n_prio)] for _ in range(n_nodes)]
+        self.busy = [None] * n_nodes   # gói đang truyền: (arrival_s, service_s, src, size, rate, prio)
+        self.node_ids = world.node_ids()
+
+        # --- Lần phát sinh gói đầu tiên của mọi UE (rút theo lô) ---
+        self.p = world.cc.gen_prob
+        k0 = int(round(self.now / self.dt))
+        if self.p > 0 and len(self.ue_moves):
+            first = k0 + world.rng_traffic.geometric(min(1.0, self.p), len(self.ue_moves)) - 1
+            self.sched.push_many((first * self.dt).tolist(), ARRIVAL, range(len(self.ue_moves)))
+        # Bản ghi gói chờ ghi vào PacketLog: đẩy theo lô khi đủ _log_max (≤ vòng đệm) và cuối mỗi advance,
+        # nên bộ nhớ không tăng theo tổng số gói khi một advance phủ cả lượt chạy
+        self._log = []
+        self._log_max = max(1, min(int(world.packets.capacity), LOG_CHUNK))
+
+    # ------------------------------------------------------------------ di chuyển lười
+    def _start_segment(self, i: int, t: float):
+        """UAV i bắt đầu đoạn mới tại t (tới waypoint hiện tại) và hẹn sự kiện WAYPOINT."""
+        arr = self.w.uav_soa
+        self.seg_t0[i] = t
+        if self.wps is None or self.uav_speed <= 0:
+            self.seg_dir[i] = 0.0 if self.wps is not None else arr.vel[i] / max(1e-9, self.uav_speed)
+            self.seg_len[i] = math.inf
+            return
+        # Bỏ qua waypoint trùng vị trí (tránh vòng lặp sự kiện tại cùng thời điểm)
+        for _ in range(len(self.wps)):
+            d = self.wps[arr.way_idx[i] % len(self.wps)] - self.seg_p0[i]
+            dist = float(np.linalg.norm(d))
+            if dist >= 1e-3:
+                break
+            arr.way_idx[i] += 1
+        else:
+            self.seg_dir[i] = 0.0
+            self.seg_len[i] = math.inf
+            return
+        self.seg_dir[i] = d / dist
+        self.seg_len[i] = dist
+        arr.vel[i] = self.seg_dir[i] * self.uav_speed
+        self.sched.push(t + dist / self.uav_speed, WAYPOINT, i)
+
+    def uav_pos_at(self, t: float):
+        """Vị trí mọi UAV tại thời điểm t (giải tích trên đoạn hiện tại), mảng (M,3)."""
+        travel = np.minimum(self.uav_speed * (t - self.seg_t0), self.seg_len)
+        P = self.seg_p0 + self.seg_dir * travel[:, None]
+        return clamp_bounds_batch(P, self.w.bounds)
+
+    def advance_ues(self, idx, m: int):
+        """Tua các UE idx tới m bước random-walk (chỉ UE đang chậm hơn m)."""
+        idx = np.asarray(idx, dtype=np.int64)
+        n = m - self.ue_moves[idx]
+        keep = n > 0
+        idx, n = idx[keep], n[keep]
+        if len(idx) == 0:
+            return
+        arr, rng, step = self.w.ue_soa, self.w.rng_mobility, self.ue_speed * self.dt
+        if step == 0.0:
+            # UE đứng yên: không cần tua quỹ đạo
+            self.ue_moves[idx] = m
+            return
+        if n.max() <= 4:
+            # Nhiều UE, ít bước: lặp theo bước, vector theo UE (giống move_ue_batch)
+            for s in range(int(n.max())):
+                act = idx[n > s]
+                arr.heading[act] += np.radians(rng.normal(0.0, self.ue_turn, len(act)))
+                arr.pos[act, 0] += (np.cos(arr.heading[act]) * step).astype(np.float32)
+                arr.pos[act, 1] += (np.sin(arr.heading[act]) * step).astype(np.float32)
+                arr.pos[act, 0] = np.clip(arr.pos[act, 0], *self._xlim)
+                arr.pos[act, 1] = np.clip(arr.pos[act, 1], *self._ylim)
+        elif len(idx) >= 4 and len(idx) * int(n.max()) <= 4 * int(n.sum()):
+            self._walk_padded(idx, n, step)
+        else:
+            # Ít UE hoặc số bước quá chênh (ma trận đệm lãng phí): từng UE, cumsum hướng + kẹp biên
+            for j, nj in zip(idx.tolist(), n.tolist()):
+                h = arr.heading[j] + np.cumsum(np.radians(rng.normal(0.0, self.ue_turn, nj)))
+                arr.pos[j, 0] = clamped_walk_1d(arr.pos[j, 0], np.cos(h) * step, *self._xlim)
+                arr.pos[j, 1] = clamped_walk_1d(arr.pos[j, 1], np.sin(h) * step, *self._ylim)
+                arr.heading[j] = h[-1]
+        arr.vel[idx, 0] = np.cos(arr.heading[idx]) * self.ue_speed
+        arr.vel[idx, 1] = np.sin(arr.heading[idx]) * self.ue_speed
+        self.ue_moves[idx] = m
+
+    def _walk_padded(self, idx, n, step: float):
+        """Như vòng lặp từng UE trong advance_ues nhưng cho cả lô trên ma trận (UE × bước) đệm số 0.
+
+        Số ngẫu nhiên rút một lần theo đúng thứ tự nối các UE; cumsum theo hàng với phần đệm 0 ở cuối
+        cho đúng các giá trị như cumsum riêng từng UE, nên kết quả trùng khớp từng bit. Chỉ những hàng
+        chạm biên mới gọi clamped_walk_1d.
+        """
+        arr = self.w.ue_soa
+        mask = np.arange(int(n.max())) < n[:, None]
+        turn = np.zeros(mask.shape)
+        turn[mask] = np.radians(self.w.rng_mobility.normal(0.0, self.ue_turn, int(n.sum())))
+        H = arr.heading[idx][:, None] + np.cumsum(turn, axis=1)
+        r, last = np.arange(len(idx)), n - 1
+        for ax, f, lim in ((0, np.cos, self._xlim), (1, np.sin, self._ylim)):
+            D = f(H) * step
+            D[~mask] = 0.0
+            x0 = arr.pos[idx, ax].astype(np.float64)
+            S = x0[:, None] + np.cumsum(D, axis=1)
+            end = S[r, last]
+            for k in np.flatnonzero((((S < lim[0]) | (S > lim[1])) & mask).any(axis=1)).tolist():
+                end[k] = clamped_walk_1d(x0[k], D[k, :n[k]], *lim)
+            arr.pos[idx, ax] = end
+        arr.heading[idx] = H[r, last]
+
+    def sync(self, t: float):
+        """Đưa mọi UE/UAV về thời điểm t (dùng khi cần toàn bộ vị trí, vd. renderer)."""
+        self.advance_ues(np.arange(len(self.ue_moves)), int(round(t / self.dt)))
+        self.w.uav_soa.pos[:] = self.uav_pos_at(t)
+
+    # ------------------------------------------------------------------ vòng lặp sự kiện
+    def advance(self, t_end: float):
+        """Xử lý mọi sự kiện có thời điểm < t_end."""
+        sched = self.sched
+        while sched.peek_time() < t_end:
+            t, kind = sched.peek()[:2]
+            self.now = t
+            if kind == ARRIVAL:
+                # Gom mọi gói đến cùng thời điểm để tính vị trí/gán/tốc độ link theo lô
+                ues = []
+                while sched._heap and sched._heap[0][0] == t and sched._heap[0][1] == ARRIVAL:
+                    ues.append(sched.pop()[3])
+                self._arrivals(t, np.asarray(ues, dtype=np.int64))
+            elif kind == DEPART:
+                self._depart(t, sched.pop()[3])
+            else:
+                i = sched.pop()[3]
+                self.seg_p0[i] = self.uav_pos_at(t)[i]
+                self.w.uav_soa.way_idx[i] += 1
+                self._start_segment(i, t)
+        self.now = t_end
+        self._flush_log()
+
+    def _arrivals(self, t: float, ues):
+        w, st = self.w, self.w.stats
+        k_step = int(round(t / self.dt))
+        self.advance_ues(ues, k_step)
+        ue_pos = w.ue_soa.pos[ues]
+        uav_pos = self.uav_pos_at(t)
+        if len(uav_pos):
+            idx, _ = nearest(ue_pos, uav_pos.astype(np.float32), w._attach_index, w._attach_chunk)
+            dst = uav_pos[idx]
+            node = idx + 1
+        else:
+            idx = None
+            dst = np.broadcast_to(w.bs.pos, ue_pos.shape)
+            node = np.zeros(len(ues), dtype=np.int64)
+        rate = w.link_rate(ue_pos, dst, idx, uav_pos)
+        size = w.cc.size_bytes
+        tx_time = w.cc.size_bits / np.maximum(1e-6, rate * 1e6)
+        prio = np.broadcast_to(np.asarray(w._priorities(len(ues))), (len(ues),))
+        src = w.ue_ids()[ues]
+
+        st.enqueued += len(ues)
+        st.sum_rate_mbps += float(rate.sum())
+        if not self.queue_on:
+            # Không hàng đợi: cả lô truyền xong ngay sau tx_time, ghi thống kê/log theo mảng
+            st.dequeued += len(ues)
+            st.sum_latency_s += float(tx_time.sum())
+            st.count_latency += len(ues)
+            st.max_latency_s = max(st.max_latency_s, float(tx_time.max()))
+            st.latency_sketch.add(tx_time)
+            w.packets.extend(size, prio, src, self.node_ids[node], t, rate, tx_time)
+        else:
+            for n, s, tx, r, p in zip(node.tolist(), src.tolist(), tx_time.tolist(), rate.tolist(), prio.tolist()):
+                pkt = (t, tx, s, size, r, p)
+                if self.busy[n] is None:
+                    self._serve(n, pkt, t)
+                else:
+                    q = self.fifo[n][min(max(p, 0), self.n_prio - 1)]
+                    if len(q) >= self.cap:
+                        st.dropped += 1
+                    else:
+                        q.append(pkt)
+
+        # Lần phát sinh kế tiếp của các UE vừa phát: sau Geometric(p) bước
+        nxt = k_step + w.rng_traffic.geometric(min(1.0, self.p), len(ues))
+        self.sched.push_many((nxt * self.dt).tolist(), ARRIVAL, ues.tolist())
+
+    def _serve(self, n: int, pkt, t: float):
+        self.busy[n] = pkt
+        self.sched.push(t + pkt[1], DEPART, n)
+
+    def _depart(self, t: float, n: int):
+        self._deliver(n, self.busy[n], t)
+        self.busy[n] = None
+        for q in self.fifo[n]:   # ưu tiên 0 trước, FIFO trong từng mức
+            if q:
+                self._serve(n, q.popleft(), t)
+                break
+
+    def _deliver(self, n: int, pkt, t_done: float):
+        arrival, _, src, size, rate, prio = pkt
+        lat = t_done - arrival
+        st = self.w.stats
+        st.dequeued += 1
+        st.sum_latency_s += lat
+        st.count_latency += 1
+        if lat > st.max_latency_s:
+            st.max_latency_s = lat
+        self._log.append((size, prio, src, int(self.node_ids[n]), arrival, rate, lat))
+        if len(self._log) >= self._log_max:
+            self._flush_log()
+
+    def _flush_log(self):
+        if self._log:
+            cols = [np.asarray(c) for c in zip(*self._log)]
+            self.w.stats.latency_sketch.add(cols[-1])
+            self.w.packets.extend(*cols)
+            self._log.clear()
+
+    def backlog(self) -> int:
+        """Số gói đang chờ trong hàng đợi (không tính gói đang truyền)."""
+        return sum(len(q) for node in self.fifo for q in node)
+
+    # ------------------------------------------------------------------ snapshot
+    def state(self) -> dict:
+        """Trạng thái engine dạng mảng liền khối (cho World.save_snapshot)."""
+        self._flush_log()
+        h = self.sched._heap
+        pk_node, pk_lvl, pk = [], [], []
+        for n, levels in enumerate(self.fifo):
+            for lvl, q in enumerate(levels):
+                for pkt in q:
+                    pk_node.append(n); pk_lvl.append(lvl); pk.append(pkt)
+        busy = [(n, *pkt) for n, pkt in enumerate(self.busy) if pkt is not None]
+        return {
+            "now": np.float64(self.now),
+            "ue_moves": self.ue_moves,
+            "seg_t0": self.seg_t0, "seg_p0": self.seg_p0, "seg_dir": self.seg_dir, "seg_len": self.seg_len,
+            "heap_t": np.array([e[0] for e in h], dtype=np.float64),
+            "heap_i": np.array([e[1:] for e in h], dtype=np.int64).reshape(-1, 4),
+            "seq_next": np.int64(next(self.sched._seq)),
+            "fifo_node": np.array(pk_node, dtype=np.int64), "fifo_lvl": np.array(pk_lvl, dtype=np.int64),
+            "fifo_pkt": np.array(pk, dtype=np.float64).reshape(-1, 6),
+            "busy": np.array(busy, dtype=np.float64).reshape(-1, 7),
+        }
+
+    def load_state(self, d: dict):
+        """Khôi phục trạng thái từ state() (ghi đè lịch sự kiện/hàng đợi vừa tạo trong __init__)."""
+        self.now = float(d["now"])
+        for name in ("ue_moves", "seg_t0", "seg_p0", "seg_dir", "seg_len"):
+            setattr(self, name, np.array(d[name]))
+        self.sched._heap = [(t, *map(int, row)) for t, row in zip(d["heap_t"].tolist(), d["heap_i"])]
+        heapq.heapify(self.sched._heap)
+        self.sched._seq = itertools.count(int(d["seq_next"]))
+
+        def pkt(row):   # (arrival_s, service_s, src, size, rate, prio)
+            return (row[0], row[1], int(row[2]), int(row[3]), row[4], int(row[5]))
+        for levels in self.fifo:
+            for q in levels:
+                q.clear()
+        for n, lvl, row in zip(d["fifo_node"].tolist(), d["fifo_lvl"].tolist(), d["fifo_pkt"].tolist()):
+            self.fifo[n][lvl].append(pkt(row))
+        self.busy = [None] * len(self.busy)
+        for row in d["busy"].tolist():
+            self.busy[int(row[0])] = pkt(row[1:])
@@ -48,12 +48,14 @@ class UE(Entity):
 
 @dataclass
 class Packet:
-    """Bản ghi gói đơn giản để log."""
+    """Bản ghi gói đơn giản để log (rate/latency = NaN nếu chưa biết)."""
     size_bytes: int
     priority: int
     src_id: int
     dst_id: int
     timestamp: float
+    rate_mbps: float = float("nan")
+    latency_s: float = float("nan")
 
 
 @dataclass
@@ -62,3 +64,131 @@ class HardwareProfile:
     cpu_cores: int
     gpu_tflops_est: float
     mem_gb: int
+
+
+# -------------------- Lưu trữ dạng structure-of-arrays (engine "soa") --------------------
+class EntityArrays:
+    """Kho trạng thái liên tục (structure-of-arrays) cho một nhóm thực thể.
+
+    Mỗi trường là một mảng NumPy liền khối, hàng i ứng với thực thể thứ i:
+    - id: (N,) id của thực thể
+    - pos, vel: (N,3) float32 vị trí/vận tốc
+    - heading: (N,) hướng di chuyển (rad) cho random-walk của UE
+    - way_idx: (N,) con trỏ waypoint của UAV
+    - attached: (N,) id UAV đang bám (-1 = chưa gán)
+    """
+
+    def __init__(self, n: int, ids=None):
+        self.id = np.arange(n, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        self.pos = np.zeros((n, 3), dtype=np.float32)
+        self.vel = np.zeros((n, 3), dtype=np.float32)
+        self.heading = np.zeros(n, dtype=np.float64)
+        self.way_idx = np.zeros(n, dtype=np.int64)
+        self.attached = np.full(n, -1, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.id)
+
+
+class _EntityView:
+    """View gọn nhẹ vào hàng i của EntityArrays, giữ API `.pos/.vel/.id` như Entity.
+
+    `pos`/`vel` trả về view của mảng gốc (ghi vào là ghi thẳng vào mảng),
+    gán lại (`e.pos = ...`) sẽ sao chép giá trị vào đúng hàng.
+    """
+    __slots__ = ("_arr", "_i")
+
+    def __init__(self, arr: EntityArrays, i: int):
+        self._arr = arr
+        self._i = i
+
+    @property
+    def id(self):
+        return int(self._arr.id[self._i])
+
+    @property
+    def pos(self):
+        return self._arr.pos[self._i]
+
+    @pos.setter
+    def pos(self, v):
+        self._arr.pos[self._i] = v
+
+    @property
+    def vel(self):
+        return self._arr.vel[self._i]
+
+    @vel.setter
+    def vel(self, v):
+        self._arr.vel[self._i] = v
+
+    def update(self, dt: float):
+        """Tích phân tiến như Entity.update (ghi vào mảng gốc)."""
+        self.pos = self.pos + self.vel * dt
+
+
+class UEView(_EntityView):
+    """View UE trên EntityArrays (engine "soa")."""
+    __slots__ = ()
+
+    @property
+    def attached_uav_id(self):
+        a = int(self._arr.attached[self._i])
+        return None if a < 0 else a
+
+    @attached_uav_id.setter
+    def attached_uav_id(self, v):
+        self._arr.attached[self._i] = -1 if v is None else int(v)
+
+    @property
+    def _dir_rad(self):
+        return float(self._arr.heading[self._i])
+
+    @_dir_rad.setter
+    def _dir_rad(self, v):
+        self._arr.heading[self._i] = v
+
+
+class UAVView(_EntityView):
+    """View UAV trên EntityArrays (engine "soa")."""
+    __slots__ = ()
+
+    @property
+    def _way_idx(self):
+        return int(self._arr.way_idx[self._i])
+
+    @_way_idx.setter
+    def _way_idx(self, v):
+        self._arr.way_idx[self._i] = v
+
+
+class EntityList:
+    """Danh sách "ảo" các view: hỗ trợ len(), chỉ số (kể cả âm), slice và lặp.
+
+    View được tạo khi truy cập nên không tốn bộ nhớ cho N lớn.
+    """
+
+    def __init__(self, arr: EntityArrays, view_cls):
+        self._arr = arr
+        self._view_cls = view_cls
+
+    def __len__(self):
+        return len(self._arr)
+
+    def __bool__(self):
+        return len(self._arr) > 0
+
+    def __getitem__(self, i):
+        n = len(self._arr)
+        if isinstance(i, slice):
+            return [self._view_cls(self._arr, k) for k in range(*i.indices(n))]
+        i = int(i)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("entity index out of range")
+        return self._view_cls(self._arr, i)
+
+    def __iter__(self):
+        for k in range(len(self._arr)):
+            yield self._view_cls(self._arr, k)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Điều nhịp mô phỏng trong renderer tương tác theo hệ số thời gian thực (real-time factor, RTF).
+
+- RTF = số giây mô phỏng chạy trong một giây thực. RTF = 1 là thời gian thực, 10 là tua nhanh 10×,
+  RTF = 0 nghĩa là "nhanh nhất có thể".
+- Mỗi khung vẽ, `plan(wall_dt, step)` cộng dồn số bước còn nợ (wall_dt · RTF / dt) và trả về số bước cần
+  chạy, bị chặn bởi ngân sách thời gian khung (`budget_s` / chi phí trung bình một bước, đo bằng EMA),
+  để cửa sổ vẫn mượt khi mô phỏng nặng. Khi không theo kịp thì bỏ phần nợ thừa (không dồn bước đuổi theo);
+  RTF đạt được hiển thị trên HUD sẽ thấp hơn RTF đặt.
+- `max_steps`: dừng khi World đã chạy đủ số bước (cfg.system.steps).
+- `observe(time_s)`: đo RTF đạt được từ đồng hồ mô phỏng (dùng được cả khi mô phỏng chạy trong worker).
+"""
+from __future__ import annotations
+import time
+
+# Các mức RTF khi tăng/giảm bằng phím/nút (0 = nhanh nhất có thể, đứng cuối)
+RTF_PRESETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+
+class PacingController:
+    """Quyết định số bước World.step mỗi khung để đạt RTF mục tiêu trong ngân sách thời gian khung."""
+
+    def __init__(self, dt: float, rtf: float = 1.0, budget_s: float = 0.012, max_steps: int = None):
+        self.dt = float(dt)
+        self.rtf = max(0.0, float(rtf))
+        self.budget_s = max(1e-4, float(budget_s))
+        self.max_steps = max_steps if (max_steps is None or max_steps > 0) else None
+        self.paused = False
+        self.done = False
+        self.achieved_rtf = 0.0
+        self._debt = 0.0            # số bước còn nợ (phần lẻ mang sang khung sau)
+        self._cost = 0.0            # EMA thời gian thực một bước (giây)
+        self._obs = None            # (wall, time_s) đầu cửa sổ đo RTF đạt được
+
+    # --- Đặt RTF ---
+    def faster(self):
+        """Lên mức RTF kế tiếp (từ "nhanh nhất" thì giữ nguyên)."""
+        if self.rtf > 0:
+            self.rtf = next((r for r in RTF_PRESETS if r > self.rtf * 1.001), RTF_PRESETS[-1])
+
+    def slower(self):
+        """Xuống mức RTF trước đó (từ "nhanh nhất" thì về mức cao nhất)."""
+        if self.rtf == 0:
+            self.rtf = RTF_PRESETS[-1]
+        else:
+            self.rtf = next((r for r in reversed(RTF_PRESETS) if r < self.rtf * 0.999), RTF_PRESETS[0])
+
+    def toggle_max(self):
+        """Bật/tắt chế độ nhanh nhất có thể (tắt thì về thời gian thực)."""
+        self.rtf = 1.0 if self.rtf == 0 else 0.0
+        self._debt = 0.0
+
+    def label(self) -> str:
+        return "max" if self.rtf == 0 else f"{self.rtf:g}x"
+
+    # --- Mỗi khung ---
+    def plan(self, wall_dt: float, step: int) -> int:
+        """Số bước cần chạy trong khung này (wall_dt: thời gian thực từ khung trước; step: world.stats.step)."""
+        left = None if self.max_steps is None else self.max_steps - int(step)
+        self.done = left is not None and left <= 0
+        if self.paused or self.done:
+            self._debt = 0.0
+            return 0
+        cap = max(1, int(self.budget_s / self._cost)) if self._cost > 0 else 1
+        if self.rtf > 0:
+            self._debt += min(float(wall_dt), 0.25) * self.rtf / self.dt
+            want = int(self._debt)
+            n = min(want, cap)
+            self._debt -= n
+            if n < want:            # không kịp trong ngân sách: bỏ nợ thừa thay vì đuổi theo
+                self._debt = min(self._debt, 1.0)
+        else:
+            n = cap
+        return n if left is None else min(n, left)
+
+    def record(self, n: int, elapsed_s: float):
+        """Cập nhật chi phí trung bình một bước sau khi chạy n bước mất elapsed_s giây."""
+        if n > 0:
+            c = float(elapsed_s) / n
+            self._cost = c if self._cost == 0 else 0.7 * self._cost + 0.3 * c
+
+    def observe(self, time_s: float, now: float = None):
+        """Đo RTF đạt được (giây mô phỏng / giây thực) trên cửa sổ ~0.5 s."""
+        now = time.perf_counter() if now is None else now
+        if self._obs is None or time_s < self._obs[1]:
+            self._obs = (now, time_s)
+            return
+        span = now - self._obs[0]
+        if span >= 0.5:
+            self.achieved_rtf = (time_s - self._obs[1]) / span
+            self._obs = (now, time_s)
+
+    def tick(self, world, wall_dt: float) -> int:
+        """Chạy số bước theo plan() trên world (World.run: engine "event" nhảy cả khoảng một lần)."""
+        n = self.plan(wall_dt, world.stats.step)
+        if n:
+            t0 = time.perf_counter()
+            world.run(n, self.dt)
+            self.record(n, time.perf_counter() - t0)
+        self.observe(world.stats.time_s)
+        return n
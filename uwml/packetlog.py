@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Nhật ký gói dạng cột: mảng có cấu trúc (structured array) NumPy cấp phát sẵn.
+
+- Vòng đệm (ring buffer) trong bộ nhớ giữ `capacity` gói mới nhất (~30 byte/gói).
+- Tùy chọn ghi tràn (spill) nối đuôi ra file nhị phân thô: mọi gói sắp bị ghi đè
+  được ghi ra file trước → chạy dài vẫn giữ đủ lịch sử. Đọc lại bằng
+  `load_spill(path)` (np.memmap, không nạp hết vào RAM) hoặc xuất `.npz` bằng `save_npz`.
+- Giữ API kiểu deque cho code cũ: len(), log[-1] (trả về Packet), lặp, append(Packet).
+"""
+from __future__ import annotations
+import numpy as np
+
+from .models import Packet
+
+# Một bản ghi gói (packed, không căn lề): 4+2+4+4+8+4+4 = 30 byte
+PACKET_DTYPE = np.dtype([
+    ("size_bytes", "<i4"),
+    ("priority", "<i2"),
+    ("src_id", "<i4"),
+    ("dst_id", "<i4"),
+    ("timestamp", "<f8"),
+    ("rate_mbps", "<f4"),
+    ("latency_s", "<f4"),
+])
+FIELDS = PACKET_DTYPE.names
+
+
+def load_spill(path: str):
+    """Mở file spill dưới dạng memmap chỉ đọc (mảng PACKET_DTYPE theo thứ tự thời gian)."""
+    import os
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=PACKET_DTYPE)
+    return np.memmap(path, dtype=PACKET_DTYPE, mode="r")
+
+
+class PacketLog:
+    """Vòng đệm gói dạng cột với tùy chọn spill ra file."""
+
+    def __init__(self, capacity: int = 1000, spill_path: str = None):
+        self.capacity = max(1, int(capacity))
+        self._buf = np.zeros(self.capacity, dtype=PACKET_DTYPE)
+        self._head = 0          # vị trí ghi kế tiếp trong vòng đệm
+        self.total = 0          # tổng số gói từng ghi nhận
+        self.spilled = 0        # số gói (tính từ đầu) đã ghi ra file spill
+        self.spill_path = spill_path
+        self._spill = open(spill_path, "wb") if spill_path else None
+
+    # ---- Ghi ----
+    def extend(self, size_bytes, priority, src_id, dst_id, timestamp,
+               rate_mbps=np.nan, latency_s=np.nan):
+        """Ghi một lô gói (các cột là mảng cùng độ dài hoặc số vô hướng để broadcast)."""
+        cols = np.broadcast_arrays(size_bytes, priority, src_id, dst_id, timestamp, rate_mbps, latency_s)
+        k = cols[0].size
+        if k == 0:
+            return
+        rec = np.empty(k, dtype=PACKET_DTYPE)
+        for name, c in zip(FIELDS, cols):
+            rec[name] = c.reshape(-1)
+        self.extend_records(rec)
+
+    def extend_records(self, rec):
+        """Ghi một lô bản ghi PACKET_DTYPE (theo thứ tự thời gian)."""
+        k, cap = len(rec), self.capacity
+        if k == 0:
+            return
+        # Trước khi ghi đè: đẩy mọi gói chưa spill mà sẽ bị đẩy khỏi vòng đệm ra file
+        if self._spill is not None and self.total + k - cap > self.spilled:
+            self._write_spill(self._ring_since(self.spilled))
+            self.spilled = self.total
+            if k > cap:
+                self._write_spill(rec[:k - cap])
+                self.spilled += k - cap
+        if k >= cap:
+            self._buf[:] = rec[k - cap:]
+            self._head = 0
+        else:
+            end = self._head + k
+            if end <= cap:
+                self._buf[self._head:end] = rec
+            else:
+                first = cap - self._head
+                self._buf[self._head:] = rec[:first]
+                self._buf[:k - first] = rec[first:]
+            self._head = end % cap
+        self.total += k
+
+    def append(self, pkt: Packet):
+        """Ghi một gói (tương thích deque.append(Packet))."""
+        self.extend(pkt.size_bytes, pkt.priority, pkt.src_id, pkt.dst_id, pkt.timestamp,
+                    pkt.rate_mbps, pkt.latency_s)
+
+    def _write_spill(self, rec):
+        if len(rec):
+            self._spill.write(np.ascontiguousarray(rec).tobytes())
+
+    # ---- Đọc ----
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def records(self):
+        """Bản sao các gói đang trong vòng đệm, theo thứ tự thời gian."""
+        n = len(self)
+        if n < self.capacity:
+            return self._buf[:n].copy()
+        return np.concatenate((self._buf[self._head:], self._buf[:self._head]))
+
+    def _ring_since(self, idx: int):
+        """Các gói trong vòng đệm có chỉ số thời gian >= idx (idx >= total - len)."""
+        rec = self.records()
+        return rec[max(0, idx - (self.total - len(rec))):]
+
+    def history(self):
+        """Toàn bộ lịch sử: phần đã spill (đọc từ file) + phần chưa spill trong vòng đệm."""
+        if self.spill_path is None:
+            return self.records()
+        if self._spill is not None:
+            self._spill.flush()
+        return np.concatenate((np.asarray(load_spill(self.spill_path)), self._ring_since(self.spilled)))
+
+    def __getitem__(self, i):
+        n = len(self)
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(n))]
+        i = int(i)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("packet index out of range")
+        r = self._buf[(self._head - n + i) % self.capacity]
+        return Packet(int(r["size_bytes"]), int(r["priority"]), int(r["src_id"]), int(r["dst_id"]),
+                      float(r["timestamp"]), float(r["rate_mbps"]), float(r["latency_s"]))
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    # ---- Kết thúc ----
+    def save_npz(self, path: str):
+        """Xuất toàn bộ lịch sử ra .npz, mỗi cột một mảng."""
+        h = self.history()
+        np.savez(path, **{name: np.asarray(h[name]) for name in FIELDS})
+
+    def close(self):
+        """Đẩy nốt phần chưa spill ra file và đóng file (vòng đệm vẫn đọc được)."""
+        if self._spill is not None:
+            self._write_spill(self._ring_since(self.spilled))
+            self.spilled = self.total
+            self._spill.close()
+            self._spill = None
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """Động học đơn giản cho UE (random-walk) và UAV (tự do/waypoint)."""
 from __future__ import annotations
-import numpy as np, math, random
+import numpy as np, math
 
 
 def clamp_bounds(p, b):
@@ -13,18 +13,25 @@ def clamp_bounds(p, b):
     return p
 
 
-def move_ue(ue, dt, world, speed=3.0, turn_std_deg=25.0):
+def move_ue(ue, dt, world, speed=3.0, turn_std_deg=25.0, rng=None, dturn_deg=None):
     """Random-walk mượt cho UE trên mặt phẳng z=0.
 
     - Nếu chưa có hướng, gán ngẫu nhiên.
     - Mỗi bước đổi hướng theo phân phối Gauss (độ lệch chuẩn turn_std_deg).
     - Vận tốc có độ lớn = speed, hướng theo góc hiện tại.
+
+    Ngẫu nhiên lấy từ `rng` (mặc định world.rng_mobility); `dturn_deg` cho phép
+    truyền sẵn độ đổi hướng đã rút theo lô.
     """
+    if rng is None:
+        rng = world.rng_mobility
     if not hasattr(ue, "_dir_rad"):
-        ue._dir_rad = random.uniform(0, 2 * math.pi)
+        ue._dir_rad = rng.uniform(0, 2 * math.pi)
 
     # Đổi hướng chút ít để đường đi tự nhiên
-    ue._dir_rad += math.radians(random.gauss(0, turn_std_deg))
+    if dturn_deg is None:
+        dturn_deg = rng.normal(0.0, turn_std_deg)
+    ue._dir_rad += math.radians(dturn_deg)
 
     # Vận tốc trong mặt phẳng (z = 0)
     v = np.array(
@@ -67,3 +74,88 @@ def move_uav(uav, dt, world, speed=8.0, waypoints=None):
     # Cập nhật vị trí theo bước không vượt quá đích
     uav.pos = uav.pos + dir * step
     clamp_bounds(uav.pos, world.bounds)
+
+
+# -------------------- Phiên bản theo mảng (engine "soa") --------------------
+def clamp_bounds_batch(P, b):
+    """Ép toàn bộ vị trí P (N,3) vào hộp biên b, ghi đè tại chỗ."""
+    x0, x1, y0, y1, z0, z1 = b
+    np.clip(P[:, 0], x0, x1, out=P[:, 0])
+    np.clip(P[:, 1], y0, y1, out=P[:, 1])
+    np.clip(P[:, 2], z0, z1, out=P[:, 2])
+    return P
+
+
+def move_ue_batch(arr, dt, bounds, rng, speed=3.0, turn_std_deg=25.0):
+    """Random-walk cho cả mảng UE (EntityArrays) trong một lượt NumPy.
+
+    Tương đương move_ue: đổi hướng Gauss, vận tốc = speed theo hướng mới,
+    x <- x + v*dt rồi kẹp vào bounds.
+    """
+    n = len(arr)
+    if n == 0:
+        return
+    arr.heading += np.radians(rng.normal(0.0, turn_std_deg, size=n))
+    arr.vel[:, 0] = np.cos(arr.heading) * speed
+    arr.vel[:, 1] = np.sin(arr.heading) * speed
+    arr.vel[:, 2] = 0.0
+    arr.pos += arr.vel * np.float32(dt)
+    clamp_bounds_batch(arr.pos, bounds)
+
+
+def move_uav_batch(arr, dt, bounds, speed=8.0, waypoints=None):
+    """Điều khiển cả mảng UAV (EntityArrays), tương đương move_uav cho từng chiếc."""
+    if len(arr) == 0:
+        return
+    if not waypoints:
+        arr.pos += arr.vel * np.float32(dt)
+        clamp_bounds_batch(arr.pos, bounds)
+        return
+
+    W = np.asarray(waypoints, dtype=np.float32)
+    d = W[arr.way_idx % len(W)] - arr.pos
+    dist = np.linalg.norm(d, axis=1)
+
+    # Đến nơi → chuyển waypoint kế (không di chuyển ở bước này)
+    arrived = dist < 1e-3
+    arr.way_idx[arrived] += 1
+
+    mv = ~arrived
+    if not mv.any():
+        return
+    dir = d[mv] / np.maximum(1e-6, dist[mv])[:, None]
+    arr.vel[mv] = dir * speed
+    step = np.minimum(dist[mv], speed * dt)
+    arr.pos[mv] = arr.pos[mv] + dir * step[:, None]
+    clamp_bounds_batch(arr.pos, bounds)
+
+
+def clamped_walk_1d(x0, d, lo, hi):
+    """Vị trí cuối của dãy x_k = clip(x_{k-1} + d_k, lo, hi) (một trục, tương đương kẹp từng bước).
+
+    Khi chỉ một biên có tác dụng, dãy kẹp có dạng đóng (ánh xạ Skorokhod):
+        x_k = S_k + max(0, max_{j<=k}(lo - S_j))      (S = x0 + cumsum(d), chỉ biên dưới)
+    nên cả đoạn tính bằng cumsum + maximum.accumulate; chỉ khi chạm sang biên đối diện
+    mới bắt đầu lại từ đó (số lần bắt đầu lại = số lần đi hết bề rộng hộp, thường rất ít).
+    """
+    x = float(x0)
+    d = np.asarray(d, dtype=np.float64)
+    while len(d):
+        S = x + np.cumsum(d)
+        out = np.flatnonzero((S < lo) | (S > hi))
+        if len(out) == 0:
+            return float(S[-1])
+        if S[out[0]] < lo:
+            X = S + np.maximum.accumulate(np.maximum(lo - S, 0.0))
+            other = np.flatnonzero(X > hi)
+            wall = hi
+        else:
+            X = S - np.maximum.accumulate(np.maximum(S - hi, 0.0))
+            other = np.flatnonzero(X < lo)
+            wall = lo
+        if len(other) == 0:
+            return float(X[-1])
+        q = other[0]
+        x = wall
+        d = d[q + 1:]
+    return x
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Bộ đo thời gian theo pha (phase timer) chi phí thấp cho World.step.
+
+Cách dùng trong vòng lặp nóng:
+    prof.begin()          # mốc đầu bước
+    ...; prof.lap("mobility")   # cộng dồn thời gian từ mốc trước vào pha "mobility"
+    ...; prof.lap("attach")
+
+Khi enabled=False, begin()/lap() trả về ngay (gần như không tốn gì).
+"""
+from __future__ import annotations
+import time
+
+
+class PhaseProfiler:
+    """Cộng dồn thời gian (giây) và số lần gọi cho từng pha."""
+    __slots__ = ("enabled", "total_s", "calls", "_t")
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = bool(enabled)
+        self.total_s = {}   # tên pha → tổng thời gian (s)
+        self.calls = {}     # tên pha → số lần ghi nhận
+        self._t = 0.0
+
+    def begin(self):
+        """Đặt mốc thời gian đầu bước."""
+        if self.enabled:
+            self._t = time.perf_counter()
+
+    def lap(self, name: str):
+        """Cộng thời gian từ mốc trước vào pha `name` rồi đặt mốc mới."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.total_s[name] = self.total_s.get(name, 0.0) + (now - self._t)
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self._t = now
+
+    def reset(self):
+        """Xóa toàn bộ số liệu đã cộng dồn."""
+        self.total_s.clear()
+        self.calls.clear()
+
+    def as_dict(self):
+        """Số liệu dạng dict (để in JSON): total_s, calls, mean_us và tỉ lệ thời gian mỗi pha."""
+        grand = sum(self.total_s.values()) or 1.0
+        return {
+            name: {
+                "total_s": t,
+                "calls": self.calls[name],
+                "mean_us": t / max(1, self.calls[name]) * 1e6,
+                "share": t / grand,
+            }
+            for name, t in self.total_s.items()
+        }
+
+    def summary(self) -> str:
+        """Chuỗi ngắn cho HUD: thời gian trung bình mỗi pha (ms)."""
+        return " ".join(f"{n}={t / max(1, self.calls[n]) * 1e3:.2f}ms"
+                        for n, t in self.total_s.items())
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Hàng đợi FIFO hữu hạn cho mỗi node thu (BS + từng UAV), lưu hoàn toàn bằng mảng.
+
+Mô hình:
+- Mỗi node có `num_priorities` hàng đợi FIFO, mỗi hàng đợi chứa tối đa `capacity` gói
+  (vòng đệm (N, P, C) + head/count). Gói đến khi hàng đợi đầy bị rơi (tail-drop).
+- Mỗi node là một server phục vụ tuần tự: thời gian phục vụ của gói = kích thước (bit) /
+  tốc độ link của gói (từ API kênh theo lô). Mức ưu tiên nhỏ hơn được phục vụ trước;
+  không ngắt (non-preemptive): gói đang truyền dở qua ranh giới bước vẫn truyền xong
+  (`free_at` mang sang bước sau).
+- Trong một bước [t0, t1): gói đến đều có mặt tại t0, nên thứ tự phục vụ mỗi node là
+  ưu tiên 0 (FIFO) → ưu tiên 1 → ...; một cumsum theo hàng cho mọi node cùng lúc
+  (không vòng lặp Python theo gói hay theo node). Gói nào bắt đầu trước t1 thì được phục vụ.
+- Độ trễ = thời điểm rời hàng đợi − thời điểm đến (chờ + truyền).
+"""
+from __future__ import annotations
+import numpy as np
+from dataclasses import dataclass
+
+
+@dataclass
+class Departures:
+    """Các gói rời hàng đợi trong một bước (mọi mảng dài K, xếp theo thời điểm rời).
+    - node: chỉ số node (0 = BS, i+1 = world.uav[i])
+    - prio: mức ưu tiên
+    - arrival_s / depart_s: thời điểm đến / rời (giây mô phỏng)
+    - src_id, size_bytes, rate_mbps: thông tin gói để ghi log
+    """
+    node: np.ndarray
+    prio: np.ndarray
+    arrival_s: np.ndarray
+    depart_s: np.ndarray
+    src_id: np.ndarray
+    size_bytes: np.ndarray
+    rate_mbps: np.ndarray
+
+    @property
+    def latency_s(self):
+        return self.depart_s - self.arrival_s
+
+    def __len__(self):
+        return len(self.node)
+
+
+class NodeQueues:
+    """Vòng đệm FIFO (node × ưu tiên × capacity) và trạng thái server của mọi node."""
+
+    # Các mảng tạo nên toàn bộ trạng thái (dùng cho snapshot)
+    STATE_FIELDS = ("arrival_s", "service_s", "src_id", "size_bytes", "rate_mbps", "head", "count", "free_at")
+
+    def __init__(self, n_nodes: int, num_priorities: int = 1, capacity: int = 64):
+        self.n_nodes = int(n_nodes)
+        self.num_priorities = max(1, int(num_priorities))
+        self.capacity = max(1, int(capacity))
+        shape = (self.n_nodes, self.num_priorities, self.capacity)
+        self.arrival_s = np.zeros(shape, dtype=np.float64)
+        self.service_s = np.zeros(shape, dtype=np.float64)
+        self.src_id = np.zeros(shape, dtype=np.int32)
+        self.size_bytes = np.zeros(shape, dtype=np.int32)
+        self.rate_mbps = np.zeros(shape, dtype=np.float32)
+        self.head = np.zeros(shape[:2], dtype=np.int64)    # vị trí gói đầu mỗi hàng đợi
+        self.count = np.zeros(shape[:2], dtype=np.int64)   # số gói đang chờ mỗi hàng đợi
+        self.free_at = np.zeros(self.n_nodes, dtype=np.float64)  # lúc server rảnh
+
+    def backlog(self) -> int:
+        """Tổng số gói đang nằm trong mọi hàng đợi."""
+        return int(self.count.sum())
+
+    def enqueue(self, node, prio, arrival_s, service_s, src_id, size_bytes, rate_mbps):
+        """Đưa một lô gói vào hàng đợi (theo thứ tự trong lô); gói vượt chỗ trống bị rơi.
+
+        Returns:
+            mảng bool (K,): True nếu gói được nhận vào hàng đợi.
+        """
+        node = np.asarray(node, dtype=np.int64)
+        k = len(node)
+        if k == 0:
+            return np.zeros(0, dtype=bool)
+        P, C = self.num_priorities, self.capacity
+        prio = np.clip(np.broadcast_to(np.asarray(prio, dtype=np.int64), (k,)), 0, P - 1)
+        key = node * P + prio
+
+        # Thứ hạng của mỗi gói trong nhóm (node, ưu tiên) của nó, giữ thứ tự lô
+        order = np.argsort(key, kind="stable")
+        ks = key[order]
+        starts = np.flatnonzero(np.r_[True, ks[1:] != ks[:-1]])
+        sizes = np.diff(np.r_[starts, k])
+        rank = np.empty(k, dtype=np.int64)
+        rank[order] = np.arange(k) - np.repeat(starts, sizes)
+
+        cnt = self.count.reshape(-1)[key]
+        ok = rank < C - cnt
+        if ok.any():
+            n, p = node[ok], prio[ok]
+            slot = (self.head.reshape(-1)[key[ok]] + cnt[ok] + rank[ok]) % C
+            for arr, val in zip((self.arrival_s, self.service_s, self.src_id, self.size_bytes,
+                                 self.rate_mbps), (arrival_s, service_s, src_id, size_bytes, rate_mbps)):
+                arr[n, p, slot] = np.broadcast_to(np.asarray(val), (k,))[ok]
+            self.count += np.bincount(key[ok], minlength=self.n_nodes * P).reshape(self.count.shape)
+        return ok
+
+    def serve(self, t0: float, t1: float):
+        """Phục vụ mọi node trong khoảng [t0, t1); trả về Departures (có thể rỗng)."""
+        N, P, C = self.n_nodes, self.num_priorities, self.capacity
+        w = int(self.count.max()) if self.count.size else 0
+        if w == 0:
+            return None
+        # Gom các gói theo thứ tự FIFO của từng hàng đợi (chỉ rộng bằng hàng đợi dài nhất)
+        j = np.arange(w)
+        slot = (self.head[..., None] + j) % C                       # (N,P,w)
+        valid = j < self.count[..., None]
+        s = np.where(valid, np.take_along_axis(self.service_s, slot, axis=2), 0.0)
+
+        # Thứ tự phục vụ mỗi node: ưu tiên 0 → P-1, trong mỗi mức theo FIFO
+        start = np.maximum(self.free_at, t0)[:, None]
+        end = start + np.cumsum(s.reshape(N, P * w), axis=1)
+        served = valid.reshape(N, -1) & (end - s.reshape(N, -1) < t1)
+        if not served.any():
+            return None
+
+        # Cập nhật server và con trỏ hàng đợi
+        self.free_at = np.maximum(self.free_at, np.where(served, end, -np.inf).max(axis=1))
+        n_served = served.reshape(N, P, w).sum(axis=2)
+        self.head = (self.head + n_served) % C
+        self.count -= n_served
+
+        n, p, jj = np.nonzero(served.reshape(N, P, w))
+        sl = slot[n, p, jj]
+        dep = end.reshape(N, P, w)[n, p, jj]
+        o = np.argsort(dep, kind="stable")
+        n, p, sl, dep = n[o], p[o], sl[o], dep[o]
+        return Departures(n, p, self.arrival_s[n, p, sl], dep, self.src_id[n, p, sl],
+                          self.size_bytes[n, p, sl], self.rate_mbps[n, p, sl])
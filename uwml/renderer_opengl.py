@@ -8,12 +8,14 @@ Nhiệm vụ:
 """
 from __future__ import annotations
 import math, time, numpy as np
+from types import SimpleNamespace
 
 import pyglet
 from pyglet.window import key, mouse
 from OpenGL import GL
 
 from .viz_base import Renderer3DBase
+from .pacing import PacingController
 
 
 # -------------------- Ma trận tiện ích --------------------
@@ -58,6 +60,52 @@ def orbit_to_eye(yaw, pitch, dist):
     ], np.float32)
 
 
+# -------------------- Vẽ theo lô (VBO) --------------------
+class VertexStream:
+    """Một VBO dùng lại mỗi frame: tải cả mảng đỉnh (N,3) float32 bằng một lần glBufferData
+    (orphan bộ đệm cũ, GL_STREAM_DRAW) rồi vẽ bằng đúng một glDrawArrays."""
+
+    def __init__(self):
+        self.vbo = GL.glGenBuffers(1)
+
+    def draw(self, mode, verts):
+        v = np.ascontiguousarray(verts, dtype=np.float32).reshape(-1, 3)
+        if not len(v):
+            return
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
+        GL.glBufferData(GL.GL_ARRAY_BUFFER, v.nbytes, v, GL.GL_STREAM_DRAW)
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glVertexPointer(3, GL.GL_FLOAT, 0, None)
+        GL.glDrawArrays(mode, 0, len(v))
+        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+
+def draw_immediate(mode, verts):
+    """Đường cũ: một glVertex3f cho mỗi đỉnh trong một cặp glBegin/glEnd (để so sánh)."""
+    GL.glBegin(mode)
+    for p in verts:
+        GL.glVertex3f(float(p[0]), float(p[1]), float(p[2]))
+    GL.glEnd()
+
+
+def wire_vertices(src, dst):
+    """Đỉnh cho GL_LINES: xen kẽ src[i], dst[i] → mảng (2N,3) float32."""
+    src = np.asarray(src, dtype=np.float32).reshape(-1, 3)
+    V = np.empty((2 * len(src), 3), dtype=np.float32)
+    V[0::2] = src
+    V[1::2] = np.asarray(dst, dtype=np.float32).reshape(-1, 3)
+    return V
+
+
+def column_vertices(pts, height):
+    """Đỉnh cho GL_LINES: cột đứng từ mặt đất (z=0) tới độ cao `height` dưới mỗi điểm."""
+    V = np.repeat(np.asarray(pts, dtype=np.float32).reshape(-1, 3), 2, axis=0)
+    V[0::2, 2] = 0.0
+    V[1::2, 2] = height
+    return V
+
+
 # -------------------- Renderer chính --------------------
 class OpenGLRenderer(Renderer3DBase):
     # Bảng màu RGBA
@@ -72,14 +120,14 @@ class OpenGLRenderer(Renderer3DBase):
     C_AX_Z = (0.30, 0.30, 1.00, 1.0)   # trục Z
     C_SAT  = (1.00, 0.50, 0.00, 1.0)   # vệ tinh
 
-    def __init__(self, width=1280, height=760):
-        # Cửa sổ Pyglet với depth buffer + MSAA
+    def __init__(self, width=1280, height=760, vbo=True, visible=True, vsync=True):
+        # Cửa sổ Pyglet với depth buffer + MSAA (visible/vsync=False: benchmark vẽ ẩn, không khoá theo màn hình)
         self.width, self.height = width, height
         cfg = pyglet.gl.Config(double_buffer=True, depth_size=24,
                                sample_buffers=1, samples=4)
         self.win = pyglet.window.Window(width, height,
             "UAV Wireless-ML (Phase 1)",
-            config=cfg, resizable=True, vsync=True)
+            config=cfg, resizable=True, vsync=vsync, visible=visible)
 
         # Camera mặc định: góc nhìn nghiêng nhẹ, khoảng cách vừa phải
         self.yaw, self.pitch, self.dist = 30.0, 20.0, 250.0
@@ -94,6 +142,12 @@ class OpenGLRenderer(Renderer3DBase):
         # Tùy chọn hiển thị
         self.show_grid = True
         self.show_wires = True
+        self.show_profile = False   # thêm thời gian theo pha của World.step vào HUD
+        self._replay = None         # trạng thái phát lại quỹ đạo (xem replay())
+        self._sim = None            # SimWorker khi mô phỏng chạy ngoài luồng UI (xem loop(sim=...))
+        self.pacer = None           # PacingController: số bước mỗi khung theo RTF (xem loop())
+        self.use_vbo = bool(vbo)    # True: mỗi lớp thực thể một VBO + một draw call; False: glVertex từng đỉnh
+        self._streams = {}          # tên lớp → VertexStream (tạo khi cần, context đã có)
         self._dragging = False
 
         # --- FPS thủ công ---
@@ -122,16 +176,48 @@ class OpenGLRenderer(Renderer3DBase):
             elif sym == key.DOWN:   self.pitch = max(-80.0, min(80.0, self.pitch - 4.0))
             elif sym in (key.PLUS, key.NUM_ADD):       self.dist = max(20.0, self.dist * 0.87)
             elif sym in (key.MINUS, key.NUM_SUBTRACT): self.dist = min(1500.0, self.dist / 0.87)
+            elif sym == key.V:   self.use_vbo = not self.use_vbo   # so sánh VBO / immediate mode
             elif sym == key.G:   self.show_grid  = not self.show_grid
             elif sym == key.W:   self.show_wires = not self.show_wires
             elif sym == key.H:   # ẩn/hiện HUD
                 self._hud.y = (-100 if self._hud.y > 0 else self.height - 20)
+            elif sym == key.P:   # bật/tắt đo & hiển thị thời gian theo pha
+                self.show_profile = not self.show_profile
+                if hasattr(self, "_world"):
+                    self._world.profile.enabled = self.show_profile
             elif sym == key.HOME and hasattr(self, "_world"):
                 self._auto_frame(self._world)
+            elif self.pacer is not None and sym in (key.SPACE, key.BRACKETLEFT, key.BRACKETRIGHT, key._0):
+                if sym == key.SPACE:            self.pacer.paused = not self.pacer.paused   # tạm dừng / chạy tiếp
+                elif sym == key.BRACKETRIGHT:   self.pacer.faster()                          # RTF lên một mức
+                elif sym == key.BRACKETLEFT:    self.pacer.slower()                          # RTF xuống một mức
+                else:                           self.pacer.toggle_max()                      # nhanh nhất ↔ 1×
+                self.sync_pacing()
+            elif self._sim is not None and sym == key.I:       # bật/tắt nội suy giữa các ảnh chụp
+                self._sim.interpolate = not self._sim.interpolate
+            elif self._replay is not None:   # điều khiển phát lại
+                r = self._replay
+                last = max(0, len(r.traj) - 1)
+                if sym == key.SPACE:
+                    r.playing = not r.playing
+                    if r.playing and r.pos >= last:
+                        r.pos = 0.0
+                elif sym in (key.COMMA, key.PERIOD):   # lùi/tiến một khung (tạm dừng)
+                    r.playing = False
+                    r.pos = float(min(last, max(0, int(r.pos) + (1 if sym == key.PERIOD else -1))))
+                elif sym in (key.PAGEUP, key.PAGEDOWN):   # tua ±10%
+                    r.pos = min(last, max(0.0, r.pos + (0.1 if sym == key.PAGEUP else -0.1) * last))
+                elif sym == key.BRACKETRIGHT: r.speed = min(1024.0, r.speed * 2.0)
+                elif sym == key.BRACKETLEFT:  r.speed = max(1.0 / 64, r.speed / 2.0)
+                elif sym == key.BACKSPACE:    r.pos = 0.0
 
         @self.win.event
         def on_mouse_press(x, y, button, mods):
             """Chuột trái để bắt đầu kéo xoay camera."""
+            if button == mouse.LEFT and self._replay is not None and y <= self._BAR_Y + 2 * self._BAR_H:
+                self._replay.scrubbing = True   # bấm vào thanh tiến trình → tua
+                self._seek_x(x)
+                return
             if button == mouse.LEFT:
                 self._dragging = True
                 self._mx, self._my = x, y
@@ -140,10 +226,15 @@ class OpenGLRenderer(Renderer3DBase):
         def on_mouse_release(x, y, button, mods):
             """Thả chuột trái thì ngừng kéo xoay."""
             self._dragging = False
+            if self._replay is not None:
+                self._replay.scrubbing = False
 
         @self.win.event
         def on_mouse_drag(x, y, dx, dy, buttons, mods):
             """Kéo chuột để xoay camera quanh target."""
+            if self._replay is not None and self._replay.scrubbing:
+                self._seek_x(x)
+                return
             if not self._dragging: return
             self.yaw   += dx * 0.3
             self.pitch = max(-85.0, min(85.0, self.pitch + dy * 0.25))
@@ -157,23 +248,50 @@ class OpenGLRenderer(Renderer3DBase):
     # -------------------- Tiện ích nội bộ --------------------
     def _auto_frame(self, world):
         """Đặt camera sao cho bao trọn toàn bộ thực thể."""
-        pts = [world.bs.pos] + [a.pos for a in world.uav] + \
-              [u.pos for u in world.ue] + [s.pos for s in world.sat]
-        P = np.array(pts, np.float32)
+        P = np.vstack([np.asarray(world.bs.pos, np.float32).reshape(1, 3),
+                       np.asarray(world.uav_positions(), np.float32).reshape(-1, 3),
+                       np.asarray(world.ue_positions(), np.float32).reshape(-1, 3),
+                       np.array([s.pos for s in world.sat], np.float32).reshape(-1, 3)])
         center = P.mean(axis=0)
         radius = float(np.max(np.linalg.norm(P - center, axis=1))) * 1.2
         self.target = center
         self.dist = max(50.0, radius / math.tan(math.radians(55/2)))
 
-    def loop(self, world, dt, steps):
-        """Bắt đầu vòng lặp pyglet; gọi world.step định kỳ."""
+    def loop(self, world, dt, steps, sim=None):
+        """Bắt đầu vòng lặp pyglet; chạy tối đa `steps` bước (<= 0 hoặc None: không giới hạn).
+
+        sim=None: mỗi khung chạy một số bước world.step trên luồng UI do PacingController quyết định
+        (đạt RTF mục tiêu trong ngân sách thời gian khung, cfg.viz.rtf / cfg.viz.frame_budget_ms).
+        sim="thread" | "process": mô phỏng chạy trong worker (uwml.simworker.SimWorker) với cùng RTF, cửa sổ
+        chỉ vẽ ảnh chụp mới nhất (nội suy vị trí) nên FPS và tốc độ mô phỏng không kéo nhau.
+        Phím: `]`/`[` tăng/giảm RTF, `0` nhanh nhất ↔ 1×, Space tạm dừng.
+        """
         self._world = world
         self._auto_frame(world)
+        self.pacer = self.make_pacer(world, dt, steps)
+
+        if sim is not None:
+            from .simworker import SimWorker
+            self._sim = SimWorker(world, sim, dt=dt, max_steps=self.pacer.max_steps, rtf=self.pacer.rtf).start()
+            pyglet.clock.schedule_interval(lambda _dt: None, 1.0 / 60.0)   # giữ nhịp vẽ ~60 FPS
+
+            @self.win.event
+            def on_draw():
+                view = self._sim.view()
+                self.pacer.observe(view.stats.time_s)
+                self._draw(view)
 
-        def update(_dt):  # callback mỗi tick
-            world.step(dt)
+            try:
+                pyglet.app.run()
+            finally:
+                self._sim.stop()
+                self._sim = None
+            return
 
-        pyglet.clock.schedule_interval(update, dt)
+        def update(wall_dt):  # mỗi khung: số bước tuỳ RTF và ngân sách thời gian khung
+            self.pacer.tick(world, wall_dt)
+
+        pyglet.clock.schedule_interval(update, 1.0 / 60.0)
 
         @self.win.event
         def on_draw():
@@ -182,6 +300,72 @@ class OpenGLRenderer(Renderer3DBase):
 
         pyglet.app.run()
 
+    @staticmethod
+    def make_pacer(world, dt, steps):
+        """PacingController theo cfg.viz.rtf / cfg.viz.frame_budget_ms (mặc định 1× / 12 ms)."""
+        viz = getattr(world.cfg, "viz", None)
+        return PacingController(dt, rtf=getattr(viz, "rtf", 1.0),
+                                budget_s=getattr(viz, "frame_budget_ms", 12.0) / 1e3, max_steps=steps)
+
+    def sync_pacing(self):
+        """Đẩy RTF / trạng thái tạm dừng của pacer sang worker (nếu mô phỏng chạy ngoài luồng UI)."""
+        if self._sim is not None:
+            self._sim.rtf = self.pacer.rtf
+            self._sim.paused = self.pacer.paused
+
+    # -------------------- Phát lại quỹ đạo --------------------
+    _BAR_Y, _BAR_H = 12, 8   # thanh tiến trình ở đáy cửa sổ (pixel)
+
+    def replay(self, traj, speed=1.0):
+        """Phát lại file quỹ đạo (TrajectoryReader): đọc khung từ memmap, không mô phỏng lại.
+
+        Phím: Space chạy/dừng, ,/. lùi/tiến một khung, PgUp/PgDn tua ±10%, [/] tốc độ ÷2/×2,
+        Backspace về đầu; bấm/kéo trên thanh tiến trình để tua.
+        `speed` = số giây mô phỏng phát trong một giây thực (N×).
+        """
+        self._replay = SimpleNamespace(traj=traj, pos=0.0, playing=True, speed=float(speed), scrubbing=False)
+        if len(traj):
+            self._auto_frame(traj.frame(0))
+
+        def update(dt_wall):
+            r = self._replay
+            last = max(0, len(traj) - 1)
+            if r.playing and not r.scrubbing:
+                r.pos = min(float(last), r.pos + dt_wall * r.speed / max(1e-9, traj.frame_dt))
+                if r.pos >= last:
+                    r.playing = False
+
+        pyglet.clock.schedule_interval(update, 1.0 / 60.0)
+
+        @self.win.event
+        def on_draw():
+            """Vẽ khung hiện tại + thanh tiến trình."""
+            if len(traj):
+                self._draw(traj.frame(int(self._replay.pos)))
+            self._draw_replay_bar()
+
+        pyglet.app.run()
+
+    def _seek_x(self, x):
+        """Tua tới khung ứng với hoành độ x trên thanh tiến trình."""
+        r = self._replay
+        frac = (x - 12.0) / max(1.0, self.width - 24.0)
+        r.pos = min(1.0, max(0.0, frac)) * max(0, len(r.traj) - 1)
+
+    def _draw_replay_bar(self):
+        """Thanh tiến trình phát lại (nền + phần đã phát)."""
+        r = self._replay
+        x0, x1, y, h = 12.0, self.width - 12.0, float(self._BAR_Y), float(self._BAR_H)
+        frac = r.pos / max(1, len(r.traj) - 1)
+        self._begin_2d()
+        for (a, b), c in (((x0, x1), (0.25, 0.25, 0.30, 0.8)),
+                          ((x0, x0 + (x1 - x0) * frac), (0.55, 0.70, 1.00, 0.9))):
+            GL.glColor4f(*c)
+            GL.glBegin(GL.GL_QUADS)
+            GL.glVertex2f(a, y); GL.glVertex2f(b, y); GL.glVertex2f(b, y + h); GL.glVertex2f(a, y + h)
+            GL.glEnd()
+        self._end_2d()
+
     # ====== Pass 3D & 2D (sửa để HUD không bị méo) ======
     def _begin_3d(self):
         """Thiết lập GL để bắt đầu vẽ 3D."""
@@ -238,40 +422,35 @@ class OpenGLRenderer(Renderer3DBase):
     def _draw_grid_axes(self):
         """Vẽ lưới sàn (nếu bật) và trục Oxyz."""
         if self.show_grid:
-            self._color(self.C_GRID)
             half, step = 120, 10
-            for x in range(-half, half+1, step):
-                self._line((x, -half, 0), (x, half, 0))
-            for y in range(-half, half+1, step):
-                self._line((-half, y, 0), (half, y, 0))
+            t = np.arange(-half, half + 1, step, dtype=np.float32)
+            z, h = np.zeros_like(t), np.full_like(t, half)
+            grid = np.concatenate([wire_vertices(np.stack([t, -h, z], 1), np.stack([t, h, z], 1)),
+                                   wire_vertices(np.stack([-h, t, z], 1), np.stack([h, t, z], 1))])
+            self._batch("grid", GL.GL_LINES, grid, self.C_GRID, line_px=1.0)
         # Trục màu
         self._color(self.C_AX_X); self._line((0,0,0),(80,0,0))
         self._color(self.C_AX_Y); self._line((0,0,0),(0,80,0))
         self._color(self.C_AX_Z); self._line((0,0,0),(0,0,80))
 
-    def _draw_points(self, pts, color, size_px=6.0):
-        """Vẽ tập hợp điểm với màu/kích thước cho trước."""
+    def _batch(self, name, mode, verts, color, size_px=None, line_px=None):
+        """Vẽ một lớp thực thể: một lần tải VBO + một draw call (hoặc immediate nếu tắt VBO)."""
         self._color(color)
-        GL.glPointSize(float(size_px))
-        GL.glBegin(GL.GL_POINTS)
-        for p in pts:
-            GL.glVertex3f(float(p[0]), float(p[1]), float(p[2]))
-        GL.glEnd()
-
-    def _draw_uav_columns(self, uav_pts, base_height=60.0):
-        """Vẽ cột dọc xuống đất dưới mỗi UAV."""
-        self._color(self.C_UAV)
-        GL.glLineWidth(3.0)
-        for p in uav_pts:
-            self._line((float(p[0]), float(p[1]), 0.0),
-                       (float(p[0]), float(p[1]), float(base_height)))
-
-    def _draw_wires(self, pairs):
-        """Vẽ dây liên kết (UE→UAV gần nhất)."""
-        if not self.show_wires: return
-        self._color(self.C_WIRE)
-        GL.glLineWidth(2.0)
-        for a, b in pairs: self._line(a, b)
+        if size_px is not None: GL.glPointSize(float(size_px))
+        if line_px is not None: GL.glLineWidth(float(line_px))
+        if not self.use_vbo:
+            draw_immediate(mode, verts)
+            return
+        st = self._streams.get(name)
+        if st is None:
+            st = self._streams[name] = VertexStream()
+        st.draw(mode, verts)
+
+    @staticmethod
+    def _pct_text(world):
+        """P50/P95/P99 độ trễ (ms) từ sketch của Stats."""
+        p = world.stats.latency_sketch.percentiles()
+        return "/".join(f"{v * 1e3:.2f}" for v in p.values()) + "ms"
 
     def _update_hud(self, world):
         """Cập nhật text HUD: FPS + thống kê mô phỏng."""
@@ -288,8 +467,24 @@ class OpenGLRenderer(Renderer3DBase):
             f"FPS={fps:5.1f} | t={world.stats.time_s:5.1f}s step={world.stats.step} "
             f"enq={world.stats.enqueued} deq={world.stats.dequeued} drop={world.stats.dropped} "
             f"avg_lat={avg_lat:.3f}s max_lat={world.stats.max_latency_s:.3f}s "
-            f"HW: {world.hw.cpu_cores}C/{world.hw.gpu_tflops_est:.1f}TF/{world.hw.mem_gb}GB"
+            f"p50/p95/p99={self._pct_text(world)} "
+            f"HW: {world.hw.cpu_cores}C/{world.hw.gpu_tflops_est:.1f}TF/{world.hw.mem_gb}GB "
+            f"[{'VBO' if self.use_vbo else 'immediate'}]"
         )
+        if self.show_profile and getattr(world, "profile", None) is not None:
+            self._hud.text += " | " + world.profile.summary()
+        if self.pacer is not None:
+            pc = self.pacer
+            done = self._sim.done if self._sim is not None else pc.done
+            self._hud.text += (f" | RTF {pc.label()} -> {pc.achieved_rtf:.2f}x"
+                               f"{' (paused)' if pc.paused else ''}{' (done)' if done else ''}")
+        if self._sim is not None:
+            sw = self._sim
+            self._hud.text += f" | {sw.mode} {sw.steps_per_s:.0f} step/s{'' if sw.interpolate else ' (no interp)'}"
+        if self._replay is not None:
+            r = self._replay
+            self._hud.text += (f" | REPLAY {int(r.pos) + 1}/{len(r.traj)} x{r.speed:g}"
+                               f"{'' if r.playing else ' (paused)'}")
 
     def _draw(self, world):
         """Hàm vẽ chính mỗi frame."""
@@ -297,20 +492,22 @@ class OpenGLRenderer(Renderer3DBase):
         self._begin_3d()
         self._draw_grid_axes()
 
-        # Thu thập dữ liệu
-        ue_pts  = [u.pos for u in world.ue]
-        uav_pts = [a.pos for a in world.uav]
-        bs_pts  = [world.bs.pos]
-        sat_pts = [s.pos for s in world.sat]
-        wires = [(u.pos, world._nearest_uav_pos(u.pos)) for u in world.ue]
-
-        # Vẽ thực thể
-        self._draw_wires(wires)
-        self._draw_uav_columns(uav_pts, base_height=getattr(world.cfg.viz, "uav_column_height", 60.0))
-        self._draw_points(bs_pts,  self.C_BS,  size_px=10.0)
-        self._draw_points(uav_pts, self.C_UAV, size_px=8.0)
-        self._draw_points(ue_pts,  self.C_UE,  size_px=6.0)
-        if sat_pts: self._draw_points(sat_pts, self.C_SAT, size_px=10.0)
+        # Thu thập dữ liệu dạng mảng (dây liên kết dùng lại kết quả gán của World.step)
+        ue_pts  = world.ue_positions()
+        uav_pts = world.uav_positions()
+        bs_pts  = np.asarray(world.bs.pos, np.float32).reshape(1, 3)
+        sat_pts = np.array([s.pos for s in world.sat], np.float32).reshape(-1, 3)
+        col_h = getattr(world.cfg.viz, "uav_column_height", 60.0)
+
+        # Vẽ thực thể: mỗi lớp một mảng đỉnh → một draw call
+        if self.show_wires:
+            self._batch("wires", GL.GL_LINES, wire_vertices(ue_pts, world.attachment().dst_pos),
+                        self.C_WIRE, line_px=2.0)
+        self._batch("columns", GL.GL_LINES, column_vertices(uav_pts, col_h), self.C_UAV, line_px=3.0)
+        self._batch("bs",  GL.GL_POINTS, bs_pts,  self.C_BS,  size_px=10.0)
+        self._batch("uav", GL.GL_POINTS, uav_pts, self.C_UAV, size_px=8.0)
+        self._batch("ue",  GL.GL_POINTS, ue_pts,  self.C_UE,  size_px=6.0)
+        if len(sat_pts): self._batch("sat", GL.GL_POINTS, sat_pts, self.C_SAT, size_px=10.0)
         self._end_3d()
 
         # ---- PASS 2D (HUD) ----
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Chạy mô phỏng headless (không vẽ) và gom thống kê thành dict JSON được.
+
+Dùng chung cho cli.py --headless và trình quét tham số (sweep.py).
+"""
+from __future__ import annotations
+import time
+
+from .world import World
+from .telemetry import Telemetry
+from .trajectory import TrajectoryWriter
+
+
+def stats_dict(world: World) -> dict:
+    """Thống kê cuối của world dưới dạng dict (các khóa như JSON headless)."""
+    st = world.stats
+    out = {
+        "time_s": st.time_s,
+        "step": st.step,
+        "enqueued": st.enqueued,
+        "dequeued": st.dequeued,
+        "dropped": st.dropped,
+        "avg_latency_s": (st.sum_latency_s / max(1, st.count_latency or 1)),
+        "max_latency_s": st.max_latency_s,
+        "mean_rate_mbps": st.sum_rate_mbps / max(1, st.enqueued),
+        **{f"latency_{k}_s": v for k, v in st.latency_sketch.percentiles().items()},
+        "packets_logged": len(world.packets),
+        "packets_total": world.packets.total,
+    }
+    if world.backlog() is not None:
+        out["queued"] = world.backlog()
+    # Sketch dạng thưa để gộp phân vị giữa các lượt chạy song song (LatencySketch.from_dict)
+    out["latency_sketch"] = st.latency_sketch.to_dict()
+    if world.profile.enabled:
+        out["profile"] = world.profile.as_dict()
+    return out
+
+
+def run_headless(cfg, steps: int = None, profile: bool = False):
+    """Tạo World từ cfg, spawn, chạy `steps` bước (mặc định cfg.system.steps).
+
+    Nếu đặt `telemetry.path` thì lấy mẫu chuỗi thời gian mỗi `telemetry.every` bước
+    (xem uwml/telemetry.py; ghi bằng luồng nền).
+    Nếu đặt `trajectory.path` thì ghi vị trí + gán mỗi `trajectory.every` bước ra file
+    memmap để replay (xem uwml/trajectory.py; khung 0 là trạng thái sau spawn).
+
+    Returns:
+        (world, stats): world sau khi chạy và dict thống kê (thêm wall_time_s).
+    """
+    t0 = time.perf_counter()
+    w = World(cfg)
+    w.spawn()
+    if profile:
+        w.profile.enabled = True
+    cc = w.cc
+    n = cc.steps if steps is None else steps
+
+    # Các "móc" lấy mẫu định kỳ: (mỗi bao nhiêu bước, hàm gọi, hàm đóng)
+    hooks = []
+    if cc.telemetry_path:
+        tel = Telemetry(cc.telemetry_path, cc.telemetry_every, cc.telemetry_format)
+        hooks.append((tel.every, tel.sample, tel.close))
+    if cc.trajectory_path:
+        r_every = cc.trajectory_every
+        rec = TrajectoryWriter(cc.trajectory_path, w, max_frames=2 + n // r_every, every=r_every)
+        rec.write(w)
+        hooks.append((r_every, rec.write, rec.close))
+
+    try:
+        done = 0
+        while done < n:
+            # Chạy tới mốc lấy mẫu gần nhất (engine "event" nhảy cả đoạn trong một lần gọi)
+            nxt = min([(done // e + 1) * e for e, _, _ in hooks] + [n])
+            w.run(nxt - done, cc.dt)
+            done = nxt
+            for e, fn, _ in hooks:
+                if done % e == 0 or done == n:
+                    fn(w)
+    finally:
+        for _, _, close in hooks:
+            close()
+        w.close()   # đẩy nốt packet log ra file spill kể cả khi một bước lỗi
+    stats = stats_dict(w)
+    stats["wall_time_s"] = time.perf_counter() - t0
+    return w, stats
@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""Biên dịch cấu hình: kiểm tra DotDict theo lược đồ rồi đóng băng thành `CompiledConfig`.
+
+- `SCHEMA` liệt kê mọi mục/khóa mà mô phỏng đọc, kèm kiểu, giá trị mặc định, miền giá trị.
+  Khóa hoặc mục lạ (gõ sai) bị báo lỗi kèm gợi ý tên gần nhất, vd. `channel.pathlos_exp`
+  → "ý bạn là 'pathloss_exp'?". Mọi lỗi được gom lại và ném một lần dưới dạng `ConfigError`.
+- Số đọc từ YAML dạng chuỗi (PyYAML đọc `2.4e9` là chuỗi) được đổi sang số khi biên dịch.
+- `compile_config(cfg)` giải quyết các fallback một lần (ue.* → mobility.* → mặc định,
+  ue.count → world.n_ue, ...) và tính sẵn hằng số dẫn xuất (tham số kênh `ChannelParams`:
+  công suất nhiễu, offset pathloss; số bit mỗi gói; trọng số ưu tiên đã chuẩn hoá).
+  World dùng đối tượng bất biến này thay vì dò lại chuỗi getattr mỗi bước.
+"""
+from __future__ import annotations
+import difflib, types
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from .attach import INDEXES, DEFAULT_CHUNK_ELEMS
+from .channel import FADING_MODELS, ChannelParams, compile_channel
+from .telemetry import FORMATS
+
+ENGINES = ("object", "soa", "event")
+
+REQUIRED = object()   # khóa bắt buộc (không có mặc định)
+
+
+class ConfigError(ValueError):
+    """Cấu hình không hợp lệ; `problems` là danh sách lỗi từng khóa."""
+
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__("cấu hình không hợp lệ:\n  - " + "\n  - ".join(self.problems))
+
+
+@dataclass(frozen=True)
+class Key:
+    """Đặc tả một khóa: kind ∈ {num, int, bool, str, list, any}; lo/hi là cận đóng; choices cho chuỗi."""
+    kind: str
+    default: object = None
+    lo: Optional[float] = None
+    hi: Optional[float] = None
+    choices: Optional[tuple] = None
+    gt: bool = False   # True: cận dưới là chặt (> lo)
+
+
+SCHEMA = {
+    "system": {
+        "dt": Key("num", REQUIRED, lo=0.0, gt=True),
+        "steps": Key("int", 200, lo=0),
+        "engine": Key("str", "object", choices=ENGINES),
+        "profile": Key("bool", False),
+    },
+    "time": {"seed": Key("int", None)},
+    "hardware": {
+        "cpu_cores": Key("int", 0, lo=0),
+        "gpu_tflops_est": Key("num", 0.0, lo=0.0),
+        "mem_gb": Key("int", 0, lo=0),
+    },
+    "world": {
+        "bounds": Key("list", REQUIRED),
+        "n_uav": Key("int", 0, lo=0),
+        "n_ue": Key("int", 0, lo=0),
+        "satellites": Key("list", None),
+    },
+    "uav": {
+        "count": Key("int", None, lo=0),
+        "altitude_m": Key("num", 60.0),
+        "speed_mps": Key("num", None, lo=0.0),
+        "waypoints": Key("list", None),
+    },
+    "ue": {
+        "count": Key("int", None, lo=0),
+        "speed_mps": Key("num", None, lo=0.0),
+        "turn_std_deg": Key("num", None, lo=0.0),
+        "wander_radius": Key("num", None, lo=0.0),   # chưa dùng trong mô hình di chuyển
+    },
+    "mobility": {   # khóa kiểu cũ, dùng khi ue./uav. không đặt
+        "ue_speed_mps": Key("num", 3.0, lo=0.0),
+        "ue_turn_std_deg": Key("num", 25.0, lo=0.0),
+        "uav_speed_mps": Key("num", 8.0, lo=0.0),
+        "uav_waypoints": Key("list", None),
+    },
+    "channel": {
+        "model": Key("str", "log_distance", choices=("log_distance", "fspl")),
+        "ref_distance_m": Key("num", 1.0, lo=0.0, gt=True),
+        "pathloss_exp": Key("num", 2.0, lo=0.0),
+        "ref_pathloss_db": Key("num", 30.0),
+        "carrier_hz": Key("num", 2.4e9, lo=0.0, gt=True),
+        "bandwidth_hz": Key("num", REQUIRED, lo=0.0, gt=True),
+        "noise_figure_db": Key("num", REQUIRED),
+        "tx_power_dbm": Key("num", 20.0),
+        "rate_table": Key("bool", False),
+        "rate_table_rel_tol": Key("num", 1e-4, lo=0.0, gt=True),
+        "interference": Key("bool", False),
+        "num_channels": Key("int", 1, lo=1),
+        "uav_channels": Key("list", None),
+        "shadowing_std_db": Key("num", 0.0, lo=0.0),      # 0 = tắt shadowing
+        "shadowing_corr_m": Key("num", 50.0, lo=0.0, gt=True),
+        "shadowing_res_m": Key("num", 5.0, lo=0.0, gt=True),
+        "fading": Key("str", "none", choices=FADING_MODELS),
+        "rician_k_db": Key("num", 6.0),
+    },
+    "packet": {
+        "size_bytes": Key("int", REQUIRED, lo=1),
+        "gen_prob_per_step": Key("num", REQUIRED, lo=0.0, hi=1.0),
+        "priority": Key("any", 1),
+        "priority_weights": Key("list", None),
+        "max_log": Key("int", 1000, lo=1),
+        "spill_path": Key("str", None),
+    },
+    "queue": {
+        "enabled": Key("bool", False),
+        "capacity": Key("int", 64, lo=1),
+        "num_priorities": Key("int", 1, lo=1),
+    },
+    "attach": {
+        "chunk_elems": Key("int", DEFAULT_CHUNK_ELEMS, lo=1),
+        "index": Key("str", "auto", choices=INDEXES),
+    },
+    "telemetry": {
+        "path": Key("str", None),
+        "every": Key("int", 100, lo=1),
+        "format": Key("str", None, choices=FORMATS),
+    },
+    "trajectory": {
+        "path": Key("str", None),
+        "every": Key("int", 1, lo=1),
+    },
+    "viz": {
+        "point_px": Key("any", None),
+        "wire_px": Key("num", 2.0, lo=0.0),
+        "uav_column_height": Key("num", 60.0),
+        "rtf": Key("num", 1.0, lo=0.0),
+        "frame_budget_ms": Key("num", 12.0, lo=0.0, gt=True),
+    },
+}
+REQUIRED_SECTIONS = ("system", "world", "channel", "packet")
+
+
+def _suggest(name, known):
+    m = difflib.get_close_matches(name, list(known), n=1, cutoff=0.6)
+    return f" (ý bạn là {m[0]!r}?)" if m else ""
+
+
+def _check(where: str, spec: Key, val, problems):
+    """Kiểm tra/đổi kiểu một giá trị; trả về giá trị đã chuẩn hoá (hoặc None nếu lỗi)."""
+    if val is None:
+        return None
+    kind = spec.kind
+    if kind in ("num", "int"):
+        if isinstance(val, str):   # PyYAML đọc "2.4e9" là chuỗi
+            try:
+                val = float(val)
+            except ValueError:
+                problems.append(f"{where}: cần số, nhận {val!r}")
+                return None
+        if isinstance(val, bool) or not isinstance(val, (int, float)):
+            problems.append(f"{where}: cần số, nhận {type(val).__name__} {val!r}")
+            return None
+        if kind == "int":
+            if float(val) != int(val):
+                problems.append(f"{where}: cần số nguyên, nhận {val!r}")
+                return None
+            val = int(val)
+        else:
+            val = float(val)
+        if spec.lo is not None and (val <= spec.lo if spec.gt else val < spec.lo):
+            problems.append(f"{where}: {val!r} phải {'>' if spec.gt else '>='} {spec.lo:g}")
+        if spec.hi is not None and val > spec.hi:
+            problems.append(f"{where}: {val!r} phải <= {spec.hi:g}")
+        return val
+    if kind == "bool":
+        if not isinstance(val, bool):
+            problems.append(f"{where}: cần true/false, nhận {val!r}")
+        return bool(val)
+    if kind == "str":
+        if not isinstance(val, str):
+            problems.append(f"{where}: cần chuỗi, nhận {val!r}")
+            return None
+        if spec.choices is not None and val not in spec.choices:
+            problems.append(f"{where}: {val!r} không hợp lệ (chọn một trong {spec.choices})"
+                            + _suggest(val, spec.choices))
+        return val
+    if kind == "list":
+        if not isinstance(val, (list, tuple)):
+            problems.append(f"{where}: cần danh sách, nhận {val!r}")
+            return None
+        return list(val)
+    return val
+
+
+def validate_config(cfg):
+    """Kiểm tra cfg theo SCHEMA; trả về dict {mục: {khóa: giá trị chuẩn hoá}} (kể cả mặc định).
+
+    Raises:
+        ConfigError: liệt kê mọi khóa/mục lạ, sai kiểu, ngoài miền hoặc thiếu khóa bắt buộc.
+    """
+    problems, out = [], {}
+    for name, sec in vars(cfg).items():
+        if name not in SCHEMA:
+            problems.append(f"mục lạ {name!r}" + _suggest(name, SCHEMA))
+        elif not isinstance(sec, types.SimpleNamespace):
+            problems.append(f"{name}: cần một mục (ánh xạ khóa: giá trị), nhận {sec!r}")
+    for name in REQUIRED_SECTIONS:
+        if not isinstance(getattr(cfg, name, None), types.SimpleNamespace):
+            problems.append(f"thiếu mục bắt buộc {name!r}")
+    for name, keys in SCHEMA.items():
+        sec = getattr(cfg, name, None)
+        raw = vars(sec) if isinstance(sec, types.SimpleNamespace) else {}
+        for k in raw:
+            if k not in keys:
+                problems.append(f"khóa lạ {name}.{k}" + _suggest(k, keys))
+        vals = {}
+        for k, spec in keys.items():
+            if k in raw and raw[k] is not None:
+                vals[k] = _check(f"{name}.{k}", spec, raw[k], problems)
+            elif spec.default is REQUIRED:
+                if isinstance(sec, types.SimpleNamespace) or name in REQUIRED_SECTIONS:
+                    problems.append(f"thiếu khóa bắt buộc {name}.{k}")
+                vals[k] = None
+            else:
+                vals[k] = spec.default
+        out[name] = vals
+    if problems:
+        raise ConfigError(problems)
+    return out
+
+
+@dataclass(frozen=True)
+class CompiledConfig:
+    """Cấu hình đã kiểm tra + giải quyết fallback + tính sẵn hằng số (bất biến, truy cập nhanh)."""
+    # system / time
+    dt: float
+    steps: int
+    engine: str
+    profile: bool
+    seed: Optional[int]
+    # thế giới & thực thể
+    bounds: Tuple[float, ...]
+    n_ue: int
+    n_uav: int
+    uav_altitude_m: float
+    satellites: Tuple[Tuple[float, float, float], ...]
+    hardware: Tuple[int, float, float]
+    # di chuyển (ue./uav. → mobility.* → mặc định)
+    ue_speed_mps: float
+    ue_turn_std_deg: float
+    uav_speed_mps: float
+    uav_waypoints: Optional[Tuple[Tuple[float, float, float], ...]]
+    # kênh (nhiễu, offset pathloss tính sẵn); bảng tra khoảng cách → tốc độ (tùy chọn)
+    channel: ChannelParams
+    rate_table: bool
+    rate_table_rel_tol: float
+    interference: bool
+    uav_channels: Tuple[int, ...]    # kênh tần số của từng UAV (giao thoa chỉ giữa UAV cùng kênh)
+    shadowing_std_db: float          # 0 = tắt
+    shadowing_corr_m: float
+    shadowing_res_m: float
+    fading: str                      # none | rayleigh | rician
+    rician_k_db: float
+    # gói
+    gen_prob: float
+    size_bytes: int
+    size_bits: float
+    priority: object                 # int cố định hoặc tuple các mức
+    priority_p: Optional[Tuple[float, ...]]   # trọng số đã chuẩn hoá (tổng 1) hoặc None = đều
+    max_log: int
+    spill_path: Optional[str]
+    # hàng đợi / gán
+    queue_enabled: bool
+    queue_capacity: int
+    queue_priorities: int
+    attach_chunk_elems: int
+    attach_index: str
+    # đầu ra định kỳ
+    telemetry_path: Optional[str]
+    telemetry_every: int
+    telemetry_format: Optional[str]
+    trajectory_path: Optional[str]
+    trajectory_every: int
+
+
+def _points(v, where, problems):
+    """Danh sách điểm 3D → tuple các tuple float (báo lỗi nếu sai hình dạng)."""
+    try:
+        pts = tuple(tuple(float(c) for c in p) for p in v)
+    except (TypeError, ValueError):
+        problems.append(f"{where}: cần danh sách điểm [x, y, z]")
+        return ()
+    if any(len(p) != 3 for p in pts):
+        problems.append(f"{where}: mỗi điểm phải có đúng 3 toạ độ [x, y, z]")
+    return pts
+
+
+def compile_config(cfg) -> CompiledConfig:
+    """Kiểm tra `cfg` (DotDict) rồi dựng CompiledConfig; ném ConfigError nếu có lỗi."""
+    v = validate_config(cfg)
+    problems = []
+    sy, wo, uv, ue, mo = v["system"], v["world"], v["uav"], v["ue"], v["mobility"]
+    pk, ch = v["packet"], v["channel"]
+
+    # --- Hình học thế giới ---
+    try:
+        bounds = tuple(float(b) for b in wo["bounds"])
+    except (TypeError, ValueError):
+        bounds = ()
+    if len(bounds) != 6:
+        problems.append("world.bounds: cần 6 số [x0, x1, y0, y1, z0, z1]")
+    elif not (bounds[0] < bounds[1] and bounds[2] < bounds[3] and bounds[4] <= bounds[5]):
+        problems.append(f"world.bounds: cần x0 < x1, y0 < y1, z0 <= z1, nhận {list(bounds)}")
+    sats = _points(wo["satellites"] or [], "world.satellites", problems)
+    wps = uv["waypoints"] if uv["waypoints"] is not None else mo["uav_waypoints"]
+    wps = _points(wps, "uav.waypoints", problems) if wps else None
+
+    # --- Ưu tiên gói ---
+    pr, pw = pk["priority"], pk["priority_weights"]
+    if isinstance(pr, (list, tuple)):
+        if not pr or not all(isinstance(x, int) and not isinstance(x, bool) and x >= 0 for x in pr):
+            problems.append(f"packet.priority: cần số nguyên >= 0 hoặc danh sách các số đó, nhận {pr!r}")
+        pr = tuple(pr)
+    elif isinstance(pr, bool) or not isinstance(pr, int) or pr < 0:
+        problems.append(f"packet.priority: cần số nguyên >= 0 hoặc danh sách các số đó, nhận {pr!r}")
+    prio_p = None
+    if pw is not None:
+        if not isinstance(pr, tuple) or len(pw) != len(pr):
+            problems.append("packet.priority_weights: cần cùng độ dài với danh sách packet.priority")
+        elif any(not isinstance(x, (int, float)) or x < 0 for x in pw) or sum(pw) <= 0:
+            problems.append(f"packet.priority_weights: cần các số >= 0, tổng > 0, nhận {pw!r}")
+        else:
+            prio_p = tuple(float(x) / float(sum(pw)) for x in pw)
+
+    # Kênh tần số của UAV: danh sách tường minh hoặc tái sử dụng vòng theo num_channels
+    n_uav = uv["count"] if uv["count"] is not None else wo["n_uav"]
+    uav_ch = ch["uav_channels"]
+    if uav_ch is not None:
+        if len(uav_ch) != n_uav or not all(isinstance(c, int) and not isinstance(c, bool) and c >= 0
+                                           for c in uav_ch):
+            problems.append(f"channel.uav_channels: cần {n_uav} số nguyên >= 0 (một kênh mỗi UAV), "
+                            f"nhận {uav_ch!r}")
+        uav_ch = tuple(uav_ch)
+    else:
+        uav_ch = tuple(i % ch["num_channels"] for i in range(n_uav))
+
+    # Kênh: dựng từ giá trị đã chuẩn hoá (chuỗi số đã đổi sang float)
+    chan = None
+    if not problems:
+        chan = compile_channel(types.SimpleNamespace(**ch))
+    if problems:
+        raise ConfigError(problems)
+
+    hw = v["hardware"]
+    te, tr, q, at = v["telemetry"], v["trajectory"], v["queue"], v["attach"]
+    return CompiledConfig(
+        dt=sy["dt"], steps=sy["steps"], engine=sy["engine"], profile=sy["profile"],
+        seed=v["time"]["seed"],
+        bounds=bounds,
+        n_ue=ue["count"] if ue["count"] is not None else wo["n_ue"],
+        n_uav=n_uav,
+        uav_altitude_m=uv["altitude_m"],
+        satellites=sats,
+        hardware=(hw["cpu_cores"], hw["gpu_tflops_est"], hw["mem_gb"]),
+        ue_speed_mps=ue["speed_mps"] if ue["speed_mps"] is not None else mo["ue_speed_mps"],
+        ue_turn_std_deg=ue["turn_std_deg"] if ue["turn_std_deg"] is not None else mo["ue_turn_std_deg"],
+        uav_speed_mps=uv["speed_mps"] if uv["speed_mps"] is not None else mo["uav_speed_mps"],
+        uav_waypoints=wps,
+        channel=chan, rate_table=ch["rate_table"], rate_table_rel_tol=ch["rate_table_rel_tol"],
+        interference=ch["interference"], uav_channels=uav_ch,
+        shadowing_std_db=ch["shadowing_std_db"], shadowing_corr_m=ch["shadowing_corr_m"],
+        shadowing_res_m=ch["shadowing_res_m"], fading=ch["fading"], rician_k_db=ch["rician_k_db"],
+        gen_prob=pk["gen_prob_per_step"], size_bytes=pk["size_bytes"], size_bits=pk["size_bytes"] * 8.0,
+        priority=pr, priority_p=prio_p,
+        max_log=pk["max_log"], spill_path=pk["spill_path"],
+        queue_enabled=q["enabled"], queue_capacity=q["capacity"], queue_priorities=q["num_priorities"],
+        attach_chunk_elems=at["chunk_elems"], attach_index=at["index"],
+        telemetry_path=te["path"], telemetry_every=te["every"], telemetry_format=te["format"],
+        trajectory_path=tr["path"], trajectory_every=tr["every"],
+    )
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""Chạy mô phỏng tách khỏi vòng vẽ: World.step trong luồng nền ("thread") hoặc tiến trình con ("process").
+
+Mô hình:
+- Worker chạy World.step liên tục (giữ nhịp theo hệ số thời gian thực `rtf`, hoặc nhanh nhất có thể
+  khi rtf = 0) và công bố ảnh chụp bất biến tối đa `publish_hz` lần mỗi giây.
+- Ảnh chụp là một bản ghi `trajectory.frame_dtype` (vị trí UE/UAV, gán UE→UAV, bộ đếm Stats, P50/P95/P99),
+  ghi vào bộ đệm đôi `SnapshotBuffer`: worker ghi vào ô sau, xong thì lật chỉ số ô mới nhất.
+  Mỗi ô có bộ đếm seq (lẻ = đang ghi) để bên đọc chép ra mà không bao giờ thấy khung ghi dở.
+- Biến thể "process": bộ đệm nằm trong multiprocessing.shared_memory; tiến trình con dựng World từ
+  snapshot .npz của world gốc (uwml/snapshot.py) nên tiếp tục đúng trạng thái, kể cả luồng RNG.
+- Bên vẽ gọi `view()` mỗi khung: chép ảnh chụp mới nhất và nội suy tuyến tính vị trí giữa khung đang
+  hiển thị và khung mới (theo thời gian thực giữa hai lần công bố), trả về `FrameView` — cùng giao diện
+  kiểu World mà renderer dùng khi replay. Nhờ vậy FPS của cửa sổ và tốc độ mô phỏng độc lập với nhau.
+"""
+from __future__ import annotations
+import os, shutil, tempfile, threading, time, traceback
+import numpy as np
+from multiprocessing import get_context, shared_memory
+from types import SimpleNamespace
+
+from .trajectory import FrameView, fill_frame, frame_dtype
+
+MODES = ("thread", "process")
+
+# Khối điều khiển (int64) ở đầu bộ đệm
+_STOP, _PAUSED, _LATEST, _DONE, _ERROR, _SEQ0, _SEQ1, _GEN = range(8)
+# Khối số thực (float64): hệ số thời gian thực đặt trước, số bước/giây đo được
+_RTF, _STEPS_PER_S = range(2)
+_CTRL_BYTES, _FCTL_BYTES = 64, 32
+
+
+class SnapshotBuffer:
+    """Hai ô `frame_dtype` + khối điều khiển trong một vùng nhớ (bytearray hoặc shared memory)."""
+
+    def __init__(self, n_ue: int, n_uav: int, shared: bool = False, name: str = None):
+        self.dtype = frame_dtype(n_ue, n_uav)
+        size = _CTRL_BYTES + _FCTL_BYTES + 2 * self.dtype.itemsize
+        self._owner = name is None
+        if shared or name is not None:
+            self._shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+            buf = self._shm.buf
+        else:
+            self._shm = None
+            buf = bytearray(size)
+        self.name = self._shm.name if self._shm is not None else None
+        self.ctrl = np.ndarray((8,), np.int64, buf, 0)
+        self.fctl = np.ndarray((4,), np.float64, buf, _CTRL_BYTES)
+        self.frames = np.ndarray((2,), self.dtype, buf, _CTRL_BYTES + _FCTL_BYTES)
+        if self._owner:
+            self.ctrl[:] = 0
+            self.ctrl[_LATEST] = 1   # lần công bố đầu ghi vào ô 0
+            self.fctl[:] = 0.0
+
+    def publish(self, world):
+        """(Worker) ghi trạng thái world vào ô sau rồi lật ô mới nhất."""
+        s = 1 - int(self.ctrl[_LATEST])
+        self.ctrl[_SEQ0 + s] += 1          # lẻ: đang ghi
+        fill_frame(self.frames[s], world)
+        self.ctrl[_SEQ0 + s] += 1          # chẵn: xong
+        self.ctrl[_LATEST] = s
+        self.ctrl[_GEN] += 1
+
+    def read(self, out) -> int:
+        """(Bên vẽ) chép ô mới nhất vào mảng `out` (1,); trả về số thế hệ đã chép (0 = chưa có / đụng lúc ghi)."""
+        for _ in range(4):
+            gen = int(self.ctrl[_GEN])
+            if gen == 0:
+                return 0
+            s = int(self.ctrl[_LATEST])
+            seq = int(self.ctrl[_SEQ0 + s])
+            if seq & 1:
+                continue
+            out[:] = self.frames[s:s + 1]
+            if int(self.ctrl[_SEQ0 + s]) == seq:
+                return gen
+        return 0
+
+    def close(self):
+        """Nhả vùng nhớ (bên tạo shared memory thì xoá luôn)."""
+        self.ctrl = self.fctl = self.frames = None
+        if self._shm is not None:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+            self._shm = None
+
+
+def _sim_loop(world, buf: SnapshotBuffer, dt: float, max_steps, publish_hz: float):
+    """Vòng chạy của worker (dùng chung cho thread/process) tới khi có cờ dừng."""
+    period = 1.0 / max(1e-3, float(publish_hz))
+    ctrl, fctl = buf.ctrl, buf.fctl
+    buf.publish(world)
+    anchor = None                       # (wall, sim_time, rtf) mốc giữ nhịp
+    t_pub, step_pub = time.perf_counter(), world.stats.step
+    while not ctrl[_STOP]:
+        done = max_steps is not None and world.stats.step >= max_steps
+        if ctrl[_PAUSED] or done:
+            if done and not ctrl[_DONE]:   # công bố khung cuối trước khi báo xong
+                buf.publish(world)
+                ctrl[_DONE] = 1
+            anchor = None
+            time.sleep(period / 4)
+            continue
+        now, rtf = time.perf_counter(), float(fctl[_RTF])
+        if rtf > 0:
+            if anchor is None or anchor[2] != rtf:
+                anchor = (now, world.stats.time_s, rtf)
+            ahead = (world.stats.time_s - anchor[1]) / rtf - (now - anchor[0])
+            if ahead > 0:               # nhanh hơn nhịp đặt: công bố bước vừa xong rồi ngủ tới bước kế
+                if world.stats.step != int(buf.frames[int(ctrl[_LATEST])]["step"]):
+                    buf.publish(world)
+                time.sleep(min(ahead, period))
+                continue
+            if ahead < -0.25:           # tụt quá xa (bước nặng): đặt lại mốc, không dồn bước đuổi theo
+                anchor = (now, world.stats.time_s, rtf)
+        world.step(dt)
+        now = time.perf_counter()
+        if now - t_pub >= period:
+            fctl[_STEPS_PER_S] = (world.stats.step - step_pub) / (now - t_pub)
+            t_pub, step_pub = now, world.stats.step
+            buf.publish(world)
+    buf.publish(world)
+
+
+def _process_main(shm_name, n_ue, n_uav, snap_path, dt, max_steps, publish_hz):
+    """Điểm vào tiến trình con: gắn vào shared memory, dựng World từ snapshot rồi chạy vòng mô phỏng."""
+    from .world import World
+    buf = SnapshotBuffer(n_ue, n_uav, name=shm_name)
+    try:
+        world = World.load_snapshot(snap_path)
+        _sim_loop(world, buf, dt, max_steps, publish_hz)
+        world.close()
+    except BaseException:
+        buf.ctrl[_ERROR] = 1
+        traceback.print_exc()
+    finally:
+        buf.close()
+
+
+class SimWorker:
+    """Chạy `world` trong worker và cung cấp ảnh chụp (có nội suy) cho renderer.
+
+    Args:
+        world: World đã spawn (biến thể "process" chỉ đọc trạng thái ban đầu của nó).
+        mode: "thread" hoặc "process".
+        dt: bước thời gian (mặc định cfg.system.dt).
+        max_steps: dừng mô phỏng sau số bước này (None = chạy mãi).
+        rtf: số giây mô phỏng mỗi giây thực (0 = nhanh nhất có thể).
+        publish_hz: số ảnh chụp tối đa mỗi giây.
+    """
+
+    def __init__(self, world, mode: str = "thread", dt: float = None, max_steps: int = None,
+                 rtf: float = 1.0, publish_hz: float = 60.0):
+        if mode not in MODES:
+            raise ValueError(f"mode không hợp lệ: {mode!r} (chọn một trong {MODES})")
+        self.world, self.mode = world, mode
+        self.dt = float(dt if dt is not None else world.cfg.system.dt)
+        self.max_steps, self.publish_hz = max_steps, float(publish_hz)
+        self.interpolate = True
+        n_ue, n_uav = len(world.ue), len(world.uav)
+        self._buf = SnapshotBuffer(n_ue, n_uav, shared=(mode == "process"))
+        self._buf.fctl[_RTF] = float(rtf)
+        self._worker = None
+        self._tmpdir = None
+        self.error = None
+
+        # Phía vẽ: khung đang hiển thị (nội suy), khung trước/mới nhất và thời điểm nhận
+        self._new = np.zeros(1, self._buf.dtype)   # đích chép (read có thể bỏ dở khi đụng lúc ghi)
+        self._cur = np.zeros(1, self._buf.dtype)
+        self._prev = np.zeros(1, self._buf.dtype)
+        self._shown = np.zeros(1, self._buf.dtype)
+        self._gen, self._t_cur, self._gap, self._t_view = 0, 0.0, 0.0, 0.0
+        self._scene = SimpleNamespace(
+            frames=self._shown, cfg=world.cfg,
+            bs_pos=np.asarray(world.bs.pos, np.float32),
+            sat_pos=np.array([s.pos for s in world.sat], np.float32).reshape(-1, 3))
+
+    # --- Điều khiển ---
+    def start(self):
+        """Khởi động worker và chờ ảnh chụp đầu tiên."""
+        if self.mode == "thread":
+            def target():
+                try:
+                    _sim_loop(self.world, self._buf, self.dt, self.max_steps, self.publish_hz)
+                except BaseException as e:   # báo lại cho luồng chính khi stop()
+                    self.error = e
+                    self._buf.ctrl[_ERROR] = 1
+            self._worker = threading.Thread(target=target, name="sim-worker", daemon=True)
+        else:
+            self._tmpdir = tempfile.mkdtemp(prefix="uwml_sim_")
+            snap = os.path.join(self._tmpdir, "start.npz")
+            self.world.save_snapshot(snap)
+            self._worker = get_context("spawn").Process(
+                target=_process_main, name="sim-worker", daemon=True,
+                args=(self._buf.name, len(self.world.ue), len(self.world.uav), snap,
+                      self.dt, self.max_steps, self.publish_hz))
+        self._worker.start()
+        while not self._buf.ctrl[_GEN] and not self._buf.ctrl[_ERROR] and self._worker.is_alive():
+            time.sleep(0.001)
+        return self
+
+    def stop(self):
+        """Dừng worker, nhả bộ đệm; ném lại lỗi của worker (thread) nếu có."""
+        if self._worker is None:
+            return
+        self._buf.ctrl[_STOP] = 1
+        self._worker.join(timeout=10.0)
+        if self.mode == "process" and self._worker.is_alive():
+            self._worker.terminate()
+        self._worker = None
+        self._buf.close()
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+        if self.error is not None:
+            raise self.error
+
+    @property
+    def paused(self) -> bool:
+        return bool(self._buf.ctrl[_PAUSED])
+
+    @paused.setter
+    def paused(self, val: bool):
+        self._buf.ctrl[_PAUSED] = int(bool(val))
+
+    @property
+    def rtf(self) -> float:
+        """Hệ số thời gian thực đặt cho worker (0 = nhanh nhất có thể)."""
+        return float(self._buf.fctl[_RTF])
+
+    @rtf.setter
+    def rtf(self, val: float):
+        self._buf.fctl[_RTF] = max(0.0, float(val))
+
+    @property
+    def steps_per_s(self) -> float:
+        """Số bước mô phỏng mỗi giây thực (đo trong worker)."""
+        return float(self._buf.fctl[_STEPS_PER_S])
+
+    @property
+    def done(self) -> bool:
+        """Đã chạy đủ max_steps (hoặc worker lỗi)."""
+        return bool(self._buf.ctrl[_DONE] or self._buf.ctrl[_ERROR])
+
+    # --- Phía vẽ ---
+    def view(self) -> FrameView:
+        """Ảnh chụp để vẽ khung này: vị trí nội suy giữa khung đang hiện và khung mới nhất."""
+        now = time.perf_counter()
+        gen = self._buf.read(self._new) if self._buf.ctrl[_GEN] != self._gen else 0
+        if gen:
+            # Khung mới: nội suy tiếp từ vị trí đang hiện (không giật) tới khung vừa nhận
+            self._prev[:] = self._shown if self._gen else self._new
+            self._cur, self._new = self._new, self._cur
+            if self._t_cur:   # khoảng cách giữa hai lần nhận, làm trơn (EMA) cho đỡ giật theo jitter
+                gap = now - self._t_cur
+                self._gap = gap if not self._gap else 0.8 * self._gap + 0.2 * gap
+            # Mốc bắt đầu nội suy = lúc vẽ khung trước (vị trí đang hiện), để khung này đã nhích tới
+            self._gen, self._t_cur = gen, self._t_view or now
+        a = 1.0
+        if self.interpolate and self._gap:
+            # Kéo dài hơn khoảng dự kiến một chút để khung kế tới trước khi nội suy chạm đích (tránh khựng)
+            a = min(1.0, (now - self._t_cur) / max(1e-6, 1.25 * self._gap))
+        self._t_view = now
+        self._shown[:] = self._cur
+        if a < 1.0:
+            for name in ("ue_pos", "uav_pos"):
+                p, c = self._prev[name], self._cur[name]
+                self._shown[name] = p + np.float32(a) * (c - p)
+        v = FrameView(self._scene, 0)
+        v.hw = self.world.hw
+        if self.mode == "thread":
+            v.profile = self.world.profile   # cùng tiến trình: đọc được số đo theo pha của World
+        return v
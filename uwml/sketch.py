@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Sketch phân vị độ trễ bộ nhớ cố định, gộp được (histogram bucket theo log, kiểu DDSketch).
+
+- Bucket i chứa các giá trị trong (γ^(i-1), γ^i] với γ = (1+α)/(1-α) → mọi phân vị ước lượng
+  có sai số tương đối ≤ α (mặc định 1%).
+- Dải giá trị cố định [min_s, max_s] (mặc định 1e-7 s .. 1e4 s → ~1300 bucket int64, ~10 KB);
+  giá trị ngoài dải được dồn vào bucket biên.
+- Thêm theo lô bằng np.bincount; gộp hai sketch (cùng tham số) = cộng mảng đếm, nên kết quả
+  của các lượt chạy song song gộp lại chính xác như chạy một lượt.
+"""
+from __future__ import annotations
+import math
+import numpy as np
+
+
+class LatencySketch:
+    """Histogram log-bucket cho độ trễ (giây)."""
+
+    def __init__(self, rel_acc: float = 0.01, min_s: float = 1e-7, max_s: float = 1e4):
+        self.rel_acc = float(rel_acc)
+        self.min_s = float(min_s)
+        self.max_s = float(max_s)
+        self._gamma = (1 + self.rel_acc) / (1 - self.rel_acc)
+        self._lg = math.log(self._gamma)
+        self._i0 = math.ceil(math.log(self.min_s) / self._lg)
+        n = math.ceil(math.log(self.max_s) / self._lg) - self._i0 + 1
+        self.counts = np.zeros(n, dtype=np.int64)
+
+    # ---- Ghi ----
+    def add(self, values):
+        """Thêm một lô giá trị (mảng hoặc số); bỏ qua NaN."""
+        v = np.asarray(values, dtype=np.float64).reshape(-1)
+        v = v[~np.isnan(v)]
+        if len(v) == 0:
+            return
+        i = np.ceil(np.log(np.clip(v, self.min_s, self.max_s)) / self._lg).astype(np.int64) - self._i0
+        np.clip(i, 0, len(self.counts) - 1, out=i)
+        self.counts += np.bincount(i, minlength=len(self.counts))
+
+    def merge(self, other: "LatencySketch"):
+        """Cộng dồn một sketch khác (cùng tham số) vào sketch này; trả về self."""
+        if (other.rel_acc, other.min_s, other.max_s) != (self.rel_acc, self.min_s, self.max_s):
+            raise ValueError("không gộp được hai sketch khác tham số (rel_acc/min_s/max_s)")
+        self.counts += other.counts
+        return self
+
+    # ---- Đọc ----
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def quantile(self, q: float) -> float:
+        """Phân vị q ∈ [0, 1] (NaN nếu rỗng); sai số tương đối ≤ rel_acc trong dải."""
+        n = self.count
+        if n == 0:
+            return float("nan")
+        rank = min(n - 1, max(0, int(q * (n - 1))))
+        i = int(np.searchsorted(np.cumsum(self.counts), rank, side="right")) + self._i0
+        return 2.0 * self._gamma ** i / (self._gamma + 1.0)
+
+    def percentiles(self, ps=(50, 95, 99)) -> dict:
+        """{"p50": ..., "p95": ..., "p99": ...} (giây)."""
+        return {f"p{p:g}": self.quantile(p / 100.0) for p in ps}
+
+    def __eq__(self, other):
+        if not isinstance(other, LatencySketch):
+            return NotImplemented
+        return ((self.rel_acc, self.min_s, self.max_s) == (other.rel_acc, other.min_s, other.max_s)
+                and np.array_equal(self.counts, other.counts))
+
+    # ---- Tuần tự hóa (JSON) ----
+    def to_dict(self) -> dict:
+        """Dạng thưa, JSON được: tham số + chỉ số/đếm của các bucket khác 0."""
+        nz = np.flatnonzero(self.counts)
+        return {"rel_acc": self.rel_acc, "min_s": self.min_s, "max_s": self.max_s,
+                "index": nz.tolist(), "count": self.counts[nz].tolist()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "LatencySketch":
+        sk = cls(d["rel_acc"], d["min_s"], d["max_s"])
+        sk.counts[np.asarray(d["index"], dtype=np.int64)] = np.asarray(d["count"], dtype=np.int64)
+        return sk
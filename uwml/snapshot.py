@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Lưu / khôi phục toàn bộ trạng thái World vào một file .npz (mảng liền khối, không nén).
+
+Nội dung file:
+- meta (chuỗi JSON): phiên bản, engine, cfg, các bộ đếm Stats, trạng thái các luồng RNG, seed shadowing,
+  tham số sketch độ trễ, bộ đếm packet log.
+- ue_* / uav_*: id, pos, vel, heading, way_idx, attached (cùng bố cục EntityArrays cho mọi engine).
+- bs_pos, sat_pos, sat_id.
+- lat_counts: mảng đếm của Stats.latency_sketch.
+- packets: vòng đệm PacketLog (PACKET_DTYPE, theo thứ tự thời gian).
+- q_*: mảng hàng đợi (NodeQueues) nếu bật; des_*: lịch sự kiện/hàng đợi của engine "event".
+
+Khôi phục dựng thẳng mảng từ file (không spawn, không warm-up); engine "soa"/"event" chỉ là sao chép mảng.
+"""
+from __future__ import annotations
+import json
+import numpy as np
+from dataclasses import fields
+
+from .config import DotDict, to_dict
+from .models import UE, UAV, BS, Satellite, EntityArrays, EntityList, UEView, UAVView
+from .packetlog import PacketLog
+from .queueing import NodeQueues
+from .sketch import LatencySketch
+
+SNAPSHOT_VERSION = 1
+ENTITY_FIELDS = ("id", "pos", "vel", "heading", "way_idx", "attached")
+
+
+def _entity_arrays(world, kind: str) -> EntityArrays:
+    """Trạng thái UE/UAV dạng EntityArrays (engine "object": gom từ các đối tượng)."""
+    soa = world.ue_soa if kind == "ue" else world.uav_soa
+    if soa is not None:
+        return soa
+    items = world.ue if kind == "ue" else world.uav
+    arr = EntityArrays(len(items), ids=[e.id for e in items])
+    for i, e in enumerate(items):
+        arr.pos[i] = e.pos
+        arr.vel[i] = e.vel
+        if kind == "ue":
+            arr.heading[i] = getattr(e, "_dir_rad", 0.0)
+            arr.attached[i] = -1 if e.attached_uav_id is None else e.attached_uav_id
+        else:
+            arr.way_idx[i] = e._way_idx
+    return arr
+
+
+def save_snapshot(world, path: str):
+    """Ghi trạng thái `world` ra `path` (.npz)."""
+    from .world import RNG_STREAMS
+    # Engine "event": vị trí UE lưu nguyên trạng "lười" (kèm des_ue_moves), không tua để khỏi rút thêm số ngẫu nhiên
+    st = world.stats
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "engine": world.engine,
+        "cfg": to_dict(world.cfg),
+        "stats": {f.name: getattr(st, f.name) for f in fields(st) if f.name != "latency_sketch"},
+        "sketch": {"rel_acc": st.latency_sketch.rel_acc, "min_s": st.latency_sketch.min_s,
+                   "max_s": st.latency_sketch.max_s},
+        "rng": {name: getattr(world, f"rng_{name}").bit_generator.state
+                for name in RNG_STREAMS},
+        "packets": {"capacity": world.packets.capacity, "total": world.packets.total},
+        "shadow_seed": world.shadow_seed,
+    }
+    arrays = {"meta": np.array(json.dumps(meta))}
+    for kind in ("ue", "uav"):
+        arr = _entity_arrays(world, kind)
+        for name in ENTITY_FIELDS:
+            arrays[f"{kind}_{name}"] = getattr(arr, name)
+    arrays["bs_pos"] = world.bs.pos
+    arrays["sat_id"] = np.array([s.id for s in world.sat], dtype=np.int64)
+    arrays["sat_pos"] = np.array([s.pos for s in world.sat], dtype=np.float32).reshape(-1, 3)
+    arrays["lat_counts"] = st.latency_sketch.counts
+    arrays["packets"] = world.packets.records()
+    if world.queues is not None:
+        for name in NodeQueues.STATE_FIELDS:
+            arrays[f"q_{name}"] = getattr(world.queues, name)
+    if world._des is not None:
+        for name, val in world._des.state().items():
+            arrays[f"des_{name}"] = val
+    np.savez(path, **arrays)
+
+
+def load_snapshot(path: str, cfg=None, spill_path: str = None):
+    """Dựng World mới từ snapshot.
+
+    Args:
+        path: file .npz từ save_snapshot.
+        cfg: cấu hình thay thế (mặc định: cfg lưu trong snapshot).
+        spill_path: file spill mới cho packet log (mặc định tắt, tránh ghi đè file của lượt gốc).
+    """
+    from .world import World
+    z = np.load(path, allow_pickle=False)
+    meta = json.loads(str(z["meta"]))
+    if meta["version"] != SNAPSHOT_VERSION:
+        raise ValueError(f"phiên bản snapshot không hỗ trợ: {meta['version']}")
+    cfg = cfg if cfg is not None else DotDict.from_dict(meta["cfg"])
+    cfg.packet.spill_path = spill_path
+    engine = meta["engine"]
+    w = World(cfg, engine=engine)
+
+    # --- Thực thể ---
+    w.bs = BS(0, z["bs_pos"])
+    w.sat = [Satellite(int(i), p) for i, p in zip(z["sat_id"], z["sat_pos"])]
+    for kind, view, cls in (("ue", UEView, UE), ("uav", UAVView, UAV)):
+        arr = EntityArrays(len(z[f"{kind}_id"]), ids=z[f"{kind}_id"])
+        for name in ENTITY_FIELDS[1:]:
+            getattr(arr, name)[:] = z[f"{kind}_{name}"]
+        if engine != "object":
+            setattr(w, f"{kind}_soa", arr)
+            setattr(w, kind, EntityList(arr, view))
+            continue
+        items = []
+        for i in range(len(arr)):
+            e = cls(int(arr.id[i]), arr.pos[i], arr.vel[i])
+            if kind == "ue":
+                e._dir_rad = float(arr.heading[i])
+                e.attached_uav_id = None if arr.attached[i] < 0 else int(arr.attached[i])
+            else:
+                e._way_idx = int(arr.way_idx[i])
+            items.append(e)
+        setattr(w, kind, items)
+
+    # --- Thống kê ---
+    for name, val in meta["stats"].items():
+        setattr(w.stats, name, val)
+    sk = LatencySketch(**meta["sketch"])
+    sk.counts[:] = z["lat_counts"]
+    w.stats.latency_sketch = sk
+
+    # --- Packet log: nạp lại vòng đệm, giữ tổng số gói ---
+    w.packets.close()
+    w.packets = PacketLog(meta["packets"]["capacity"], spill_path)
+    w.packets.extend_records(z["packets"])
+    w.packets.total = meta["packets"]["total"]
+    w.packets.spilled = w.packets.total - len(w.packets)
+
+    # --- Hàng đợi / engine sự kiện ---
+    if "q_head" in z:
+        n_nodes, n_prio, cap = z["q_arrival_s"].shape
+        w.queues = NodeQueues(n_nodes, n_prio, cap)
+        for name in NodeQueues.STATE_FIELDS:
+            setattr(w.queues, name, np.array(z[f"q_{name}"]))
+    if engine == "event":
+        from .des import EventEngine
+        w._des = EventEngine(w, cfg.system.dt)
+        w._des.load_state({k[4:]: z[k] for k in z.files if k.startswith("des_")})
+
+    # --- Shadowing: seed đã rút lúc tạo World gốc (World mới rút lại từ luồng mới nếu time.seed = null) ---
+    if meta.get("shadow_seed") is not None and w.shadowing is not None:
+        w.set_shadow_seed(meta["shadow_seed"])
+
+    # --- RNG: đặt sau cùng (việc dựng lại ở trên có thể đã rút số) ---
+    for name, state in meta["rng"].items():
+        getattr(w, f"rng_{name}").bit_generator.state = state
+    return w
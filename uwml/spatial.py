@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Chỉ mục không gian (lưới đều 2D) cho truy vấn UAV gần nhất / k-gần nhất.
+
+Ý tưởng:
+- Chia mặt phẳng xy chứa các UAV thành lưới ô đều, mỗi ô trung bình vài UAV.
+- UAV được sắp theo khóa ô → các ô liên tiếp trong một hàng là một lát cắt liền.
+- UE được gom theo ô; mỗi nhóm chỉ so khoảng cách với UAV trong hình chữ nhật ô
+  quanh nó, nới rộng dần cho tới khi chắc chắn không UAV nào bên ngoài gần hơn
+  (khoảng cách ngang tới mép hình chữ nhật lớn hơn khoảng cách tốt nhất).
+Kết quả khớp chính xác với vét cạn (kể cả quy tắc hòa → chỉ số nhỏ nhất).
+
+Lưới được dựng lại mỗi bước (chi phí O(M log M) với M UAV).
+"""
+from __future__ import annotations
+import math
+import numpy as np
+
+
+class UniformGrid:
+    """Lưới đều trên mặt phẳng xy của tập điểm đích (UAV)."""
+
+    def __init__(self, targets, per_cell: float = 2.0):
+        """Dựng lưới từ targets (M,3), trung bình khoảng `per_cell` điểm mỗi ô."""
+        self.T = np.asarray(targets, dtype=np.float32).reshape(-1, 3)
+        m = len(self.T)
+        xy = self.T[:, :2].astype(np.float64)
+        self.lo = xy.min(axis=0) if m else np.zeros(2)
+        ext = (xy.max(axis=0) - self.lo) if m else np.zeros(2)
+
+        # Kích thước ô sao cho mỗi ô có ~per_cell điểm. Khi các điểm gần như thẳng hàng (một chiều ≈ 0,
+        # vd. UAV cùng một đoạn waypoint), diện tích suy biến → ô không được nhỏ hơn mức 1D
+        # (cạnh dài / (m/per_cell)), nếu không số ô theo chiều dài sẽ bùng nổ.
+        area = float(max(ext[0], 1e-6) * max(ext[1], 1e-6))
+        cs = math.sqrt(area * per_cell / max(1, m))
+        cs = max(cs, float(ext.max()) * per_cell / max(1, m))
+        self.cs = max(cs, 1e-3)
+        self.nx = max(1, int(math.ceil(ext[0] / self.cs)))
+        self.ny = max(1, int(math.ceil(ext[1] / self.cs)))
+
+        # Sắp điểm theo khóa ô; start[k]..start[k+1] là các điểm của ô k
+        cx, cy = self._cells(xy)
+        keys = cy * self.nx + cx
+        self.order = np.argsort(keys, kind="stable")
+        counts = np.bincount(keys, minlength=self.nx * self.ny)
+        self.start = np.concatenate(([0], np.cumsum(counts)))
+
+    def _cells(self, xy):
+        """Chỉ số ô (đã kẹp vào lưới) của các điểm xy (N,2)."""
+        c = np.floor((xy - self.lo) / self.cs).astype(np.int64)
+        cx = np.clip(c[:, 0], 0, self.nx - 1)
+        cy = np.clip(c[:, 1], 0, self.ny - 1)
+        return cx, cy
+
+    def _gather(self, cx, cy, r):
+        """Chỉ số điểm đích (tăng dần) trong hình chữ nhật ô bán kính r quanh (cx, cy)."""
+        ix0, ix1 = max(0, cx - r), min(self.nx - 1, cx + r)
+        iy0, iy1 = max(0, cy - r), min(self.ny - 1, cy + r)
+        parts = [self.order[self.start[iy * self.nx + ix0]:self.start[iy * self.nx + ix1 + 1]]
+                 for iy in range(iy0, iy1 + 1)]
+        cand = np.sort(np.concatenate(parts)) if parts else np.empty(0, np.int64)
+        return cand, (ix0, ix1, iy0, iy1)
+
+    def _margin(self, P, rect):
+        """Khoảng cách ngang nhỏ nhất từ P tới mép hình chữ nhật (mép lưới = vô cực)."""
+        ix0, ix1, iy0, iy1 = rect
+        inf = np.inf
+        x_lo = -inf if ix0 == 0 else self.lo[0] + ix0 * self.cs
+        x_hi = inf if ix1 == self.nx - 1 else self.lo[0] + (ix1 + 1) * self.cs
+        y_lo = -inf if iy0 == 0 else self.lo[1] + iy0 * self.cs
+        y_hi = inf if iy1 == self.ny - 1 else self.lo[1] + (iy1 + 1) * self.cs
+        x = P[:, 0].astype(np.float64)
+        y = P[:, 1].astype(np.float64)
+        m = np.minimum(np.minimum(x - x_lo, x_hi - x), np.minimum(y - y_lo, y_hi - y))
+        # Trừ một chút để an toàn với sai số làm tròn khi tính ô
+        return m - 1e-6 * self.cs
+
+    def knearest(self, points, k: int = 1):
+        """k điểm đích gần nhất cho mỗi điểm truy vấn.
+
+        Returns:
+            (idx, dist): (N,k) chỉ số và khoảng cách, sắp tăng dần theo khoảng cách
+            (hòa → chỉ số nhỏ hơn đứng trước), giống vét cạn.
+        """
+        P = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        n, m = len(P), len(self.T)
+        k = min(int(k), m)
+        idx = np.empty((n, k), dtype=np.int64)
+        dist = np.empty((n, k), dtype=np.float32)
+        if n == 0 or k == 0:
+            return idx, dist
+
+        # Gom truy vấn theo ô
+        cx, cy = self._cells(P[:, :2].astype(np.float64))
+        keys = cy * self.nx + cx
+        order = np.argsort(keys, kind="stable")
+        ks = keys[order]
+        bounds = np.flatnonzero(np.diff(ks)) + 1
+        for grp in np.split(order, bounds):
+            gx, gy = int(cx[grp[0]]), int(cy[grp[0]])
+            Q = P[grp]
+            r = 0
+            while True:
+                cand, rect = self._gather(gx, gy, r)
+                if len(cand) < k:
+                    r += 1
+                    continue
+                diff = Q[:, None, :] - self.T[cand][None, :, :]
+                d2 = np.einsum("ijk,ijk->ij", diff, diff)
+                if k == 1:
+                    sel = np.argmin(d2, axis=1)[:, None]
+                else:
+                    sel = np.argsort(d2, axis=1, kind="stable")[:, :k]
+                dk = np.sqrt(np.take_along_axis(d2, sel, axis=1))
+                # Đủ chắc chắn khi khoảng cách thứ k < khoảng cách tới mép hình chữ nhật
+                gap = dk[:, -1] - self._margin(Q, rect)
+                if len(cand) == m or np.all(gap < 0):
+                    idx[grp] = cand[sel]
+                    dist[grp] = dk
+                    break
+                r += max(1, int(math.ceil(float(gap.max()) / self.cs)))
+        return idx, dist
+
+    def nearest(self, points):
+        """Điểm đích gần nhất cho mỗi điểm truy vấn: (idx (N,), dist (N,))."""
+        idx, dist = self.knearest(points, 1)
+        return idx[:, 0], dist[:, 0]
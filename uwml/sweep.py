@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Quét tham số song song: nhiều bộ override trên một YAML nền, chạy headless
+trên process pool, ghi kết quả từng lượt (JSONL) ngay khi xong.
+
+Đặc tả quét (YAML, tùy chọn):
+    base: configs/default.yaml   # YAML nền
+    steps: 500                   # ghi đè system.steps (tùy chọn)
+    workers: 4                   # số tiến trình (tùy chọn)
+    set:  {packet.gen_prob_per_step: 0.1}     # override chung cho mọi lượt
+    grid: {time.seed: [1, 2, 3], ue.count: [100, 1000]}   # tích Descartes
+    runs: [{channel.pathloss_exp: 2.0}, {channel.pathloss_exp: 3.0}]   # danh sách rời
+Mỗi lượt = set ⊕ (một phần tử của runs) ⊕ (một tổ hợp của grid).
+
+Lượt lỗi được ghi lại (ok=false, error, trace) mà không dừng cả lượt quét.
+Phân vị độ trễ gộp của mọi lượt: `pooled_latency(out_path)` (cộng các LatencySketch).
+"""
+from __future__ import annotations
+import os, json, time, itertools, traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+
+import yaml
+
+from .config import load_config, apply_overrides
+from .sketch import LatencySketch
+
+
+def expand_grid(grid=None, runs=None, common=None):
+    """Sinh danh sách dict override cho từng lượt (thứ tự ổn định)."""
+    grid = grid or {}
+    keys = list(grid.keys())
+    combos = [dict(zip(keys, vals)) for vals in itertools.product(*(grid[k] for k in keys))]
+    out = []
+    for run in (runs or [{}]):
+        for combo in combos:
+            ov = dict(common or {})
+            ov.update(run or {})
+            ov.update(combo)
+            out.append(ov)
+    return out
+
+
+def load_sweep_spec(path: str) -> dict:
+    """Đọc file đặc tả quét (YAML) → dict."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def run_one(base: str, overrides: dict, steps: int = None) -> dict:
+    """Chạy một lượt headless (gọi trong tiến trình con); không ném lỗi ra ngoài."""
+    from .runner import run_headless
+    t0 = time.perf_counter()
+    rec = {"overrides": overrides}
+    try:
+        cfg = apply_overrides(load_config(base), overrides)
+        _, stats = run_headless(cfg, steps=steps)
+        rec.update(ok=True, stats=stats)
+    except Exception as e:
+        rec.update(ok=False, error=repr(e),
+                   trace=''.join(traceback.format_exc().splitlines(True)[-6:]))
+    rec["elapsed_s"] = time.perf_counter() - t0
+    rec["pid"] = os.getpid()
+    return rec
+
+
+def run_sweep(base: str, overrides_list, out_path: str, workers: int = None,
+              steps: int = None, echo=print):
+    """Chạy mọi lượt trên process pool, ghi mỗi kết quả thành một dòng JSONL.
+
+    Args:
+        base: đường dẫn YAML nền.
+        overrides_list: danh sách dict override (xem expand_grid).
+        out_path: file JSONL kết quả (ghi đè).
+        workers: số tiến trình (mặc định os.cpu_count()).
+        steps: ghi đè system.steps (None → theo YAML).
+        echo: hàm in tiến độ (None để tắt).
+
+    Returns:
+        (n_ok, n_failed)
+    """
+    workers = max(1, min(int(workers or os.cpu_count() or 1), max(1, len(overrides_list))))
+    n_ok = n_fail = 0
+    with open(out_path, 'w', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+        futs = {pool.submit(run_one, base, ov, steps): i for i, ov in enumerate(overrides_list)}
+        for fut in as_completed(futs):
+            i = futs[fut]
+            try:
+                rec = fut.result()
+            except Exception as e:  # tiến trình con chết (vd. hết bộ nhớ)
+                rec = {"overrides": overrides_list[i], "ok": False, "error": repr(e)}
+            rec = {"run": i, **rec}
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            out.flush()
+            if rec["ok"]:
+                n_ok += 1
+            else:
+                n_fail += 1
+            if echo:
+                echo(f"[{n_ok + n_fail}/{len(overrides_list)}] run {i} "
+                     f"{'ok' if rec['ok'] else 'FAILED: ' + rec['error']}")
+    return n_ok, n_fail
+
+
+def pooled_latency(out_path: str):
+    """Gộp sketch độ trễ của mọi lượt thành công trong file JSONL (None nếu không có)."""
+    pooled = None
+    with open(out_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            rec = json.loads(line)
+            sk = rec.get("stats", {}).get("latency_sketch") if rec.get("ok") else None
+            if sk is None:
+                continue
+            sk = LatencySketch.from_dict(sk)
+            pooled = sk if pooled is None else pooled.merge(sk)
+    return pooled
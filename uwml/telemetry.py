@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Chuỗi thời gian (telemetry) cho chạy headless dài: lấy mẫu mỗi K bước.
+
+Mỗi mẫu (một dòng) gồm:
+- step, time_s, wall_s (thời gian thực từ lúc bắt đầu), step_wall_us (trung bình mỗi bước trong khoảng)
+- d_enqueued / d_dequeued / d_dropped: chênh lệch bộ đếm so với mẫu trước
+- throughput_mbps: bit đã truyền xong trong khoảng / thời gian mô phỏng của khoảng
+- mean_latency_s: độ trễ trung bình của các gói xong trong khoảng
+- mean_rate_mbps: tốc độ link trung bình của các gói sinh ra trong khoảng
+  (khoảng không có gói: null trong JSONL để file vẫn là JSON chuẩn, NaN trong cột .npz)
+- queued: số gói đang chờ (nếu bật hàng đợi)
+- load: số UE đang gán vào mỗi node [BS, UAV 0, UAV 1, ...]
+
+Mẫu được gom trong bộ nhớ rồi đẩy theo lô sang luồng ghi nền (threading + queue), nên vòng
+mô phỏng không chờ I/O. Định dạng theo đuôi file: `.jsonl` (mỗi mẫu một dòng, ghi nối đuôi
+theo lô) hoặc `.npz` (mỗi trường một cột, ghi một lần khi close()). `fmt` ép định dạng; file luôn
+được ghi đúng đường dẫn đã cho (np.savez không tự thêm đuôi .npz).
+"""
+from __future__ import annotations
+import json, queue, threading, time
+import numpy as np
+
+FORMATS = ("jsonl", "npz")
+
+
+def _jsonl_line(row: dict) -> str:
+    """Một dòng JSON chuẩn: NaN (khoảng không có gói) → null, từ chối mọi giá trị không hữu hạn khác."""
+    row = {k: (None if isinstance(v, float) and v != v else v) for k, v in row.items()}
+    return json.dumps(row, allow_nan=False) + "\n"
+
+
+class _Writer(threading.Thread):
+    """Luồng nền nhận các lô mẫu từ hàng đợi và ghi ra file."""
+
+    def __init__(self, path: str, fmt: str):
+        super().__init__(name="telemetry-writer", daemon=True)
+        self.path, self.fmt = path, fmt
+        self.q = queue.Queue()
+        self.error = None
+        self._rows = []   # npz: giữ toàn bộ mẫu tới khi đóng
+
+    def run(self):
+        f = open(self.path, "w", encoding="utf-8") if self.fmt == "jsonl" else None
+        try:
+            while True:
+                batch = self.q.get()
+                if batch is None:
+                    break
+                if f is not None:
+                    f.write("".join(_jsonl_line(r) for r in batch))
+                    f.flush()
+                else:
+                    self._rows.extend(batch)
+            if f is None:
+                self._write_npz()
+        except Exception as e:  # báo lại cho luồng chính khi close()
+            self.error = e
+        finally:
+            if f is not None:
+                f.close()
+
+    def _write_npz(self):
+        cols = {}
+        for name in (self._rows[0].keys() if self._rows else ()):
+            vals = [r[name] for r in self._rows]
+            if name == "load":
+                width = max(len(v) for v in vals)
+                arr = np.zeros((len(vals), width), dtype=np.int64)
+                for i, v in enumerate(vals):
+                    arr[i, :len(v)] = v
+                cols[name] = arr
+            else:
+                cols[name] = np.asarray(vals)
+        with open(self.path, "wb") as f:   # qua file handle: giữ nguyên đường dẫn, kể cả khi không có đuôi .npz
+            np.savez(f, **cols)
+
+
+class Telemetry:
+    """Lấy mẫu World mỗi `every` bước, gom `flush_rows` mẫu rồi giao cho luồng ghi nền."""
+
+    def __init__(self, path: str, every: int = 100, fmt: str = None, flush_rows: int = 256):
+        self.every = max(1, int(every))
+        self.fmt = fmt or ("npz" if str(path).endswith(".npz") else "jsonl")
+        if self.fmt not in FORMATS:
+            raise ValueError(f"định dạng telemetry không hợp lệ: {self.fmt!r} (chọn một trong {FORMATS})")
+        self.flush_rows = max(1, int(flush_rows))
+        self._buf = []
+        self._prev = None
+        self._t0 = self._t_last = time.perf_counter()
+        self._writer = _Writer(path, self.fmt)
+        self._writer.start()
+
+    def sample(self, world):
+        """Ghi một mẫu từ trạng thái hiện tại của world (gọi sau mỗi `every` bước)."""
+        st = world.stats
+        now = time.perf_counter()
+        cur = (st.step, st.time_s, st.enqueued, st.dequeued, st.dropped,
+               st.sum_latency_s, st.count_latency, st.sum_rate_mbps)
+        p = self._prev or (0, 0.0, 0, 0, 0, 0.0, 0, 0.0)
+        d_step, d_time = cur[0] - p[0], cur[1] - p[1]
+        d_enq, d_deq, d_drop = cur[2] - p[2], cur[3] - p[3], cur[4] - p[4]
+        d_lat, d_cnt, d_rate = cur[5] - p[5], cur[6] - p[6], cur[7] - p[7]
+
+        att = world.attachment()
+        load = np.bincount(att.uav_idx + 1, minlength=len(world.uav) + 1)
+        size_bits = world.cc.size_bits
+        backlog = world.backlog()
+        self._buf.append({
+            "step": int(cur[0]),
+            "time_s": float(cur[1]),
+            "wall_s": now - self._t0,
+            "step_wall_us": (now - self._t_last) / max(1, d_step) * 1e6,
+            "d_enqueued": int(d_enq),
+            "d_dequeued": int(d_deq),
+            "d_dropped": int(d_drop),
+            "throughput_mbps": d_deq * size_bits / max(1e-12, d_time) / 1e6,
+            "mean_latency_s": d_lat / d_cnt if d_cnt else float("nan"),
+            "mean_rate_mbps": d_rate / d_enq if d_enq else float("nan"),
+            "queued": -1 if backlog is None else int(backlog),
+            "load": load.tolist(),
+        })
+        self._prev, self._t_last = cur, now
+        if len(self._buf) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        """Giao các mẫu đang gom cho luồng ghi (không chờ ghi xong)."""
+        if self._buf:
+            self._writer.q.put(self._buf)
+            self._buf = []
+
+    def close(self):
+        """Đẩy nốt mẫu còn lại, chờ luồng ghi kết thúc; ném lại lỗi ghi nếu có."""
+        self.flush()
+        self._writer.q.put(None)
+        self._writer.join()
+        if self._writer.error is not None:
+            raise self._writer.error
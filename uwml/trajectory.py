@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Ghi quỹ đạo (vị trí UE/UAV + gán UE→UAV + vài bộ đếm) từng khung ra file memmap, và đọc lại để replay.
+
+Bố cục file (một file nhị phân, đọc bằng np.memmap, không cần nạp hết vào RAM):
+- 8 byte magic b"UWMLTRJ1" + 8 byte độ dài header (uint64 little-endian)
+- header JSON (n_ue, n_uav, n_frames, every, dt, bs_pos, sat_pos, uav_column_height, bounds),
+  đệm tới bội số của 4096 byte
+- n_frames bản ghi cố định kích thước `frame_dtype(n_ue, n_uav)`: step, time_s, bộ đếm Stats,
+  P50/P95/P99 độ trễ, ue_pos (N,3) f32, uav_pos (M,3) f32, attach (N,) i32 (chỉ số UAV, -1 = BS)
+
+`FrameView` bọc một khung thành đối tượng có giao diện như World mà renderer cần
+(ue_positions / uav_positions / attachment / bs / sat / stats / cfg.viz), nên replay
+dùng lại nguyên `_draw` mà không tính lại gì.
+"""
+from __future__ import annotations
+import json, struct
+import numpy as np
+from types import SimpleNamespace
+
+from .config import DotDict
+
+MAGIC = b"UWMLTRJ1"
+_ALIGN = 4096
+
+
+def frame_dtype(n_ue: int, n_uav: int):
+    """dtype của một khung (kích thước cố định theo số UE/UAV)."""
+    return np.dtype([
+        ("step", "<i8"), ("time_s", "<f8"),
+        ("enqueued", "<i8"), ("dequeued", "<i8"), ("dropped", "<i8"),
+        ("sum_latency_s", "<f8"), ("count_latency", "<i8"), ("max_latency_s", "<f8"),
+        ("lat_pct", "<f8", (3,)),
+        ("ue_pos", "<f4", (n_ue, 3)), ("uav_pos", "<f4", (n_uav, 3)),
+        ("attach", "<i4", (n_ue,)),
+    ])
+
+
+def fill_frame(fr, world):
+    """Chép trạng thái hiện tại của world vào một bản ghi `frame_dtype` (ghi tại chỗ)."""
+    st = world.stats
+    fr["step"], fr["time_s"] = st.step, st.time_s
+    fr["enqueued"], fr["dequeued"], fr["dropped"] = st.enqueued, st.dequeued, st.dropped
+    fr["sum_latency_s"], fr["count_latency"] = st.sum_latency_s, st.count_latency
+    fr["max_latency_s"] = st.max_latency_s
+    fr["lat_pct"] = list(st.latency_sketch.percentiles().values())
+    fr["ue_pos"] = world.ue_positions()
+    fr["uav_pos"] = world.uav_positions()
+    fr["attach"] = world.attachment().uav_idx
+
+
+def _header_bytes(header: dict) -> bytes:
+    raw = json.dumps(header).encode("utf-8")
+    total = -(-(16 + len(raw)) // _ALIGN) * _ALIGN
+    return MAGIC + struct.pack("<Q", len(raw)) + raw + b" " * (total - 16 - len(raw))
+
+
+def _read_header(path: str):
+    with open(path, "rb") as f:
+        if f.read(8) != MAGIC:
+            raise ValueError(f"không phải file quỹ đạo: {path}")
+        (n,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(n).decode("utf-8"))
+    return header, -(-(16 + n) // _ALIGN) * _ALIGN
+
+
+class TrajectoryWriter:
+    """Ghi khung vào file memmap cấp phát sẵn `max_frames` khung; close() chốt số khung thực ghi."""
+
+    def __init__(self, path: str, world, max_frames: int, every: int = 1):
+        self.path = path
+        self.n_ue, self.n_uav = len(world.ue), len(world.uav)
+        self.header = {
+            "n_ue": self.n_ue, "n_uav": self.n_uav, "n_frames": 0, "every": int(every),
+            "dt": float(world.cfg.system.dt),
+            "bounds": [float(v) for v in world.bounds],
+            "bs_pos": [float(v) for v in world.bs.pos],
+            "sat_pos": [[float(v) for v in s.pos] for s in world.sat],
+            "uav_column_height": float(getattr(getattr(world.cfg, "viz", DotDict()), "uav_column_height", 60.0)),
+        }
+        head = _header_bytes(self.header)
+        self._offset = len(head)
+        self._dtype = frame_dtype(self.n_ue, self.n_uav)
+        with open(path, "wb") as f:
+            f.write(head)
+            f.truncate(self._offset + self._dtype.itemsize * max(1, int(max_frames)))
+        self._mm = np.memmap(path, dtype=self._dtype, mode="r+", offset=self._offset,
+                             shape=(max(1, int(max_frames)),))
+        self.n = 0
+
+    def write(self, world):
+        """Ghi trạng thái hiện tại của world thành khung kế tiếp."""
+        if self.n >= len(self._mm):
+            raise IndexError("trajectory: vượt số khung đã cấp phát")
+        fill_frame(self._mm[self.n], world)
+        self.n += 1
+
+    def close(self):
+        """Flush memmap, cắt phần thừa và ghi số khung thực tế vào header."""
+        if self._mm is None:
+            return
+        self._mm.flush()
+        self._mm = None
+        self.header["n_frames"] = self.n
+        with open(self.path, "r+b") as f:
+            f.write(_header_bytes(self.header))
+            f.truncate(self._offset + self._dtype.itemsize * self.n)
+
+
+class _FramePercentiles:
+    """Thay cho LatencySketch trong FrameView: trả về P50/P95/P99 đã lưu sẵn trong khung."""
+    __slots__ = ("_p",)
+
+    def __init__(self, p):
+        self._p = p
+
+    def percentiles(self, ps=(50, 95, 99)):
+        return dict(zip((f"p{p:g}" for p in (50, 95, 99)), (float(v) for v in self._p)))
+
+
+class FrameView:
+    """Một khung quỹ đạo với giao diện kiểu World cho renderer (chỉ đọc, không mô phỏng)."""
+
+    def __init__(self, traj: "TrajectoryReader", i: int):
+        fr = traj.frames[i]
+        self.index = i
+        self._fr = fr
+        self._traj = traj
+        self.bs = SimpleNamespace(pos=traj.bs_pos)
+        self.sat = [SimpleNamespace(pos=p) for p in traj.sat_pos]
+        self.cfg = traj.cfg
+        self.hw = SimpleNamespace(cpu_cores=0, gpu_tflops_est=0.0, mem_gb=0)
+        self.profile = None
+        self.stats = SimpleNamespace(
+            step=int(fr["step"]), time_s=float(fr["time_s"]),
+            enqueued=int(fr["enqueued"]), dequeued=int(fr["dequeued"]), dropped=int(fr["dropped"]),
+            sum_latency_s=float(fr["sum_latency_s"]), count_latency=int(fr["count_latency"]),
+            max_latency_s=float(fr["max_latency_s"]), latency_sketch=_FramePercentiles(fr["lat_pct"]))
+
+    @property
+    def ue(self):
+        return [SimpleNamespace(pos=p) for p in self._fr["ue_pos"]]
+
+    @property
+    def uav(self):
+        return [SimpleNamespace(pos=p) for p in self._fr["uav_pos"]]
+
+    def ue_positions(self):
+        return self._fr["ue_pos"]
+
+    def uav_positions(self):
+        return self._fr["uav_pos"]
+
+    def attachment(self):
+        """Kết quả gán đã ghi: uav_idx và vị trí đích (UAV hoặc BS) của từng UE."""
+        idx = np.asarray(self._fr["attach"], dtype=np.int64)
+        uav = self.uav_positions()
+        if len(uav):
+            dst = uav[np.maximum(idx, 0)]
+            dst = np.where((idx < 0)[:, None], self._traj.bs_pos, dst)
+        else:
+            dst = np.broadcast_to(self._traj.bs_pos, (len(idx), 3))
+        return SimpleNamespace(uav_idx=idx, dst_pos=dst)
+
+
+class TrajectoryReader:
+    """Mở file quỹ đạo ở chế độ memmap chỉ đọc; frame(i) → FrameView."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header, offset = _read_header(path)
+        h = self.header
+        self.frames = np.memmap(path, dtype=frame_dtype(h["n_ue"], h["n_uav"]), mode="r",
+                                offset=offset, shape=(h["n_frames"],)) if h["n_frames"] else \
+            np.zeros(0, dtype=frame_dtype(h["n_ue"], h["n_uav"]))
+        self.bs_pos = np.asarray(h["bs_pos"], dtype=np.float32)
+        self.sat_pos = np.asarray(h["sat_pos"], dtype=np.float32).reshape(-1, 3)
+        self.cfg = DotDict.from_dict({"viz": {"uav_column_height": h["uav_column_height"]},
+                                      "system": {"dt": h["dt"]}})
+        # Thời gian mô phỏng giữa hai khung liên tiếp (giây)
+        self.frame_dt = h["dt"] * h["every"]
+
+    def __len__(self):
+        return len(self.frames)
+
+    def frame(self, i: int) -> FrameView:
+        return FrameView(self, max(0, min(int(i), len(self) - 1)))
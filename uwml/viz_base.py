@@ -4,6 +4,10 @@ from __future__ import annotations
 
 
 class Renderer3DBase:
-    def loop(self, world, dt: float, steps: int):
-        """Bắt đầu vòng lặp hiển thị (phải được lớp con cài đặt)."""
+    def loop(self, world, dt: float, steps: int, sim: str = None):
+        """Bắt đầu vòng lặp hiển thị (phải được lớp con cài đặt); sim = "thread"/"process": mô phỏng chạy trong worker."""
+        raise NotImplementedError
+
+    def replay(self, traj, speed: float = 1.0):
+        """Phát lại quỹ đạo đã ghi (uwml.trajectory.TrajectoryReader), không mô phỏng lại."""
         raise NotImplementedError
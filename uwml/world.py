@@ -6,14 +6,22 @@
 - Thống kê (enqueued/dequeued/latency) để hiển thị HUD hay in ra JSON
 """
 from __future__ import annotations
-import numpy as np, random, math
-from dataclasses import dataclass
-from collections import deque
+import numpy as np, math
+from dataclasses import dataclass, field
 
 from .config import DotDict
-from .models import BS, UAV, UE, Satellite, Packet, HardwareProfile
-from .physics import move_ue, move_uav
-from .channel import estimate_link_rate
+from .models import (BS, UAV, UE, Satellite, HardwareProfile,
+                     EntityArrays, EntityList, UEView, UAVView)
+from .physics import move_ue, move_uav, move_ue_batch, move_uav_batch
+from .channel import (RateTable, ShadowingField, estimate_link_rate_batch, fading_gain_db,
+                      interference_sinr_db, link_distance_batch, pathloss_db_batch,
+                      rate_from_sinr_batch, sinr_db_batch)
+from .packetlog import PacketLog
+from .queueing import NodeQueues
+from .profiling import PhaseProfiler
+from .sketch import LatencySketch
+from .attach import attach_nearest, nearest
+from .schema import ENGINES, compile_config
 
 
 @dataclass
@@ -22,11 +30,13 @@ class Stats:
     - time_s: thời gian mô phỏng đã trôi qua (giây)
     - step: số bước mô phỏng đã chạy
     - enqueued: số gói được "sinh" ra (enqueue)
-    - dequeued: số gói coi như đã truyền xong (dequeue)
-    - dropped: số gói rơi (chưa dùng trong mô hình tối giản này)
+    - dequeued: số gói đã truyền xong (rời hàng đợi)
+    - dropped: số gói rơi do hàng đợi đầy (tail-drop)
     - sum_latency_s: tổng độ trễ (giây) để tính trung bình
     - count_latency: số mẫu độ trễ đã ghi nhận
     - max_latency_s: độ trễ lớn nhất quan sát được
+    - sum_rate_mbps: tổng tốc độ link (Mbps) của các gói sinh ra (chia enqueued → tốc độ trung bình)
+    - latency_sketch: histogram log-bucket bộ nhớ cố định cho P50/P95/P99 (gộp được giữa các lượt)
     """
     time_s: float = 0.0
     step: int = 0
@@ -36,82 +46,315 @@ class Stats:
     sum_latency_s: float = 0.0
     count_latency: int = 0
     max_latency_s: float = 0.0
+    sum_rate_mbps: float = 0.0
+    latency_sketch: LatencySketch = field(default_factory=LatencySketch)
+
+
+# Tên các luồng ngẫu nhiên con, theo thứ tự tách từ SeedSequence(cfg.time.seed)
+RNG_STREAMS = ("spawn", "mobility", "traffic", "channel")
+
+
+def make_rng_streams(seed, names=RNG_STREAMS):
+    """Tách SeedSequence(seed) thành các Generator độc lập (mỗi tên một luồng).
+
+    Thêm luồng mới vào cuối `names` không làm thay đổi các luồng đã có.
+    """
+    ss = np.random.SeedSequence(seed)
+    return tuple(np.random.default_rng(s) for s in ss.spawn(len(names)))
 
 
 class World:
-    """Bao toàn bộ 'thế giới mô phỏng': cấu hình, thực thể, thống kê, và vòng đời."""
+    """Bao toàn bộ 'thế giới mô phỏng': cấu hình, thực thể, thống kê, và vòng đời.
 
-    def __init__(self, cfg: DotDict):
-        """Khởi tạo vùng nhớ + tham chiếu cấu hình."""
+    Hai chế độ engine (cfg.system.engine hoặc tham số `engine`):
+    - "object": mỗi UE/UAV là một Entity riêng (mặc định, như bản gốc).
+    - "soa": vị trí/vận tốc/hướng/waypoint nằm trong mảng liền khối (EntityArrays),
+      động học chạy theo mảng; `world.ue[i]` / `world.uav[i]` là view gọn nhẹ.
+    - "event": mô phỏng hướng sự kiện (uwml/des.py) trên cùng kho mảng như "soa": thời gian nhảy
+      giữa các sự kiện gói đến / phục vụ xong / tới waypoint, di chuyển tính lười khi cần.
+    """
+
+    def __init__(self, cfg: DotDict, engine: str = None):
+        """Khởi tạo vùng nhớ + tham chiếu cấu hình.
+
+        Raises:
+            ConfigError: cfg không khớp lược đồ (uwml/schema.py), vd. khóa gõ sai.
+        """
         self.cfg = cfg
+        # Cấu hình đã kiểm tra + hằng số dẫn xuất tính sẵn (bất biến; step() chỉ đọc từ đây)
+        self.cc = cc = compile_config(cfg)
+        self.engine = engine or cc.engine
+        if self.engine not in ENGINES:
+            raise ValueError(f"engine không hợp lệ: {self.engine!r} (chọn một trong {ENGINES})")
         # Hộp biên không gian (x0, x1, y0, y1, z0, z1) dùng để kẹp vị trí
-        self.bounds = np.array(cfg.world.bounds, dtype=np.float32)
+        self.bounds = np.array(cc.bounds, dtype=np.float32)
 
         # Thông tin phần cứng (chỉ để hiển thị lên HUD; không ảnh hưởng mô phỏng)
-        hw = getattr(cfg, "hardware", DotDict(cpu_cores=0, gpu_tflops_est=0.0, mem_gb=0))
-        self.hw = HardwareProfile(hw.cpu_cores, hw.gpu_tflops_est, hw.mem_gb)
+        self.hw = HardwareProfile(*cc.hardware)
 
         # Tập thực thể ban đầu (BS tại gốc tọa độ; các list còn lại trống)
         self.bs = BS(0, [0, 0, 0])
         self.uav = []
         self.ue = []
         self.sat = []
+        # Kho mảng cho engine "soa" (None ở engine "object")
+        self.uav_soa = None
+        self.ue_soa = None
+        # Bộ lập lịch sự kiện của engine "event" (tạo ở spawn)
+        self._des = None
+
+        # Tham số kênh biên dịch sẵn (nhiễu, số hạng log) cho tầng traffic theo lô
+        self.chan = cc.channel
+        self._ue_ids = None
+        # Bảng tra khoảng cách → tốc độ (channel.rate_table), phủ tới đường chéo của bounds ∪ BS ở gốc
+        self.rate_table = None
+        if cc.rate_table:
+            b = np.asarray(cc.bounds, dtype=np.float64).reshape(3, 2)
+            span = np.maximum(b[:, 1], 0.0) - np.minimum(b[:, 0], 0.0)
+            self.rate_table = RateTable(self.chan, float(np.linalg.norm(span)),
+                                        rel_tol=cc.rate_table_rel_tol)
+        # Kênh tần số của từng UAV khi tính giao thoa đồng kênh (channel.interference), None nếu tắt
+        self._uav_channels = np.asarray(cc.uav_channels, dtype=np.int64) if cc.interference else None
+
+        # Kết quả gán UE→UAV của bước gần nhất (dùng chung cho traffic & renderer)
+        self.attach = None
+        self._attach_chunk = cc.attach_chunk_elems
+        self._attach_index = cc.attach_index
+
+        # Bộ đo thời gian theo pha của step() (bật bằng system.profile hoặc cli --profile)
+        self.profile = PhaseProfiler(cc.profile)
+
+        # Hàng đợi FIFO hữu hạn của BS + từng UAV (tạo ở spawn khi queue.enabled)
+        self._queue_on = cc.queue_enabled
+        self._queue_cap = cc.queue_capacity
+        self._queue_prios = cc.queue_priorities
+        self.queues = None
 
         # Thống kê + nhật ký gói
         self.stats = Stats()
-        self.packets = deque(maxlen=getattr(cfg.packet, "max_log", 1000))
+        # Nhật ký gói dạng cột: vòng đệm max_log gói + tùy chọn spill ra file (packet.spill_path)
+        self.packets = PacketLog(cc.max_log, cc.spill_path)
 
-        # Ghim seed ngẫu nhiên (nếu có) để tái lập kết quả khi chạy lại
-        if hasattr(cfg, "time") and hasattr(cfg.time, "seed"):
-            random.seed(int(cfg.time.seed))
+        # Mỗi World sở hữu bộ sinh ngẫu nhiên riêng (không đụng tới module `random` toàn cục),
+        # tách thành các luồng con độc lập từ cfg.time.seed để tái lập kết quả
+        self.seed = cc.seed
+        self.rng_spawn, self.rng_mobility, self.rng_traffic, self.rng_channel = make_rng_streams(cc.seed)
+
+        # Shadowing tương quan không gian (channel.shadowing_std_db > 0): trường dựng một lần trên world.bounds
+        # từ một seed rút ở luồng "channel" (lưới được cache, World cùng cấu hình + seed dùng chung);
+        # fading (channel.fading) rút theo lô mỗi bước cũng từ luồng này
+        self.shadowing = None
+        self.shadow_seed = None   # lưu trong snapshot để dựng lại đúng trường (kể cả khi time.seed = null)
+        if cc.shadowing_std_db > 0:
+            self.set_shadow_seed(int(self.rng_channel.integers(2 ** 63)))
 
     def spawn(self):
         """Sinh thực thể ban đầu theo cấu hình (UAV/UE/Satellite)."""
         # --- UAV ---
-        uv = getattr(self.cfg, "uav", None)
-        # Số lượng UAV: ưu tiên self.cfg.uav.count; fallback self.cfg.world.n_uav
-        n_uav = uv.count if (uv and hasattr(uv, "count")) else getattr(self.cfg.world, "n_uav", 0)
-        # Độ cao mặc định của UAV (m)
-        alt = uv.altitude_m if (uv and hasattr(uv, "altitude_m")) else 60.0
+        # Số lượng UAV (uav.count, fallback world.n_uav) và độ cao (m), đã giải quyết ở compile_config
+        n_uav, alt = self.cc.n_uav, self.cc.uav_altitude_m
         # Bán kính bố trí UAV theo vòng tròn (35% cạnh nhỏ hơn của vùng mô phỏng)
         rad = min(abs(self.bounds[1] - self.bounds[0]),
                   abs(self.bounds[3] - self.bounds[2])) * 0.35
 
         # Bố trí UAV quanh vòng tròn, chia đều theo góc
-        for i in range(n_uav):
-            a = 2 * math.pi * i / max(1, n_uav)
-            pos = [rad * math.cos(a), rad * math.sin(a), alt]
-            self.uav.append(UAV(i + 1, pos))
+        if self.engine != "object":
+            self.uav_soa = EntityArrays(n_uav, ids=np.arange(1, n_uav + 1))
+            a = 2 * np.pi * np.arange(n_uav) / max(1, n_uav)
+            self.uav_soa.pos[:, 0] = rad * np.cos(a)
+            self.uav_soa.pos[:, 1] = rad * np.sin(a)
+            self.uav_soa.pos[:, 2] = alt
+            self.uav = EntityList(self.uav_soa, UAVView)
+        else:
+            for i in range(n_uav):
+                a = 2 * math.pi * i / max(1, n_uav)
+                pos = [rad * math.cos(a), rad * math.sin(a), alt]
+                self.uav.append(UAV(i + 1, pos))
 
         # --- UE ---
-        ue_cfg = getattr(self.cfg, "ue", None)
-        # Số lượng UE: ưu tiên self.cfg.ue.count; fallback self.cfg.world.n_ue
-        n_ue = ue_cfg.count if (ue_cfg and hasattr(ue_cfg, "count")) else getattr(self.cfg.world, "n_ue", 0)
+        # Số lượng UE: ue.count, fallback world.n_ue
+        n_ue = self.cc.n_ue
+
+        # Phân bố UE ngẫu nhiên trên mặt phẳng (z = 0) + hướng ban đầu, rút theo lô
+        rng = self.rng_spawn
+        xs = rng.uniform(self.bounds[0], self.bounds[1], n_ue)
+        ys = rng.uniform(self.bounds[2], self.bounds[3], n_ue)
+        heads = rng.uniform(0, 2 * math.pi, n_ue)
+        if self.engine != "object":
+            self.ue_soa = EntityArrays(n_ue)
+            self.ue_soa.pos[:, 0] = xs
+            self.ue_soa.pos[:, 1] = ys
+            self.ue_soa.heading[:] = heads
+            self.ue = EntityList(self.ue_soa, UEView)
+        else:
+            for j in range(n_ue):
+                u = UE(j, [xs[j], ys[j], 0.0])
+                u._dir_rad = float(heads[j])
+                self.ue.append(u)
 
-        # Phân bố UE ngẫu nhiên trên mặt phẳng (z = 0)
-        for j in range(n_ue):
-            import random as _r
-            x = _r.uniform(self.bounds[0], self.bounds[1])
-            y = _r.uniform(self.bounds[2], self.bounds[3])
-            self.ue.append(UE(j, [x, y, 0.0]))
+        # --- Hàng đợi: node 0 = BS, node i+1 = UAV thứ i ---
+        if self._queue_on and self.engine != "event":
+            self.queues = NodeQueues(n_uav + 1, self._queue_prios, self._queue_cap)
 
         # --- Vệ tinh (tùy chọn) ---
-        sats = getattr(self.cfg.world, "satellites", []) or []
-        for k, p in enumerate(sats):
+        for k, p in enumerate(self.cc.satellites):
             self.sat.append(Satellite(k, p))
 
+        if self.engine == "event":
+            from .des import EventEngine
+            self._des = EventEngine(self, self.cc.dt)
+
+    def ue_positions(self):
+        """Vị trí mọi UE dạng mảng (N,3) float32 (engine "soa": chính mảng gốc)."""
+        if self._des is not None:
+            self._des.sync(self.stats.time_s)
+        if self.ue_soa is not None:
+            return self.ue_soa.pos
+        return np.array([u.pos for u in self.ue], dtype=np.float32).reshape(-1, 3)
+
+    def uav_positions(self):
+        """Vị trí mọi UAV dạng mảng (M,3) float32 (engine "soa": chính mảng gốc)."""
+        if self._des is not None:
+            self.uav_soa.pos[:] = self._des.uav_pos_at(self.stats.time_s)
+        if self.uav_soa is not None:
+            return self.uav_soa.pos
+        return np.array([a.pos for a in self.uav], dtype=np.float32).reshape(-1, 3)
+
+    def ue_ids(self):
+        """Id của các UE theo thứ tự trong world.ue (engine "object": tạo một lần rồi cache)."""
+        if self.ue_soa is not None:
+            return self.ue_soa.id
+        if self._ue_ids is None or len(self._ue_ids) != len(self.ue):
+            self._ue_ids = np.array([u.id for u in self.ue], dtype=np.int64)
+        return self._ue_ids
+
+    def uav_ids(self):
+        """Id của các UAV theo thứ tự trong world.uav."""
+        if self.uav_soa is not None:
+            return self.uav_soa.id
+        return np.array([a.id for a in self.uav], dtype=np.int64)
+
+    def node_ids(self):
+        """Id của các node thu theo chỉ số hàng đợi: [BS, UAV 0, UAV 1, ...]."""
+        return np.concatenate(([self.bs.id], self.uav_ids())).astype(np.int64)
+
+    def _priorities(self, k: int):
+        """Mức ưu tiên cho k gói mới: packet.priority là số (cố định) hoặc danh sách mức,
+        rút theo packet.priority_weights (luồng traffic) nếu là danh sách."""
+        pr = self.cc.priority
+        if not isinstance(pr, tuple):
+            return pr
+        return self.rng_traffic.choice(np.asarray(pr, dtype=np.int64), size=k, p=self.cc.priority_p)
+
+    def backlog(self):
+        """Số gói đang chờ trong hàng đợi (None nếu không bật hàng đợi)."""
+        if self._des is not None and self._des.queue_on:
+            return self._des.backlog()
+        if self.queues is not None:
+            return self.queues.backlog()
+        return None
+
+    def save_snapshot(self, path: str):
+        """Ghi toàn bộ trạng thái (thực thể, thống kê, packet log, hàng đợi, RNG) ra một file .npz."""
+        from .snapshot import save_snapshot
+        save_snapshot(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str, cfg: DotDict = None, spill_path: str = None):
+        """Dựng World từ snapshot (không spawn/warm-up); xem uwml/snapshot.py."""
+        from .snapshot import load_snapshot
+        return load_snapshot(path, cfg, spill_path)
+
+    def close(self):
+        """Giải phóng tài nguyên ghi file (đẩy nốt packet log ra file spill nếu có)."""
+        self.packets.close()
+
     def _nearest_uav_pos(self, p):
         """Trả về vị trí UAV gần nhất với điểm 3D p (nếu không có UAV → trả vị trí BS)."""
         if not self.uav:
             return self.bs.pos
-        dmin = 1e9
-        best = self.uav[0].pos
-        for a in self.uav:
-            # Khoảng cách Euclid từ p tới UAV a
-            d = float(np.linalg.norm(a.pos - p))
-            if d < dmin:
-                dmin, best = d, a.pos
-        return best
+        idx, _ = nearest(np.asarray(p, dtype=np.float32)[None, :], self.uav_positions(),
+                         self._attach_index, self._attach_chunk)
+        return self.uav[int(idx[0])].pos
+
+    def _attach_stage(self):
+        """Gán mọi UE về UAV gần nhất trong một lượt theo lô và lưu vào self.attach."""
+        att = attach_nearest(self.ue_positions(), self.uav_positions(), self.uav_ids(),
+                             self.bs.pos, self._attach_chunk, self._attach_index)
+        # Ghi nhận id UAV gần nhất để hiển thị trạng thái bám (attached)
+        if self.ue_soa is not None:
+            self.ue_soa.attached[:] = att.uav_id
+        else:
+            for u, aid in zip(self.ue, att.uav_id.tolist()):
+                u.attached_uav_id = aid
+        self.attach = att
+        return att
+
+    def attachment(self):
+        """Kết quả gán hiện tại; tính ngay nếu chưa có (vd. trước bước đầu tiên)."""
+        if self.attach is None or len(self.attach.uav_id) != len(self.ue):
+            return self._attach_stage()
+        return self.attach
+
+    def set_shadow_seed(self, seed: int):
+        """Dựng (lại) trường shadowing từ `seed` (World init, hoặc khôi phục snapshot)."""
+        cc = self.cc
+        self.shadow_seed = int(seed)
+        self.shadowing = ShadowingField(cc.bounds, cc.shadowing_std_db, cc.shadowing_corr_m,
+                                        cc.shadowing_res_m, self.shadow_seed)
+
+    def link_rate(self, src, dst, uav_idx=None, uav_pos=None):
+        """Tốc độ liên kết (Mbps) cho N cặp (src[i], dst[i]).
+
+        channel.interference: SINR tính cả giao thoa từ mọi UAV khác cùng kênh (cần uav_idx: UAV phục vụ,
+        uav_pos: vị trí mọi UAV); ngược lại tra bảng nếu bật channel.rate_table, hoặc theo công thức.
+        Shadowing (lấy tại vị trí src = UE) và fading (một lượt rút cho cả N liên kết) cộng vào SINR.
+        """
+        cc = self.cc
+        shadow = self.shadowing.sample(src) if self.shadowing is not None else None
+        fade = fading_gain_db(self.rng_channel, len(src), cc.fading, cc.rician_k_db) if cc.fading != "none" else None
+        if self._uav_channels is not None and uav_idx is not None and len(uav_pos):
+            sinr = interference_sinr_db(src, uav_pos, uav_idx, self._uav_channels, self.chan,
+                                        self._attach_chunk, shadow, fade)
+            return rate_from_sinr_batch(sinr, self.chan)
+        if shadow is None and fade is None:
+            if self.rate_table is not None:
+                return self.rate_table.rate_between(src, dst)
+            return estimate_link_rate_batch(src, dst, self.chan)
+        if self.rate_table is not None:
+            pl = self.rate_table.pathloss_between(src, dst)
+        else:
+            pl = pathloss_db_batch(link_distance_batch(src, dst), self.chan)
+        sinr = sinr_db_batch(self.chan.tx_dbm, pl, self.chan.noise_dbm)
+        if shadow is not None:
+            sinr -= shadow
+        if fade is not None:
+            sinr += fade
+        return rate_from_sinr_batch(sinr, self.chan)
+
+    def _mobility_params(self):
+        """(tốc độ UE, độ lệch đổi hướng UE, tốc độ UAV, waypoint UAV) từ ue./uav., fallback mobility.*"""
+        cc = self.cc
+        return cc.ue_speed_mps, cc.ue_turn_std_deg, cc.uav_speed_mps, cc.uav_waypoints
+
+    def run(self, steps: int, dt: float = None):
+        """Chạy `steps` bước dt. Engine "event" nhảy thẳng qua các sự kiện tới cuối khoảng
+        (một lần gọi, không lặp theo bước); các engine khác gọi step() lần lượt."""
+        dt = self.cc.dt if dt is None else dt
+        if self._des is None:
+            for _ in range(steps):
+                self.step(dt)
+            return
+        # Cộng dồn dt như các engine theo bước để time_s khớp tới từng bit
+        t_end = self.stats.time_s
+        for _ in range(steps):
+            t_end += dt
+        self.profile.begin()
+        self._des.advance(t_end)
+        self.profile.lap("events")
+        self.stats.time_s = t_end
+        self.stats.step += steps
+        self.attach = None
 
     def step(self, dt: float):
         """Chạy 1 bước mô phỏng trong khoảng thời gian dt (giây).
@@ -119,74 +362,97 @@ class World:
         Trình tự:
         1) Đọc tham số mobility (tốc độ UE/UAV, độ đổi hướng, waypoint)
         2) Cập nhật động học UE/UAV
-        3) Với mỗi UE, có xác suất phát sinh gói → ước lượng tốc độ link & độ trễ
-        4) Cập nhật thống kê & tiến thời gian
+        3) Gán UE → UAV gần nhất theo lô (self.attach)
+        4) Rút Bernoulli cho mọi UE một lần → tốc độ link & thời gian truyền theo lô cho UE phát sinh gói
+        5) Hàng đợi (queue.enabled): đưa gói vào hàng đợi của node đích (rơi nếu đầy), mỗi node
+           phục vụ trong [t, t+dt) theo ưu tiên → độ trễ = chờ + truyền; nếu tắt: phát sinh là truyền xong
+        6) Cập nhật thống kê & tiến thời gian
         """
-        mcfg = self.cfg
+        if self._des is not None:
+            self.run(1, dt)
+            return
+        prof = self.profile
+        prof.begin()
 
         # --- 1) Đọc tham số di chuyển (ưu tiên trong ue./uav., nếu thiếu thì fallback mobility.*) ---
-        ue_speed = getattr(getattr(mcfg, "ue", None), "speed_mps",
-                           getattr(mcfg, "mobility", DotDict()).__dict__.get("ue_speed_mps", 3.0))
-        ue_turn = getattr(getattr(mcfg, "ue", None), "turn_std_deg",
-                          getattr(mcfg, "mobility", DotDict()).__dict__.get("ue_turn_std_deg", 25.0))
-        uav_speed = getattr(getattr(mcfg, "uav", None), "speed_mps",
-                            getattr(mcfg, "mobility", DotDict()).__dict__.get("uav_speed_mps", 8.0))
-        uav_wps = getattr(getattr(mcfg, "uav", None), "waypoints",
-                          getattr(mcfg, "mobility", DotDict()).__dict__.get("uav_waypoints", None))
+        ue_speed, ue_turn, uav_speed, uav_wps = self._mobility_params()
+        prof.lap("params")
 
         # --- 2) Cập nhật động học ---
-        for u in self.ue:
-            # Random-walk mượt trong mặt phẳng, z=0; giữ trong bounds
-            move_ue(u, dt, self, speed=ue_speed, turn_std_deg=ue_turn)
-        for a in self.uav:
-            # Bay tự do hoặc theo waypoint; giữ trong bounds
-            move_uav(a, dt, self, speed=uav_speed, waypoints=uav_wps)
-
-        # --- 3) Sinh lưu lượng + ước lượng độ trễ truyền ---
-        pcfg = self.cfg.packet
-        for u in self.ue:
-            # Tìm đích gần nhất (UAV gần nhất; nếu không có UAV thì BS)
-            dst = self._nearest_uav_pos(u.pos)
-
-            # Ghi nhận id UAV gần nhất để hiển thị trạng thái bám (attached)
-            best_id = 0
-            dmin = 1e9
+        if self.engine == "soa":
+            # Toàn bộ UE/UAV trong một lượt NumPy
+            move_ue_batch(self.ue_soa, dt, self.bounds, self.rng_mobility,
+                          speed=ue_speed, turn_std_deg=ue_turn)
+            move_uav_batch(self.uav_soa, dt, self.bounds, speed=uav_speed, waypoints=uav_wps)
+        else:
+            # Độ đổi hướng của mọi UE rút một lần cho cả bước
+            turns = self.rng_mobility.normal(0.0, ue_turn, len(self.ue))
+            for u, dturn in zip(self.ue, turns.tolist()):
+                # Random-walk mượt trong mặt phẳng, z=0; giữ trong bounds
+                move_ue(u, dt, self, speed=ue_speed, turn_std_deg=ue_turn, dturn_deg=dturn)
             for a in self.uav:
-                d = float(np.linalg.norm(a.pos - u.pos))
-                if d < dmin:
-                    dmin, best_id = d, a.id   # FIX: sửa lỗi gõ 'dmin, best_id=d, a.id'
-            u.attached_uav_id = best_id if self.uav else 0
-
-            # Xác suất phát sinh gói ở bước này
-            import random as _r
-            if _r.random() < pcfg.gen_prob_per_step:
-                self.stats.enqueued += 1
-
-                # Ước lượng tốc độ liên kết (Mbps) theo Shannon
-                rate = estimate_link_rate(u.pos, dst, self.cfg.channel)
-
-                # Thời gian truyền (giây): kích thước (bit) / thông lượng (bit/s)
-                size_bits = pcfg.size_bytes * 8.0
-                tx_time = size_bits / max(1e-6, rate * 1e6)
-
-                # Mô hình tối giản: phát sinh là coi như truyền xong (không có hàng đợi)
-                self.stats.dequeued += 1
-                self.stats.sum_latency_s += tx_time
-                self.stats.count_latency += 1
-                if tx_time > self.stats.max_latency_s:
-                    self.stats.max_latency_s = tx_time
+                # Bay tự do hoặc theo waypoint; giữ trong bounds
+                move_uav(a, dt, self, speed=uav_speed, waypoints=uav_wps)
+        prof.lap("mobility")
+
+        # --- 3) Gán UE → UAV gần nhất (một ma trận khoảng cách theo khối cho cả bước) ---
+        att = self._attach_stage()
+        ue_pos = self.ue_positions()
+        prof.lap("attach")
+
+        # --- 4) Sinh lưu lượng + ước lượng độ trễ truyền (theo lô, không vòng lặp Python mỗi gói) ---
+        cc = self.cc
+        # Mẫu Bernoulli của mọi UE rút một lần cho cả bước (luồng traffic riêng)
+        gen = np.flatnonzero(self.rng_traffic.random(len(self.ue)) < cc.gen_prob)
+        prof.lap("traffic")
+
+        if len(gen):
+            # Tốc độ liên kết (Mbps, Shannon) chỉ cho các UE phát sinh gói, đích lấy từ tầng gán
+            rate = self.link_rate(ue_pos[gen], att.dst_pos[gen], att.uav_idx[gen], self.uav_positions())
+
+            # Thời gian truyền (giây): kích thước (bit) / thông lượng (bit/s)
+            tx_time = cc.size_bits / np.maximum(1e-6, rate * 1e6)
+            prof.lap("channel")
+
+            k = len(gen)
+            st = self.stats
+            st.enqueued += k
+            st.sum_rate_mbps += float(rate.sum())
+            prio = self._priorities(k)
+            if self.queues is not None:
+                # Vào hàng đợi của node đích (0 = BS, i+1 = UAV i); phần vượt chỗ trống bị rơi
+                ok = self.queues.enqueue(att.uav_idx[gen] + 1, prio, st.time_s, tx_time,
+                                         self.ue_ids()[gen], cc.size_bytes, rate)
+                st.dropped += int(k - np.count_nonzero(ok))
+            else:
+                # Không có hàng đợi: phát sinh là coi như truyền xong
+                st.dequeued += k
+                st.sum_latency_s += float(tx_time.sum())
+                st.count_latency += k
+                st.max_latency_s = max(st.max_latency_s, float(tx_time.max()))
+                st.latency_sketch.add(tx_time)
 
                 # Ghi log gói để có thể kiểm tra lại sau
-                self.packets.append(
-                    Packet(
-                        pcfg.size_bytes,
-                        int(getattr(pcfg, "priority", 1)),  # ưu tiên (nếu có)
-                        int(u.id),
-                        int(u.attached_uav_id),
-                        float(self.stats.time_s),
-                    )
-                )
-
-        # --- 4) Tiến thời gian mô phỏng & tăng chỉ số bước ---
+                self.packets.extend(cc.size_bytes, prio, self.ue_ids()[gen], att.uav_id[gen],
+                                    st.time_s, rate, tx_time)
+                prof.lap("packet_log")
+
+        # --- 5) Phục vụ hàng đợi trong [t, t+dt) (mọi node cùng lúc, theo mảng) ---
+        if self.queues is not None:
+            st = self.stats
+            dep = self.queues.serve(st.time_s, st.time_s + dt)
+            if dep is not None:
+                lat = dep.latency_s
+                st.dequeued += len(dep)
+                st.sum_latency_s += float(lat.sum())
+                st.count_latency += len(dep)
+                st.max_latency_s = max(st.max_latency_s, float(lat.max()))
+                st.latency_sketch.add(lat)
+                # Log theo thời điểm rời hàng đợi: timestamp = lúc đến, latency = chờ + truyền
+                self.packets.extend(dep.size_bytes, dep.prio, dep.src_id, self.node_ids()[dep.node],
+                                    dep.arrival_s, dep.rate_mbps, lat)
+            prof.lap("queue")
+
+        # --- 6) Tiến thời gian mô phỏng & tăng chỉ số bước ---
         self.stats.time_s += dt
         self.stats.step += 1